@@ -0,0 +1,4 @@
+"""Throughput benchmarks for sheetmusic-metadata.
+
+Run with ``python -m benchmarks --help``.
+"""
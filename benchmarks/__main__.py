@@ -0,0 +1,126 @@
+"""Command-line entry point: python -m benchmarks."""
+
+import json
+import sys
+import tempfile
+from pathlib import Path
+
+import click
+
+from benchmarks.corpus import generate_corpus
+from benchmarks.harness import STAGES, compare_results, run_benchmarks
+from sheetmusic_metadata.pdf_metadata import BACKENDS
+
+DEFAULT_COMPOSERS_CSV = Path(__file__).parent.parent / "composers.csv"
+
+
+@click.command()
+@click.option(
+    "-n", "--count", type=click.IntRange(min=1), default=200, show_default=True
+)
+@click.option("--pages", type=click.IntRange(min=1), default=4, show_default=True)
+@click.option(
+    "--size-kb",
+    type=click.IntRange(min=1),
+    default=64,
+    show_default=True,
+    help="Approximate size of each generated PDF",
+)
+@click.option("--seed", type=int, default=0, show_default=True)
+@click.option(
+    "--corpus-dir",
+    type=click.Path(file_okay=False, path_type=Path),
+    default=None,
+    help="Keep the generated corpus here (default: a temporary directory)",
+)
+@click.option(
+    "--composers-csv",
+    type=click.Path(exists=True, dir_okay=False, path_type=Path),
+    default=DEFAULT_COMPOSERS_CSV,
+    show_default=True,
+)
+@click.option("--backend", type=click.Choice(BACKENDS), default="exiftool")
+@click.option("-j", "--jobs", type=click.IntRange(min=1), default=1, show_default=True)
+@click.option("--repeat", type=click.IntRange(min=1), default=3, show_default=True)
+@click.option(
+    "--stage",
+    "stages",
+    type=click.Choice(STAGES),
+    multiple=True,
+    help="Stage to run (can be used multiple times; default: all)",
+)
+@click.option(
+    "-o",
+    "--output",
+    type=click.Path(dir_okay=False, path_type=Path),
+    default=None,
+    help="Write the results as JSON to this file",
+)
+@click.option(
+    "--baseline",
+    type=click.Path(exists=True, dir_okay=False, path_type=Path),
+    default=None,
+    help="Compare against earlier results; exit 1 if a stage regressed",
+)
+@click.option(
+    "--tolerance",
+    type=click.FloatRange(0.0, 1.0),
+    default=0.10,
+    show_default=True,
+    help="Allowed throughput drop against the baseline",
+)
+def main(
+    count: int,
+    pages: int,
+    size_kb: int,
+    seed: int,
+    corpus_dir: Path | None,
+    composers_csv: Path,
+    backend: str,
+    jobs: int,
+    repeat: int,
+    stages: tuple[str, ...],
+    output: Path | None,
+    baseline: Path | None,
+    tolerance: float,
+) -> None:
+    """Generate a synthetic corpus and time sheetmusic-metadata over it."""
+    with tempfile.TemporaryDirectory(prefix="sheetmusic-corpus-") as scratch:
+        corpus = generate_corpus(
+            corpus_dir or Path(scratch),
+            count,
+            composers_csv,
+            pages=pages,
+            size=size_kb * 1024,
+            seed=seed,
+        )
+        results = run_benchmarks(
+            corpus,
+            composers_csv,
+            backend=backend,
+            jobs=jobs,
+            repeat=repeat,
+            stages=stages or STAGES,
+        )
+
+    click.echo(f"{'stage':<12} {'seconds':>10} {'files/s':>12}")
+    for stage, timing in results["stages"].items():
+        click.echo(
+            f"{stage:<12} {timing['seconds']:>10.4f} {timing['files_per_second']:>12.1f}"
+        )
+
+    if output is not None:
+        output.write_text(json.dumps(results, indent=2) + "\n", encoding="utf-8")
+
+    if baseline is not None:
+        regressions = compare_results(
+            results, json.loads(baseline.read_text(encoding="utf-8")), tolerance
+        )
+        for message in regressions:
+            click.echo(f"Regression: {message}", err=True)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
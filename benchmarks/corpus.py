@@ -0,0 +1,174 @@
+"""Generator for synthetic sheet-music PDF corpora."""
+
+import csv
+import random
+from pathlib import Path
+
+WORKS = [
+    "Symphony",
+    "Concerto",
+    "Overture",
+    "Serenade",
+    "Suite",
+    "StringQuartet",
+    "PianoTrio",
+    "Requiem",
+]
+
+PARTS = [
+    "Violin1",
+    "Violin2",
+    "Viola",
+    "Cello",
+    "DoubleBass",
+    "Flute1",
+    "Oboe2",
+    "Clarinet1",
+    "Bassoon2",
+    "Horn3",
+    "Trumpet1",
+    "Trombone2",
+    "Timpani",
+    "Harp",
+    "Piccolo",
+]
+
+
+def load_surnames(composers_csv: Path) -> list[str]:
+    """
+    Read the surnames usable in filenames from a composers CSV.
+
+    Args:
+        composers_csv: Path to composers.csv
+
+    Returns:
+        Distinct simple_surname values made of letters only, in file order
+    """
+    surnames = {}
+    with open(composers_csv, encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            surname = row["simple_surname"].strip()
+            if surname.isalpha():
+                surnames[surname] = None
+    return list(surnames)
+
+
+def corpus_filenames(count: int, surnames: list[str], seed: int = 0) -> list[str]:
+    """
+    Generate distinct filenames following Composer_Work_Opus_Part.pdf.
+
+    Roughly one in eight names leaves out the opus to exercise the 3-part
+    schema.
+
+    Args:
+        count: Number of filenames
+        surnames: Composer surnames to draw from
+        seed: Random seed, so a corpus can be regenerated exactly
+
+    Returns:
+        List of filenames
+    """
+    rng = random.Random(seed)
+    names: dict[str, None] = {}
+    while len(names) < count:
+        composer = rng.choice(surnames)
+        work = f"{rng.choice(WORKS)}{rng.randint(1, 40):02d}"
+        part = rng.choice(PARTS)
+        if rng.random() < 0.125:
+            name = f"{composer}_{work}_{part}.pdf"
+        else:
+            name = f"{composer}_{work}_Op{rng.randint(1, 200)}_{part}.pdf"
+        names[name] = None
+    return list(names)
+
+
+def build_pdf(pages: int, size: int, title: str = "") -> bytes:
+    """
+    Build a valid PDF with the given page count and approximate size.
+
+    Each page gets an uncompressed content stream; the streams are padded
+    with PDF comments so the file is close to `size` bytes.
+
+    Args:
+        pages: Number of pages (at least 1)
+        size: Target file size in bytes
+        title: Optional existing Title in the Info dictionary
+
+    Returns:
+        PDF file contents
+    """
+    pages = max(pages, 1)
+    first_page = 3
+    page_numbers = [first_page + 2 * i for i in range(pages)]
+    info_number = first_page + 2 * pages
+    # Per-page overhead of the objects and xref entries is about 200 bytes
+    padding = max(size - 400 - 200 * pages, 0) // pages
+
+    objects = [
+        b"<</Type/Catalog/Pages 2 0 R>>",
+        b"<</Type/Pages/Kids[%s]/Count %d>>"
+        % (b" ".join(b"%d 0 R" % n for n in page_numbers), pages),
+    ]
+    for page, number in enumerate(page_numbers, start=1):
+        content = b"BT /F1 24 Tf 72 720 Td (Page %d) Tj ET\n" % page
+        content += b"%" + b"x" * max(padding - len(content) - 2, 0) + b"\n"
+        objects.append(
+            b"<</Type/Page/Parent 2 0 R/MediaBox[0 0 612 792]/Contents %d 0 R"
+            b"/Resources<</Font<</F1<</Type/Font/Subtype/Type1/BaseFont/Helvetica>>>>>>>>"
+            % (number + 1)
+        )
+        objects.append(
+            b"<</Length %d>>\nstream\n%s\nendstream" % (len(content), content)
+        )
+    escaped = title.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+    objects.append(
+        b"<</Producer(benchmarks.corpus)/Title(%s)>>" % escaped.encode("latin-1")
+    )
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    xref_offset = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f\r\n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n\r\n" % offset for offset in offsets)
+    out += b"trailer\n<</Size %d/Root 1 0 R/Info %d 0 R>>\n" % (
+        len(objects) + 1,
+        info_number,
+    )
+    out += b"startxref\n%d\n%%%%EOF\n" % xref_offset
+    return bytes(out)
+
+
+def generate_corpus(
+    output_dir: Path,
+    count: int,
+    composers_csv: Path,
+    pages: int = 1,
+    size: int = 16 * 1024,
+    seed: int = 0,
+) -> list[Path]:
+    """
+    Write a corpus of synthetic sheet-music PDFs.
+
+    Args:
+        output_dir: Directory to write the PDFs to (created if missing)
+        count: Number of PDFs
+        composers_csv: composers.csv to draw surnames from
+        pages: Pages per PDF
+        size: Approximate size of each PDF in bytes
+        seed: Random seed for the filenames
+
+    Returns:
+        Paths of the generated PDFs, sorted by name
+    """
+    output_dir.mkdir(parents=True, exist_ok=True)
+    surnames = load_surnames(composers_csv)
+    content = build_pdf(pages, size, title="Untitled")
+    paths = []
+    for filename in sorted(corpus_filenames(count, surnames, seed)):
+        path = output_dir / filename
+        path.write_bytes(content)
+        paths.append(path)
+    return paths
@@ -0,0 +1,223 @@
+"""Timing harness for the end-to-end run and each processing stage."""
+
+import contextlib
+import os
+import platform
+import shutil
+import tempfile
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+from sheetmusic_metadata import cli
+from sheetmusic_metadata.composer_lookup import ComposerLookup
+from sheetmusic_metadata.exiftool_session import ExifToolSession
+from sheetmusic_metadata.formatting import (
+    format_opus_string,
+    format_part_string,
+    format_work_title,
+)
+from sheetmusic_metadata.instrument_family import get_instrument_family
+from sheetmusic_metadata.parsing import parse_filename
+from sheetmusic_metadata.pdf_metadata import apply_pdf_metadata
+from sheetmusic_metadata.planning import build_metadata
+
+# Version of the results layout, checked when comparing with a baseline
+RESULTS_VERSION = 1
+
+STAGES = ("parse", "format", "lookup", "write", "end_to_end")
+
+
+@contextlib.contextmanager
+def _quiet():
+    """Discard the per-file log the tool prints while being timed."""
+    with (
+        open(os.devnull, "w") as devnull,
+        contextlib.redirect_stdout(devnull),
+        contextlib.redirect_stderr(devnull),
+    ):
+        yield
+
+
+def _best_of(
+    repeat: int, func: Callable[[], None], setup: Callable[[], None] | None = None
+) -> float:
+    """Run func `repeat` times and return the fastest wall-clock time."""
+    best = float("inf")
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run_benchmarks(
+    corpus: list[Path],
+    composers_csv: Path,
+    backend: str = "exiftool",
+    jobs: int = 1,
+    repeat: int = 3,
+    stages: tuple[str, ...] = STAGES,
+) -> dict:
+    """
+    Time each stage, and the whole CLI, over a corpus of PDFs.
+
+    Every stage runs `repeat` times and the fastest run is reported, which
+    is the least noisy figure for regression checks. The write and
+    end-to-end stages write into fresh temporary directories each time.
+
+    Args:
+        corpus: PDFs to process (see corpus.generate_corpus)
+        composers_csv: composers.csv for the lookup stage and the CLI
+        backend: Metadata writer backend ("exiftool" or "native")
+        jobs: --jobs value for the end-to-end stage
+        repeat: Number of runs per stage
+        stages: Stages to run (a subset of STAGES)
+
+    Returns:
+        Results dict with "version", "environment" and "stages", where each
+        stage has "seconds", "files" and "files_per_second"
+    """
+    names = [path.name for path in corpus]
+    components = [parse_filename(name) for name in names]
+    lookup = ComposerLookup(composers_csv)
+    results: dict[str, dict[str, float]] = {}
+
+    def record(stage: str, seconds: float) -> None:
+        results[stage] = {
+            "seconds": seconds,
+            "files": len(corpus),
+            "files_per_second": len(corpus) / seconds if seconds else 0.0,
+        }
+
+    if "parse" in stages:
+        record("parse", _best_of(repeat, lambda: [parse_filename(n) for n in names]))
+
+    if "format" in stages:
+
+        def format_all() -> None:
+            with _quiet():
+                for c in components:
+                    format_work_title(c.work_identifier)
+                    get_instrument_family(format_part_string(c.part))
+                    format_opus_string(c.opus)
+
+        record("format", _best_of(repeat, format_all))
+
+    if "lookup" in stages:
+
+        def lookup_all() -> None:
+            # A fresh lookup each run: loading the (cached) composer index
+            # is part of the cost, and duplicate warnings are printed again
+            fresh = ComposerLookup(composers_csv)
+            with _quiet():
+                for c in components:
+                    fresh.get_full_name_for_pdf(c.composer_last_name)
+
+        record("lookup", _best_of(repeat, lookup_all))
+
+    with tempfile.TemporaryDirectory(prefix="sheetmusic-bench-") as scratch:
+        output_dir = Path(scratch) / "output"
+
+        def reset_output() -> None:
+            shutil.rmtree(output_dir, ignore_errors=True)
+            output_dir.mkdir()
+
+        if "write" in stages:
+            with _quiet():
+                metadata = [
+                    tuple(build_metadata(name, lookup).values()) for name in names
+                ]
+
+            def write_all() -> None:
+                with ExifToolSession() as session, _quiet():
+                    for path, fields in zip(corpus, metadata, strict=True):
+                        apply_pdf_metadata(
+                            path,
+                            *fields,
+                            output_dir,
+                            session=session,
+                            backend=backend,
+                        )
+
+            record("write", _best_of(repeat, write_all, reset_output))
+
+        if "end_to_end" in stages:
+            input_dir = corpus[0].parent
+            args = [
+                "--input-dir",
+                str(input_dir),
+                "--output-dir",
+                str(output_dir),
+                "--composers-csv",
+                str(composers_csv),
+                "--backend",
+                backend,
+                "--jobs",
+                str(jobs),
+            ]
+
+            def run_cli() -> None:
+                with _quiet():
+                    try:
+                        cli.main.main(args, standalone_mode=False)
+                    except SystemExit as e:
+                        if e.code:
+                            raise RuntimeError(f"CLI exited with status {e.code}")
+
+            record("end_to_end", _best_of(repeat, run_cli, reset_output))
+
+    return {
+        "version": RESULTS_VERSION,
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "backend": backend,
+            "jobs": jobs,
+            "repeat": repeat,
+            "files": len(corpus),
+        },
+        "stages": results,
+    }
+
+
+def compare_results(
+    results: dict, baseline: dict, tolerance: float = 0.10
+) -> list[str]:
+    """
+    Find stages that got slower than a baseline.
+
+    Throughput (files per second) is compared so that runs over corpora of
+    different sizes can still be compared.
+
+    Args:
+        results: Results from run_benchmarks
+        baseline: Earlier results to compare against
+        tolerance: Allowed slowdown as a fraction (0.10 = 10% fewer files/s)
+
+    Returns:
+        One message per regressed stage (empty if there are none)
+
+    Raises:
+        ValueError: If the baseline uses a different results layout
+    """
+    if baseline.get("version") != RESULTS_VERSION:
+        raise ValueError(
+            f"Baseline results version {baseline.get('version')} is not "
+            f"{RESULTS_VERSION}; regenerate the baseline"
+        )
+    regressions = []
+    for stage, current in results["stages"].items():
+        previous = baseline["stages"].get(stage)
+        if not previous or not previous["files_per_second"]:
+            continue
+        ratio = current["files_per_second"] / previous["files_per_second"]
+        if ratio < 1 - tolerance:
+            regressions.append(
+                f"{stage}: {current['files_per_second']:.1f} files/s vs "
+                f"{previous['files_per_second']:.1f} in baseline "
+                f"({(1 - ratio) * 100:.0f}% slower)"
+            )
+    return regressions
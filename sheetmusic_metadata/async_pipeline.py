@@ -0,0 +1,166 @@
+"""asyncio driver that tags many PDFs without blocking the event loop."""
+
+import asyncio
+from collections.abc import AsyncIterable, AsyncIterator, Iterable
+from dataclasses import dataclass
+from pathlib import Path
+
+from sheetmusic_metadata.composer_lookup import ComposerLookup
+from sheetmusic_metadata.exiftool_session import AsyncExifToolSession
+from sheetmusic_metadata.output_index import OutputIndex
+from sheetmusic_metadata.parsing import FilenameSchema
+from sheetmusic_metadata.pdf_metadata import apply_pdf_metadata_async
+from sheetmusic_metadata.planning import build_metadata
+
+# Default number of files tagged at the same time
+DEFAULT_CONCURRENCY = 4
+
+# Marks the end of the results queue
+_DONE = object()
+
+
+@dataclass
+class FileResult:
+    """Outcome of tagging one file with process_files."""
+
+    input: Path
+    output: Path | None = None
+    metadata: dict[str, str] | None = None
+    error: Exception | None = None
+
+    @property
+    def ok(self) -> bool:
+        """True if the metadata was written."""
+        return self.error is None
+
+
+async def _iterate(paths: Iterable[Path] | AsyncIterable[Path]) -> AsyncIterator[Path]:
+    """Iterate over a plain or asynchronous iterable of paths."""
+    if isinstance(paths, AsyncIterable):
+        async for path in paths:
+            yield Path(path)
+    else:
+        for path in paths:
+            yield Path(path)
+
+
+async def process_files(
+    paths: Iterable[Path] | AsyncIterable[Path],
+    composer_lookup: ComposerLookup,
+    output_dir: Path | None = None,
+    additional_tags: list[str] | None = None,
+    backend: str = "exiftool",
+    concurrency: int = DEFAULT_CONCURRENCY,
+    timeout: float | None = None,
+    schema: FilenameSchema | None = None,
+) -> AsyncIterator[FileResult]:
+    """
+    Tag PDFs concurrently and yield each result as soon as it is ready.
+
+    At most `concurrency` files are in flight at once (a semaphore holds
+    back reading further paths), each with its own exiftool session, so
+    the number of exiftool processes is bounded too. Results come back in
+    completion order, not input order. A file that cannot be parsed,
+    written, or finished within `timeout` seconds produces a FileResult
+    with `error` set instead of stopping the run.
+
+    Cancelling the consuming task, or closing the generator early (use
+    contextlib.aclosing), cancels the files in flight: exiftool is
+    stopped and their reserved output names are released.
+
+    Args:
+        paths: PDF paths, as a plain or asynchronous iterable
+        composer_lookup: ComposerLookup instance
+        output_dir: Optional directory to write output files to.
+                    If None, the original files are overwritten.
+        additional_tags: Optional list of additional tags to add to keywords
+        backend: Metadata writer backend ("exiftool" or "native")
+        concurrency: Maximum number of files tagged at the same time
+        timeout: Optional limit in seconds for writing each file
+        schema: Optional filename schema (defaults to DEFAULT_SCHEMA)
+
+    Yields:
+        FileResult for each input path
+
+    Raises:
+        ValueError: If concurrency is less than 1
+    """
+    if concurrency < 1:
+        raise ValueError("concurrency must be at least 1")
+
+    output_index = OutputIndex()
+    semaphore = asyncio.Semaphore(concurrency)
+    # One session per slot: the semaphore guarantees one is always idle
+    sessions = [AsyncExifToolSession() for _ in range(concurrency)]
+    idle_sessions: asyncio.Queue[AsyncExifToolSession] = asyncio.Queue()
+    for session in sessions:
+        idle_sessions.put_nowait(session)
+    results: asyncio.Queue = asyncio.Queue()
+
+    async def tag(path: Path) -> FileResult:
+        metadata = None
+        session = idle_sessions.get_nowait()
+        try:
+            # Loading the composer index on the first lookup can fail too
+            metadata = build_metadata(
+                path.name, composer_lookup, additional_tags, schema
+            )
+            async with asyncio.timeout(timeout):
+                output = await apply_pdf_metadata_async(
+                    path,
+                    metadata["Title"],
+                    metadata["Author"],
+                    metadata["Subject"],
+                    metadata["Keywords"],
+                    output_dir,
+                    session=session,
+                    backend=backend,
+                    output_index=output_index,
+                )
+        except TimeoutError:
+            error = TimeoutError(f"Timed out after {timeout} seconds")
+            return FileResult(path, metadata=metadata, error=error)
+        except Exception as e:
+            return FileResult(path, metadata=metadata, error=e)
+        finally:
+            idle_sessions.put_nowait(session)
+        return FileResult(path, output, metadata)
+
+    async def run(path: Path) -> None:
+        try:
+            results.put_nowait(await tag(path))
+        finally:
+            semaphore.release()
+
+    async def feed() -> None:
+        tasks: set[asyncio.Task] = set()
+        try:
+            async for path in _iterate(paths):
+                await semaphore.acquire()
+                task = asyncio.create_task(run(path))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            if tasks:
+                await asyncio.wait(tasks)
+        finally:
+            # Only reached with files in flight if iterating failed or the
+            # run was cancelled
+            in_flight = list(tasks)
+            for task in in_flight:
+                task.cancel()
+            if in_flight:
+                await asyncio.wait(in_flight)
+            results.put_nowait(_DONE)
+
+    feeder = asyncio.create_task(feed())
+    try:
+        while (result := await results.get()) is not _DONE:
+            yield result
+        # Re-raise errors from iterating over paths
+        await feeder
+    finally:
+        feeder.cancel()
+        await asyncio.wait([feeder])
+        if not feeder.cancelled():
+            feeder.exception()  # Mark any error as retrieved
+        await asyncio.gather(*(session.close() for session in sessions))
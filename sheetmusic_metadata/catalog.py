@@ -0,0 +1,308 @@
+"""SQLite catalog of tagged parts, for queries without reading any PDF."""
+
+import os
+import sqlite3
+import time
+from collections.abc import Iterator
+from dataclasses import dataclass
+from pathlib import Path
+
+from sheetmusic_metadata import profiling
+from sheetmusic_metadata.formatting import format_part_string
+from sheetmusic_metadata.instrument_family import (
+    get_instrument_family,
+    get_instrument_index,
+)
+from sheetmusic_metadata.parsing import FilenameComponents
+
+# Changes are committed after this many records ...
+COMMIT_BATCH = 500
+# ... or once this many seconds have passed since the last commit
+COMMIT_INTERVAL = 1.0
+# Seconds a writer waits for another process's transaction to finish
+BUSY_TIMEOUT = 30.0
+
+_SCHEMA_VERSION = 1
+
+_CREATE = """
+CREATE TABLE IF NOT EXISTS parts (
+    output TEXT PRIMARY KEY,
+    input TEXT NOT NULL,
+    composer TEXT NOT NULL,
+    work TEXT NOT NULL,
+    opus TEXT NOT NULL,
+    movement TEXT NOT NULL,
+    part TEXT NOT NULL,
+    instrument TEXT NOT NULL,
+    family TEXT NOT NULL,
+    title TEXT NOT NULL,
+    author TEXT NOT NULL,
+    subject TEXT NOT NULL,
+    keywords TEXT NOT NULL,
+    content_hash TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS parts_input ON parts (input);
+CREATE INDEX IF NOT EXISTS parts_composer ON parts (composer COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS parts_work ON parts (work COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS parts_family ON parts (family COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS parts_instrument ON parts (instrument COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS parts_part ON parts (part COLLATE NOCASE);
+"""
+
+# Columns that can be filtered on by Catalog.query
+QUERY_FIELDS = ("composer", "work", "family", "instrument", "part")
+
+
+@dataclass
+class CatalogEntry:
+    """One tagged part recorded in the catalog."""
+
+    output: Path
+    input: Path
+    # Components parsed from the input filename (raw, as in the filename)
+    composer: str
+    work: str
+    opus: str
+    movement: str
+    # Formatted part name, e.g. "Horn 1", and the instrument it names
+    part: str
+    instrument: str
+    family: str
+    # Metadata written to the PDF
+    title: str
+    author: str
+    subject: str
+    keywords: str
+    # Input file when it was tagged
+    content_hash: str
+    size: int
+    mtime_ns: int
+
+
+def _instrument_of(formatted_part: str) -> tuple[str, str]:
+    """Instrument name and family of a formatted part string."""
+    family = get_instrument_family(formatted_part)
+    found = get_instrument_index().match(formatted_part.lstrip())
+    if found is not None:
+        return found[0], family
+    words = formatted_part.split()
+    return (words[0] if words else formatted_part), family
+
+
+class Catalog:
+    """
+    SQLite database of the parts tagged so far, one row per output file.
+
+    The database uses write-ahead logging, so queries never wait for a
+    run that is writing, and several processes (e.g. --jobs workers) can
+    record into the same catalog. Records are buffered and written in one
+    transaction per batch (every COMMIT_BATCH records or COMMIT_INTERVAL
+    seconds, and on close).
+
+    The catalog also makes repeated runs cheap: an input whose path, size
+    and modification time match its record for the same output directory,
+    with the same metadata, is recognised without being read.
+    """
+
+    def __init__(self, path: Path, ignore_existing: bool = False):
+        """
+        Open or create a catalog.
+
+        Args:
+            path: Path to the SQLite database file
+            ignore_existing: If True, lookup_unchanged never reports earlier
+                             records (new records are still written)
+
+        Raises:
+            sqlite3.Error: If the database cannot be opened or created
+        """
+        self.path = path
+        self.ignore_existing = ignore_existing
+        self._connection = sqlite3.connect(
+            path, timeout=BUSY_TIMEOUT, isolation_level=None
+        )
+        self._connection.row_factory = sqlite3.Row
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        # Durable at each checkpoint; a crash loses at most the last batch
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        if self._connection.execute("PRAGMA user_version").fetchone()[0] == 0:
+            self._connection.executescript(_CREATE)
+            self._connection.execute(f"PRAGMA user_version={_SCHEMA_VERSION}")
+        # Rows recorded but not yet written
+        self._pending: list[tuple] = []
+        self._last_commit = time.monotonic()
+
+    def __enter__(self) -> "Catalog":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return self._connection.execute("SELECT COUNT(*) FROM parts").fetchone()[0]
+
+    def lookup_unchanged(
+        self,
+        input_path: Path,
+        stat: os.stat_result,
+        metadata: dict[str, str],
+        output_dir: Path,
+    ) -> Path | None:
+        """
+        Find the output of an earlier run for an input that has not changed.
+
+        Only outputs in output_dir count, so a catalog shared by several
+        libraries does not skip a file that another library already has.
+
+        Args:
+            input_path: Input file
+            stat: Current stat of the input file
+            metadata: Metadata fields that would be written
+            output_dir: Directory the file would be written to
+
+        Returns:
+            Path to the earlier output, or None if the input's size or
+            modification time changed, the metadata differs, or no output
+            in output_dir still exists
+        """
+        if self.ignore_existing:
+            return None
+        rows = self._connection.execute(
+            "SELECT output FROM parts WHERE input = ? AND size = ? AND mtime_ns = ?"
+            " AND title = ? AND author = ? AND subject = ? AND keywords = ?",
+            (
+                os.path.abspath(input_path),
+                stat.st_size,
+                stat.st_mtime_ns,
+                metadata["Title"],
+                metadata["Author"],
+                metadata["Subject"],
+                metadata["Keywords"],
+            ),
+        )
+        directory = os.path.abspath(output_dir)
+        for row in rows:
+            output_path = Path(row["output"])
+            if output_path.parent == Path(directory) and output_path.exists():
+                return output_path
+        return None
+
+    def record(
+        self,
+        input_path: Path,
+        output_path: Path,
+        components: FilenameComponents,
+        metadata: dict[str, str],
+        content_hash: str,
+        stat: os.stat_result,
+    ) -> None:
+        """
+        Record a part that has just been tagged.
+
+        An earlier record of the same output file is replaced.
+
+        Args:
+            input_path: Input file
+            output_path: Output file written (or found by the manifest)
+            components: Components parsed from the input filename
+            metadata: Metadata fields that were written
+            content_hash: Hash of the input file
+            stat: Stat of the input file
+        """
+        part = format_part_string(components.part).strip()
+        instrument, family = _instrument_of(part)
+        self._pending.append(
+            (
+                os.path.abspath(output_path),
+                os.path.abspath(input_path),
+                components.composer_last_name,
+                components.work_identifier,
+                components.opus,
+                components.movement,
+                part,
+                instrument,
+                family,
+                metadata["Title"],
+                metadata["Author"],
+                metadata["Subject"],
+                metadata["Keywords"],
+                content_hash,
+                stat.st_size,
+                stat.st_mtime_ns,
+            )
+        )
+        if (
+            len(self._pending) >= COMMIT_BATCH
+            or time.monotonic() - self._last_commit >= COMMIT_INTERVAL
+        ):
+            self.commit()
+
+    def commit(self) -> None:
+        """Write the records buffered so far in one transaction."""
+        if not self._pending:
+            return
+        with profiling.stage("catalog_commit"):
+            # The write lock is held only while the batch is inserted, so
+            # processes sharing the catalog rarely wait for each other
+            self._connection.execute("BEGIN IMMEDIATE")
+            try:
+                self._connection.executemany(
+                    "INSERT OR REPLACE INTO parts VALUES "
+                    "(?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    self._pending,
+                )
+                self._connection.execute("COMMIT")
+            except BaseException:
+                self._connection.execute("ROLLBACK")
+                raise
+        self._pending = []
+        self._last_commit = time.monotonic()
+
+    def query(self, limit: int | None = None, **filters: str) -> Iterator[CatalogEntry]:
+        """
+        Find parts by composer, work, family, instrument or part.
+
+        Filters are matched case-insensitively and combined with AND; each
+        is answered from an index. composer and work are the names used in
+        the filenames (e.g. "Brahms", "Symphony04"); part is the formatted
+        part name (e.g. "Horn 1").
+
+        Args:
+            limit: Optional maximum number of entries
+            **filters: Values for any of QUERY_FIELDS
+
+        Yields:
+            Matching CatalogEntry objects, ordered by output path
+
+        Raises:
+            ValueError: If a filter is not one of QUERY_FIELDS
+        """
+        unknown = set(filters) - set(QUERY_FIELDS)
+        if unknown:
+            raise ValueError(f"Cannot query by {', '.join(sorted(unknown))}")
+        where = [f"{field} = ? COLLATE NOCASE" for field in filters]
+        sql = "SELECT * FROM parts"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY output"
+        parameters: list[object] = list(filters.values())
+        if limit is not None:
+            sql += " LIMIT ?"
+            parameters.append(limit)
+        for row in self._connection.execute(sql, parameters):
+            values = dict(row)
+            values["output"] = Path(values["output"])
+            values["input"] = Path(values["input"])
+            yield CatalogEntry(**values)
+
+    def close(self) -> None:
+        """Write buffered records and close the catalog; safe to call repeatedly."""
+        if self._connection is None:
+            return
+        try:
+            self.commit()
+        finally:
+            self._connection.close()
+            self._connection = None
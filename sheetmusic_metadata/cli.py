@@ -1,26 +1,95 @@
-"""Command-line interface using Click."""
+"""
+Command-line interface using Click.
 
+Subsystems that only some runs need (worker pools, the SQLite catalog,
+the composer index) are imported by the functions that use them, so
+that --help and small runs start quickly; tests/test_startup.py keeps
+the import time within a budget.
+"""
+
+import functools
+import io
+import json
+import signal
 import sys
+import time
+from collections import defaultdict, deque
+from collections.abc import Callable, Iterable, Iterator, Sequence
+from contextlib import redirect_stderr, redirect_stdout
+from dataclasses import dataclass
 from pathlib import Path
+from typing import TYPE_CHECKING, TextIO
 
 import click
 
-from sheetmusic_metadata.composer_lookup import ComposerLookup
-from sheetmusic_metadata.formatting import (
-    format_opus_string,
-    format_part_string,
-    format_work_title,
+from sheetmusic_metadata import profiling
+from sheetmusic_metadata.composer_lookup import DEFAULT_FUZZY_THRESHOLD
+from sheetmusic_metadata.dedupe import find_duplicates
+from sheetmusic_metadata.exiftool_session import ExifToolSession
+from sheetmusic_metadata.failures import Failure, FailureReport, describe_error
+from sheetmusic_metadata.instrument_family import (
+    load_instrument_map,
+    set_instrument_map,
+)
+from sheetmusic_metadata.journal import Journal, merge_journal_shards
+from sheetmusic_metadata.manifest import Manifest, hash_file, merge_manifest_shards
+from sheetmusic_metadata.output_index import OutputIndex
+from sheetmusic_metadata.parsing import (
+    DEFAULT_SCHEMA,
+    FilenameSchema,
+    compile_schema,
+    parse_filename,
+)
+from sheetmusic_metadata.pdf_metadata import (
+    BACKENDS,
+    READ_CHUNK_SIZE,
+    apply_pdf_metadata,
+    read_pdf_metadata_many,
+    reuse_tagged_pdf,
+)
+from sheetmusic_metadata.planning import (
+    OutputPlanner,
+    PlanEntry,
+    apply_plan_entry,
+    build_metadata,
+    metadata_differences,
+    read_plan,
+)
+from sheetmusic_metadata.scanning import iter_pdf_files
+from sheetmusic_metadata.sharding import (
+    Shard,
+    parse_shard,
+    shard_of,
+)
+from sheetmusic_metadata.watching import (
+    DEFAULT_POLL_INTERVAL,
+    DEFAULT_SETTLE,
+    DirectoryWatcher,
 )
-from sheetmusic_metadata.instrument_family import get_instrument_family
-from sheetmusic_metadata.parsing import parse_filename
-from sheetmusic_metadata.pdf_metadata import apply_pdf_metadata
+
+if TYPE_CHECKING:
+    from concurrent.futures import ProcessPoolExecutor
+
+    from sheetmusic_metadata.catalog import Catalog
+    from sheetmusic_metadata.composer_lookup import ComposerLookup
+
+# Seconds before the first retry pass of --keep-going; doubled each pass
+RETRY_BACKOFF = 0.5
 
 
 def process_file(
     filepath: Path,
-    composer_lookup: ComposerLookup,
+    composer_lookup: "ComposerLookup",
     output_dir: Path | None = None,
     additional_tags: list[str] | None = None,
+    session: ExifToolSession | None = None,
+    backend: str = "exiftool",
+    manifest: Manifest | None = None,
+    output_index: OutputIndex | None = None,
+    schema: FilenameSchema | None = None,
+    catalog: "Catalog | None" = None,
+    tagged_copies: Sequence[Path] = (),
+    content_hash: str | None = None,
 ) -> Path:
     """
     Process a single PDF file and apply metadata.
@@ -30,6 +99,21 @@ def process_file(
         composer_lookup: ComposerLookup instance
         output_dir: Optional directory to write output file to
         additional_tags: Optional list of additional tags to add to keywords
+        session: Optional exiftool session shared across files
+        backend: Metadata writer backend ("exiftool" or "native")
+        manifest: Optional manifest of earlier runs; files whose content and
+                  metadata match an entry are skipped, new outputs are recorded
+        output_index: Optional index of output names shared across the run
+        schema: Optional filename schema (defaults to DEFAULT_SCHEMA)
+        catalog: Optional catalog; the file is recorded in it, and skipped
+                 if it is unchanged since it was last recorded
+        tagged_copies: Outputs written by this run for inputs with the same
+                       content; the output is linked to or updated from one
+                       of them (see reuse_tagged_pdf) instead of being written
+        content_hash: Optional hash of the file, if already computed
+
+    Returns:
+        Path to the output file (an earlier output if the file was skipped)
 
     Raises:
         ValueError: If filename parsing fails
@@ -40,51 +124,94 @@ def process_file(
     print(f"Processing file: {filename}")
 
     try:
-        components = parse_filename(filename)
+        metadata = build_metadata(filename, composer_lookup, additional_tags, schema)
     except ValueError as e:
         print(f"  Error: {e}", file=sys.stderr)
         print("  Skipping file due to parsing error.", file=sys.stderr)
         print("---")
         raise
 
-    # Lookup composer name (use PDF-compatible format to avoid forScore splitting on commas)
-    full_composer_name = composer_lookup.get_full_name_for_pdf(
-        components.composer_last_name
-    )
+    print(f"Composer: {metadata['Author']}")
+    print(f'Title: "{metadata["Title"]}"')
+    print(f'Keywords (Tags): "{metadata["Keywords"]}"')
 
-    # Format components
-    formatted_work_title = format_work_title(components.work_identifier)
-    formatted_part = format_part_string(components.part)
-    formatted_opus = format_opus_string(components.opus)
-    instrument_family_tag = get_instrument_family(formatted_part)
-
-    # Build PDF metadata
-    pdf_title = f"{formatted_work_title} - {formatted_part} Part"
-    pdf_subject = "Orchestral"
-
-    # Build keywords list
-    keywords = ["Orchestral", formatted_part]
-    if formatted_opus != "NoOp":
-        keywords.append(formatted_opus)
-    keywords.append(instrument_family_tag)
-    if additional_tags:
-        keywords.extend(additional_tags)
-    pdf_keywords = ",".join(keywords)
-
-    print(f"Composer: {full_composer_name}")
-    print(f'Title: "{pdf_title}"')
-    print(f'Keywords (Tags): "{pdf_keywords}"')
-
-    try:
-        output_path = apply_pdf_metadata(
-            filepath,
-            pdf_title,
-            full_composer_name,
-            pdf_subject,
-            pdf_keywords,
-            output_dir,
-        )
-        print("  Successfully applied metadata.")
+    try:
+        previous_output = None
+        skip_reason = "unchanged since an earlier run"
+        if catalog is not None:
+            stat = filepath.stat()
+            previous_output = catalog.lookup_unchanged(
+                filepath,
+                stat,
+                metadata,
+                output_dir if output_dir is not None else filepath.parent,
+            )
+        if previous_output is None and (manifest is not None or catalog is not None):
+            if content_hash is None:
+                with profiling.stage("hash"):
+                    content_hash = hash_file(filepath)
+            if manifest is not None:
+                previous_output = manifest.lookup(
+                    content_hash,
+                    metadata,
+                    output_dir if output_dir is not None else filepath.parent,
+                )
+                if (
+                    previous_output is None
+                    and output_dir is not None
+                    and not tagged_copies
+                ):
+                    # Only outputs this run wrote into the same directory:
+                    # copies in other subdirectories get their own output,
+                    # and --dedupe links copies instead of skipping them
+                    previous_output = manifest.lookup_recorded(
+                        content_hash, metadata, output_dir
+                    )
+                    skip_reason = (
+                        "same content and metadata as a file written by this run"
+                    )
+
+        if previous_output is not None:
+            output_path = previous_output
+            print(f"  Skipping: {skip_reason} (output: '{output_path.name}').")
+        else:
+            if tagged_copies and output_dir is not None:
+                output_path = reuse_tagged_pdf(
+                    filepath,
+                    tagged_copies,
+                    metadata["Title"],
+                    metadata["Author"],
+                    metadata["Subject"],
+                    metadata["Keywords"],
+                    output_dir,
+                    session=session,
+                    backend=backend,
+                    output_index=output_index,
+                )
+            else:
+                output_path = apply_pdf_metadata(
+                    filepath,
+                    metadata["Title"],
+                    metadata["Author"],
+                    metadata["Subject"],
+                    metadata["Keywords"],
+                    output_dir,
+                    session=session,
+                    backend=backend,
+                    output_index=output_index,
+                )
+            if manifest is not None:
+                manifest.record(content_hash, metadata, output_path, filepath)
+            print("  Successfully applied metadata.")
+        if catalog is not None and content_hash is not None:
+            catalog.record(
+                filepath,
+                output_path,
+                parse_filename(filename, schema),
+                metadata,
+                content_hash,
+                stat,
+            )
     except Exception as e:
         print(f"  Error: Failed to apply metadata to '{filename}'.", file=sys.stderr)
         print(f"  {e}", file=sys.stderr)
@@ -95,7 +222,418 @@ def process_file(
     return output_path
 
 
-@click.command()
+@dataclass
+class _FileResult:
+    """Outcome of processing one file in a worker, with its captured log."""
+
+    stdout: str
+    stderr: str
+    output_path: Path | None
+    failed: bool
+    # Measurements for --profile, from Profiler.drain() in the worker
+    profile: dict | None = None
+    # (kind, message, retryable) from describe_error if the file failed
+    error: tuple[str, str, bool] | None = None
+    # (key, surname) of duplicated composer surnames used, for the parent to
+    # warn about once per run (see ComposerLookup.drain_duplicates)
+    duplicates: list[tuple[str, str]] | None = None
+
+
+# Per-process state for --jobs workers, set up by _init_worker
+_worker_state: dict = {}
+
+
+def _init_worker(
+    composers_csv: Path,
+    composer_table: Path | None,
+    output_dir: Path,
+    additional_tags: list[str] | None,
+    backend: str,
+    force: bool,
+    fuzzy_threshold: float,
+    profile: bool,
+    instrument_map: dict[str, str] | None,
+    schema: str,
+    catalog_path: Path | None,
+    shard: Shard | None,
+) -> None:
+    """Attach to the composer table and start an exiftool session in a worker."""
+    from multiprocessing.util import Finalize
+
+    from sheetmusic_metadata.catalog import Catalog
+    from sheetmusic_metadata.composer_lookup import ComposerLookup
+
+    _init_apply_worker(backend, profile, shard)
+    set_instrument_map(instrument_map)
+    catalog = None
+    if catalog_path is not None:
+        # Each worker writes its own batches; WAL lets them share the file
+        catalog = Catalog(catalog_path, ignore_existing=force)
+        Finalize(catalog, catalog.close, exitpriority=10)
+    _worker_state.update(
+        schema=compile_schema(schema),
+        catalog=catalog,
+        # Mapped from the table the parent wrote, so workers share one copy
+        composer_lookup=ComposerLookup(
+            composers_csv, fuzzy_threshold=fuzzy_threshold, table=composer_table
+        ),
+        additional_tags=additional_tags,
+        manifest=Manifest(output_dir, ignore_existing=force, shard=shard),
+    )
+
+
+def _init_apply_worker(backend: str, profile: bool, shard: Shard | None = None) -> None:
+    """Start an exiftool session in a worker that writes metadata."""
+    from multiprocessing.util import Finalize
+
+    if profile:
+        profiling.enable()
+    session = ExifToolSession()
+    # Worker processes skip atexit handlers, so stop exiftool via Finalize
+    Finalize(session, session.close, exitpriority=10)
+    _worker_state.update(
+        session=session, backend=backend, output_index=OutputIndex(shard)
+    )
+
+
+def _capture_log(func: Callable[..., Path], *args: object) -> _FileResult:
+    """Run one file's work, capturing its log block."""
+    stdout = io.StringIO()
+    stderr = io.StringIO()
+    output_path = None
+    error = None
+    with redirect_stdout(stdout), redirect_stderr(stderr):
+        try:
+            with profiling.stage("file"):
+                output_path = func(*args)
+        except Exception as e:
+            # The file's error has already been logged
+            error = describe_error(e)
+    profiler = profiling.get_profiler()
+    return _FileResult(
+        stdout.getvalue(),
+        stderr.getvalue(),
+        output_path,
+        error is not None,
+        profiler.drain() if profiler is not None else None,
+        error,
+    )
+
+
+def _process_in_worker(filepath: Path, output_dir: Path) -> _FileResult:
+    """Run process_file in a worker, capturing its log block."""
+    result = _capture_log(
+        process_file,
+        filepath,
+        _worker_state["composer_lookup"],
+        output_dir,
+        _worker_state["additional_tags"],
+        _worker_state["session"],
+        _worker_state["backend"],
+        _worker_state["manifest"],
+        _worker_state["output_index"],
+        _worker_state["schema"],
+        _worker_state["catalog"],
+    )
+    result.duplicates = _worker_state["composer_lookup"].drain_duplicates()
+    return result
+
+
+def _apply_in_worker(entry: PlanEntry) -> _FileResult:
+    """Run apply_plan_entry in a worker, capturing its log block."""
+    return _capture_log(
+        apply_plan_entry,
+        entry,
+        _worker_state["session"],
+        _worker_state["backend"],
+        _worker_state["output_index"],
+    )
+
+
+def _ordered_results(
+    pool: "ProcessPoolExecutor",
+    func: Callable[..., _FileResult],
+    work: Iterable[tuple],
+    window: int,
+) -> Iterator[tuple[tuple, _FileResult]]:
+    """
+    Submit files to the pool and yield results in submission order.
+
+    `work` yields the argument tuple for `func` for each file and is
+    consumed lazily: at most `window` files are in flight. Results that
+    finish early wait in their futures until every earlier file has been
+    yielded, so log blocks come out whole and in input order.
+
+    Yields:
+        Tuple of (arguments, result) for each file
+    """
+    pending: deque = deque()
+    for args in work:
+        pending.append((args, pool.submit(func, *args)))
+        if len(pending) >= window:
+            args, future = pending.popleft()
+            yield args, future.result()
+    while pending:
+        args, future = pending.popleft()
+        yield args, future.result()
+
+
+def _run_parallel(
+    jobs: int,
+    initializer: Callable[..., None],
+    initargs: tuple,
+    func: Callable[..., _FileResult],
+    work: Iterable[tuple],
+    on_done: Callable[[tuple, Path], None] | None = None,
+    on_error: Callable[[tuple, tuple[str, str, bool]], None] | None = None,
+    on_duplicate: Callable[[str, str], None] | None = None,
+) -> None:
+    """
+    Run work in a pool of worker processes, printing logs in order.
+
+    on_done, if given, is called in this process with the arguments and
+    output path of each file that succeeded. If on_error is given, it is
+    called with the arguments and describe_error() of each file that
+    failed and the run continues; otherwise the first failure ends it.
+    on_duplicate, if given, is called with each duplicated composer
+    surname a worker reports using.
+    """
+    from concurrent.futures import ProcessPoolExecutor
+
+    pool = ProcessPoolExecutor(
+        max_workers=jobs, initializer=initializer, initargs=initargs
+    )
+    try:
+        for args, result in _ordered_results(pool, func, work, jobs * 2):
+            sys.stdout.write(result.stdout)
+            sys.stdout.flush()
+            sys.stderr.write(result.stderr)
+            if on_duplicate is not None:
+                for key, surname in result.duplicates or ():
+                    on_duplicate(key, surname)
+            sys.stderr.flush()
+            if result.profile is not None:
+                profiling.enable().merge(result.profile)
+            if result.failed:
+                if on_error is None:
+                    # Early exit on error; files already in flight finish
+                    sys.exit(1)
+                on_error(args, result.error)
+            elif on_done is not None:
+                on_done(args, result.output_path)
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+def _run_sequential(
+    session: ExifToolSession,
+    func: Callable[..., Path],
+    work: Iterable[tuple],
+    on_done: Callable[[tuple, Path], None] | None = None,
+    on_error: Callable[[tuple, tuple[str, str, bool]], None] | None = None,
+) -> None:
+    """Run work in this process with one exiftool session (see _run_parallel)."""
+    with session:
+        for args in work:
+            try:
+                with profiling.stage("file"):
+                    output_path = func(*args)
+            except Exception as e:
+                if on_error is None:
+                    # Early exit on error (as per requirements)
+                    sys.exit(1)
+                on_error(args, describe_error(e))
+                continue
+            if on_done is not None:
+                on_done(args, output_path)
+
+
+def _retry_failures(
+    report: FailureReport,
+    retries: int,
+    session: ExifToolSession,
+    on_done: Callable[[tuple, Path], None] | None = None,
+) -> None:
+    """
+    Retry the retryable write errors of a --keep-going run in this process.
+
+    Each failure is retried with the function that first processed it (see
+    Failure.retry). Each pass waits RETRY_BACKOFF seconds, doubling every
+    pass, so that transient problems (a busy file server, a crashed
+    exiftool) can clear.
+    """
+    with session:
+        for attempt in range(retries):
+            pending = report.retryable()
+            if not pending:
+                return
+            delay = RETRY_BACKOFF * 2**attempt
+            click.echo(
+                f"Retrying {len(pending)} file(s) in {delay:g}s "
+                f"(retry {attempt + 1} of {retries})...",
+                err=True,
+            )
+            time.sleep(delay)
+            for failure in pending:
+                failure.attempts += 1
+                try:
+                    with profiling.stage("file"):
+                        output_path = failure.retry(*failure.args)
+                except Exception as e:
+                    _, failure.error, failure.retryable = describe_error(e)
+                    continue
+                report.resolve(failure.input)
+                if on_done is not None:
+                    on_done(failure.args, output_path)
+
+
+def _finish_report(report: FailureReport, report_path: Path | None) -> None:
+    """Print the failure summary, write --failure-report and exit."""
+    if len(report) or report.recovered:
+        click.echo(report.summary(), err=True)
+    if report_path is not None:
+        try:
+            report_path.write_text(report.to_json() + "\n", encoding="utf-8")
+        except OSError as e:
+            click.echo(
+                f"Error: Failed to write failure report '{report_path}': {e}",
+                err=True,
+            )
+    sys.exit(report.exit_code())
+
+
+def _write_profile(profile_path: Path, started: float) -> None:
+    """Write the --profile report for this run."""
+    profiler = profiling.get_profiler()
+    if profiler is None:
+        return
+    report = {"wall_s": time.perf_counter() - started, **profiler.report()}
+    try:
+        profile_path.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+    except OSError as e:
+        click.echo(f"Error: Failed to write profile '{profile_path}': {e}", err=True)
+
+
+def _write_plan(
+    plan_file: TextIO,
+    work: Iterable[tuple[Path, Path]],
+    composer_lookup: "ComposerLookup",
+    additional_tags: list[str] | None,
+    schema: FilenameSchema,
+    output_dir: Path,
+    shard: Shard | None = None,
+) -> int:
+    """
+    Write a plan entry for each file without opening any PDF.
+
+    Files whose names cannot be parsed are reported and left out, so one
+    run lists every problem.
+
+    Returns:
+        Number of files that could not be planned
+    """
+    planner = OutputPlanner(shard)
+    planned = 0
+    failed = 0
+    for pdf_file, file_output_dir in work:
+        try:
+            metadata = build_metadata(
+                pdf_file.name, composer_lookup, additional_tags, schema
+            )
+        except ValueError as e:
+            click.echo(f"Error: '{pdf_file.name}': {e}", err=True)
+            failed += 1
+            continue
+        output_path = planner.plan(file_output_dir, pdf_file.name)
+        entry = PlanEntry(pdf_file, output_path, metadata, output_dir)
+        plan_file.write(entry.to_json() + "\n")
+        planned += 1
+    plan_file.flush()
+    click.echo(f"Planned {planned} file(s), {failed} failed.", err=True)
+    return failed
+
+
+def _load_composer_lookup(
+    composers_csv: Path | None, fuzzy_threshold: float
+) -> "ComposerLookup":
+    """
+    Open the composer table, exiting with an error if it cannot be found.
+
+    The table itself is loaded when the first surname is looked up.
+    """
+    from sheetmusic_metadata.composer_lookup import ComposerLookup
+
+    # Determine composers.csv path
+    if composers_csv is None:
+        # Default to composers.csv in the script directory
+        script_dir = Path(__file__).parent.parent
+        composers_csv = script_dir / "composers.csv"
+
+    if not composers_csv.exists():
+        click.echo(
+            f"Error: composers.csv not found at {composers_csv}",
+            err=True,
+        )
+        sys.exit(1)
+
+    # Initialize composer lookup
+    try:
+        return ComposerLookup(composers_csv, fuzzy_threshold=fuzzy_threshold)
+    except Exception as e:
+        click.echo(f"Error: Failed to load composers.csv: {e}", err=True)
+        sys.exit(1)
+
+
+def _load_instrument_map(csv_path: Path | None) -> dict[str, str] | None:
+    """Load and use an --instrument-map file, exiting with an error if invalid."""
+    if csv_path is None:
+        return None
+    try:
+        instrument_map = load_instrument_map(csv_path)
+    except (OSError, ValueError) as e:
+        click.echo(f"Error: Failed to load instrument map '{csv_path}': {e}", err=True)
+        sys.exit(1)
+    set_instrument_map(instrument_map)
+    return instrument_map
+
+
+def _compile_schema(pattern: str) -> FilenameSchema:
+    """Compile a --schema pattern, exiting with an error if it is invalid."""
+    try:
+        return compile_schema(pattern)
+    except ValueError as e:
+        click.echo(f"Error: Invalid --schema: {e}", err=True)
+        sys.exit(1)
+
+
+def _parse_shard(
+    ctx: click.Context, param: click.Parameter, value: str | None
+) -> Shard | None:
+    """Click callback converting a --shard K/N value."""
+    if value is None:
+        return None
+    try:
+        return parse_shard(value)
+    except ValueError as e:
+        raise click.BadParameter(str(e), ctx, param) from e
+
+
+def _open_catalog(catalog_path: Path | None, force: bool = False) -> "Catalog | None":
+    """Open a --catalog database, exiting with an error if it cannot be opened."""
+    if catalog_path is None:
+        return None
+    import sqlite3
+
+    from sheetmusic_metadata.catalog import Catalog
+
+    try:
+        return Catalog(catalog_path, ignore_existing=force)
+    except sqlite3.Error as e:
+        click.echo(f"Error: Failed to open catalog '{catalog_path}': {e}", err=True)
+        sys.exit(1)
+
+
+@click.group(invoke_without_command=True)
 @click.option(
     "-i",
     "--input-dir",
@@ -106,9 +644,15 @@ def process_file(
     "-o",
     "--output-dir",
     type=click.Path(file_okay=False, dir_okay=True, path_type=Path),
-    required=True,
     help="Output directory to write processed PDF files (required when using --input-dir)",
 )
+@click.option(
+    "-r",
+    "--recursive",
+    is_flag=True,
+    help="Also process PDFs in subdirectories, mirroring their relative "
+    "paths under the output directory",
+)
 @click.option(
     "-t",
     "--tag",
@@ -122,41 +666,237 @@ def process_file(
     default=None,
     help="Path to composers.csv file (defaults to composers.csv in script directory)",
 )
+@click.option(
+    "--instrument-map",
+    "instrument_map_csv",
+    type=click.Path(exists=True, dir_okay=False, path_type=Path),
+    default=None,
+    help="CSV file with 'instrument,family' rows adding to or overriding the "
+    "built-in instrument families",
+)
+@click.option(
+    "--schema",
+    "schema_pattern",
+    default=DEFAULT_SCHEMA,
+    show_default=True,
+    help="Filename schema: {composer}, {work}, {opus}, {part} and {movement} "
+    "fields separated by literal text, with [...] around optional sections",
+)
+@click.option(
+    "--catalog",
+    "catalog_path",
+    type=click.Path(dir_okay=False, path_type=Path),
+    default=None,
+    help="Record every tagged part in this SQLite database, for the query "
+    "command; unchanged inputs already recorded are skipped without being read",
+)
+@click.option(
+    "--fuzzy-threshold",
+    type=click.FloatRange(0.0, 1.0),
+    default=DEFAULT_FUZZY_THRESHOLD,
+    show_default=True,
+    help="Minimum similarity for a misspelled composer surname to be matched "
+    "automatically (1.0 accepts only case, accent and punctuation differences)",
+)
+@click.option(
+    "-j",
+    "--jobs",
+    type=click.IntRange(min=1),
+    default=1,
+    show_default=True,
+    help="Number of files to process in parallel worker processes",
+)
+@click.option(
+    "--backend",
+    type=click.Choice(BACKENDS),
+    default="exiftool",
+    show_default=True,
+    help="Metadata writer: exiftool, or native incremental updates "
+    "(falls back to exiftool for encrypted or unsupported PDFs)",
+)
+@click.option(
+    "--force",
+    is_flag=True,
+    help="Reprocess files even if the output directory's manifest shows they "
+    "were already tagged with the same content and metadata",
+)
+@click.option(
+    "--dedupe",
+    is_flag=True,
+    help="Find inputs with identical content (by size, then hash) and write "
+    "each repeat from the first copy's output: as a hardlink or reflink if the "
+    "metadata is the same, otherwise as an incremental update of it (with "
+    "--backend native only; exiftool outputs are rewritten). The whole scan is "
+    "listed, and held in memory, before tagging starts",
+)
+@click.option(
+    "-k",
+    "--keep-going",
+    is_flag=True,
+    help="Continue past files that fail, retry transient write errors at the "
+    "end, and exit with 4 (parse errors) and/or 8 (write errors) added up",
+)
+@click.option(
+    "--retries",
+    type=click.IntRange(min=0),
+    default=2,
+    show_default=True,
+    help="Retry passes over transient write errors with --keep-going",
+)
+@click.option(
+    "--failure-report",
+    "failure_report_path",
+    type=click.Path(dir_okay=False, path_type=Path),
+    default=None,
+    help="With --keep-going, write the parse and write errors to this JSON file",
+)
+@click.option(
+    "--resume",
+    is_flag=True,
+    help="Continue an interrupted run: skip the files the output directory's "
+    "journal records as completed, without reading them",
+)
+@click.option(
+    "--shard",
+    metavar="K/N",
+    default=None,
+    callback=_parse_shard,
+    help="Process only the K-th of N disjoint shards of the input files, chosen "
+    "by a hash of their relative paths, so N machines can share one output "
+    "directory; combine their logs afterwards with merge-shards",
+)
+@click.option(
+    "--plan",
+    "plan_file",
+    type=click.File("w", encoding="utf-8"),
+    default=None,
+    help="Write the metadata and output path planned for every file to this "
+    "JSONL file ('-' for stdout) instead of writing any PDFs",
+)
+@click.option(
+    "--apply-plan",
+    "apply_plan_file",
+    type=click.File("r", encoding="utf-8"),
+    default=None,
+    help="Write the PDFs listed in a plan created with --plan ('-' for stdin); "
+    "--input-dir and --output-dir are not needed",
+)
+@click.option(
+    "--profile",
+    "profile_path",
+    type=click.Path(dir_okay=False, path_type=Path),
+    default=None,
+    help="Write per-stage timings (count, total, p50/p95/p99), bytes read and "
+    "written, and exiftool process counts to this JSON file",
+)
 def main(
     input_dir: Path | None,
-    output_dir: Path,
+    output_dir: Path | None,
+    recursive: bool,
     additional_tags: tuple[str, ...],
     composers_csv: Path | None,
+    instrument_map_csv: Path | None,
+    schema_pattern: str,
+    catalog_path: Path | None,
+    fuzzy_threshold: float,
+    jobs: int,
+    backend: str,
+    force: bool,
+    dedupe: bool,
+    keep_going: bool,
+    retries: int,
+    failure_report_path: Path | None,
+    resume: bool,
+    shard: Shard | None,
+    plan_file: TextIO | None,
+    apply_plan_file: TextIO | None,
+    profile_path: Path | None,
 ) -> None:
     """
     Automates PDF metadata tagging via exiftool based on a filename schema.
 
     Schema: ComposerLastName_WorkIdentifier_Opus_Part.pdf
     Example: Dvorak_Symphony09_Op95_Violin1.pdf
+    Other naming schemas can be selected with --schema.
 
     Processes all PDF files in the input directory and writes them to the output directory.
+    With --recursive, subdirectories are processed too and written to the same
+    relative subdirectories of the output directory.
     If a file already exists in the output directory, a (1), (2), etc. suffix will be added.
-    """
-    # Determine composers.csv path
-    if composers_csv is None:
-        # Default to composers.csv in the script directory
-        script_dir = Path(__file__).parent.parent
-        composers_csv = script_dir / "composers.csv"
+    Files already tagged into the output directory with the same content and
+    metadata (as recorded in its manifest) are skipped; use --force to redo them.
+    Every completed file is also recorded in the output directory's journal,
+    so an interrupted run can be continued with --resume.
 
-    if not composers_csv.exists():
+    With --dedupe, inputs with the same content as an earlier input are
+    written after it, from its output, instead of being tagged again.
+
+    With --plan, nothing is written: the metadata and output path for every
+    file are streamed to a JSONL plan instead. The plan can be reviewed, edited
+    or split, and then written with --apply-plan.
+
+    With --shard K/N, only the K-th of N shards of the input files is
+    processed; run every shard (e.g. on separate machines) into the same
+    output directory, then combine their manifests and journals with
+    "merge-shards".
+
+    Run "watch --help" to keep tagging PDFs as they arrive in a directory.
+    """
+    if click.get_current_context().invoked_subcommand is not None:
+        return
+    if profile_path is not None:
+        profiling.enable()
+        # Written when the command finishes, including early exits on errors
+        click.get_current_context().call_on_close(
+            functools.partial(_write_profile, profile_path, time.perf_counter())
+        )
+    if plan_file is not None and apply_plan_file is not None:
+        click.echo("Error: --plan and --apply-plan cannot be used together.", err=True)
+        sys.exit(1)
+    if failure_report_path is not None and not keep_going:
+        click.echo("Error: --failure-report requires --keep-going.", err=True)
+        sys.exit(1)
+    if resume and (plan_file is not None or apply_plan_file is not None):
         click.echo(
-            f"Error: composers.csv not found at {composers_csv}",
+            "Error: --resume cannot be used with --plan or --apply-plan.", err=True
+        )
+        sys.exit(1)
+    if dedupe and (plan_file is not None or apply_plan_file is not None):
+        click.echo(
+            "Error: --dedupe cannot be used with --plan or --apply-plan.", err=True
+        )
+        sys.exit(1)
+    if shard is not None and apply_plan_file is not None:
+        click.echo(
+            "Error: --shard cannot be used with --apply-plan; split the plan instead.",
             err=True,
         )
         sys.exit(1)
 
-    # Initialize composer lookup
-    try:
-        composer_lookup = ComposerLookup(composers_csv)
-    except Exception as e:
-        click.echo(f"Error: Failed to load composers.csv: {e}", err=True)
+    if apply_plan_file is not None:
+        _apply_plan(
+            apply_plan_file,
+            jobs,
+            backend,
+            profile_path is not None,
+            FailureReport() if keep_going else None,
+            retries,
+            failure_report_path,
+        )
+        return
+
+    if output_dir is None:
+        click.echo(
+            "Error: --output-dir is required. Use --output-dir to specify where "
+            "to write processed PDF files.",
+            err=True,
+        )
         sys.exit(1)
 
+    composer_lookup = _load_composer_lookup(composers_csv, fuzzy_threshold)
+    instrument_map = _load_instrument_map(instrument_map_csv)
+    schema = _compile_schema(schema_pattern)
+
     # Validate input directory
     if input_dir is None:
         click.echo(
@@ -172,6 +912,35 @@ def main(
         )
         sys.exit(1)
 
+    # Convert additional_tags tuple to list
+    tags_list = list(additional_tags) if additional_tags else None
+
+    found = 0
+    resumed = 0
+    journal: Journal | None = None
+
+    def work() -> Iterator[tuple[Path, Path]]:
+        # Files are streamed from the scan, so work starts on the first one
+        # found; each is written under its relative directory
+        nonlocal found, resumed
+        for pdf_file in iter_pdf_files(input_dir, recursive, exclude=output_dir):
+            if (
+                shard is not None
+                and shard_of(pdf_file.relative_to(input_dir), shard[1]) != shard[0]
+            ):
+                continue
+            found += 1
+            if resume and pdf_file in journal:
+                resumed += 1
+                continue
+            yield pdf_file, output_dir / pdf_file.parent.relative_to(input_dir)
+
+    if plan_file is not None:
+        failed = _write_plan(
+            plan_file, work(), composer_lookup, tags_list, schema, output_dir, shard
+        )
+        sys.exit(1 if failed else 0)
+
     # Create output directory if it doesn't exist
     try:
         output_dir.mkdir(parents=True, exist_ok=True)
@@ -181,26 +950,497 @@ def main(
         )
         sys.exit(1)
 
-    # Convert additional_tags tuple to list
-    tags_list = list(additional_tags) if additional_tags else None
+    # Files already tagged into this output directory are skipped by content
+    manifest = Manifest(output_dir, ignore_existing=force, shard=shard)
+    # Conflicting output names are resolved from one listing per directory
+    output_index = OutputIndex(shard)
+
+    catalog = _open_catalog(catalog_path, force)
+
+    # Completed inputs are journaled as they finish, so that a crashed or
+    # interrupted run can be resumed
+    try:
+        journal = Journal(output_dir, resume=resume, shard=shard)
+    except OSError as e:
+        click.echo(f"Error: Failed to open journal '{e.filename}': {e}", err=True)
+        sys.exit(1)
+
+    # With --dedupe, inputs repeating an earlier input's content are held
+    # back, then written from the outputs this run wrote for that content
+    content_hashes: dict[Path, str] = {}
+    tagged_copies: dict[str, list[Path]] = defaultdict(list)
+    earlier_outputs = manifest.outputs() if dedupe else set()
+
+    def record(args: tuple[Path, Path], output_path: Path) -> None:
+        journal.record(args[0], output_path)
+        content_hash = content_hashes.get(args[0])
+        if content_hash is not None and output_path not in earlier_outputs:
+            tagged_copies[content_hash].append(output_path)
+
+    # With --keep-going, failures are collected instead of ending the run
+    report = FailureReport() if keep_going else None
+
+    def record_failure(args: tuple[Path, Path], error: tuple[str, str, bool]) -> None:
+        report.add(Failure(args[0], *error, retry=tag, args=args))
+
+    def record_duplicate_failure(
+        args: tuple[Path, Path], error: tuple[str, str, bool]
+    ) -> None:
+        # Retried as a duplicate, so that it is still linked or updated
+        report.add(Failure(args[0], *error, retry=tag_duplicate, args=args))
 
-    overall_status = 0
+    def tag(pdf_file: Path, file_output_dir: Path) -> Path:
+        return process_file(
+            pdf_file,
+            composer_lookup,
+            file_output_dir,
+            tags_list,
+            session,
+            backend,
+            manifest,
+            output_index,
+            schema,
+            catalog,
+        )
+
+    def tag_duplicate(pdf_file: Path, file_output_dir: Path) -> Path:
+        # If every copy so far was skipped as tagged by an earlier run, there
+        # is nothing new to link to, and the manifest decides as usual
+        content_hash = content_hashes[pdf_file]
+        return process_file(
+            pdf_file,
+            composer_lookup,
+            file_output_dir,
+            tags_list,
+            session,
+            backend,
+            manifest,
+            output_index,
+            schema,
+            catalog,
+            tagged_copies[content_hash],
+            content_hash,
+        )
+
+    # One exiftool process serves the whole run; it is stopped on exit,
+    # including early exits and Ctrl-C
+    session = ExifToolSession()
+
+    composer_table = None
+    if jobs > 1:
+        try:
+            composer_table = composer_lookup.share_table()
+        except OSError:
+            # Unwritable cache directory: each worker loads the index itself
+            pass
 
     try:
         # Process all PDF files in input directory
-        click.echo(f"Processing all PDF files in directory: {input_dir}")
-        pdf_files = list(input_dir.glob("*.pdf"))
-        if not pdf_files:
+        if shard is not None:
+            click.echo(
+                f"Processing shard {shard[0]} of {shard[1]} of the PDF files in "
+                f"directory: {input_dir}"
+            )
+        else:
+            click.echo(f"Processing all PDF files in directory: {input_dir}")
+        items: Iterable[tuple[Path, Path]] = work()
+        repeats: list[tuple[Path, Path]] = []
+        if dedupe:
+            # Every input must be known before any can be told apart as a
+            # duplicate, so the scan is completed first
+            items = list(items)
+            with profiling.stage("dedupe"):
+                duplicates = find_duplicates(pdf_file for pdf_file, _ in items)
+            for duplicate, (original, content_hash) in duplicates.items():
+                content_hashes[duplicate] = content_hashes[original] = content_hash
+            if duplicates:
+                click.echo(
+                    f"Found {len(duplicates)} file(s) with the same content as "
+                    "another input; they are written after it, from its output."
+                )
+            repeats = [item for item in items if item[0] in duplicates]
+            items = [item for item in items if item[0] not in duplicates]
+        if jobs > 1:
+            _run_parallel(
+                jobs,
+                _init_worker,
+                (
+                    composer_lookup.csv_path,
+                    composer_table,
+                    output_dir,
+                    tags_list,
+                    backend,
+                    force,
+                    fuzzy_threshold,
+                    profile_path is not None,
+                    instrument_map,
+                    schema_pattern,
+                    catalog_path,
+                    shard,
+                ),
+                _process_in_worker,
+                items,
+                record,
+                record_failure if keep_going else None,
+                composer_lookup.warn_duplicate,
+            )
+        else:
+            _run_sequential(
+                session,
+                tag,
+                items,
+                record,
+                record_failure if keep_going else None,
+            )
+        if repeats:
+            # Linking or updating a tagged copy is cheap, so no workers
+            _run_sequential(
+                session,
+                tag_duplicate,
+                repeats,
+                record,
+                record_duplicate_failure if keep_going else None,
+            )
+        if report is not None:
+            _retry_failures(report, retries, session, record)
+
+        if not found:
             click.echo(f"No PDF files found in {input_dir}")
+        if resumed:
+            click.echo(
+                f"Resumed: skipped {resumed} file(s) completed by an earlier run."
+            )
+    except KeyboardInterrupt:
+        click.echo("\nInterrupted by user", err=True)
+        sys.exit(130)
+    except Exception as e:
+        click.echo(f"Error: {e}", err=True)
+        sys.exit(1)
+    finally:
+        journal.close()
+        if catalog is not None:
+            catalog.close()
+
+    if report is not None:
+        _finish_report(report, failure_report_path)
+    sys.exit(0)
+
+
+def _apply_plan(
+    plan_file: TextIO,
+    jobs: int,
+    backend: str,
+    profile: bool,
+    report: FailureReport | None = None,
+    retries: int = 0,
+    report_path: Path | None = None,
+) -> None:
+    """Write every PDF listed in a plan, exiting like a normal run."""
+    session = ExifToolSession()
+    output_index = OutputIndex()
+    work = ((entry,) for entry in read_plan(plan_file))
+
+    # Written files are recorded in the manifest and journal of the output
+    # directory they were planned for, as a normal run would record them
+    records: dict[Path, tuple[Manifest, Journal]] = {}
+
+    def apply(entry: PlanEntry) -> Path:
+        return apply_plan_entry(entry, session, backend, output_index)
+
+    def record(args: tuple[PlanEntry], output_path: Path) -> None:
+        entry = args[0]
+        if entry.output_dir is None:
             return
+        if entry.output_dir not in records:
+            # The journal is appended to, so that an interrupted normal run
+            # can still be resumed
+            records[entry.output_dir] = (
+                Manifest(entry.output_dir, ignore_existing=True),
+                Journal(entry.output_dir, resume=True),
+            )
+        manifest, journal = records[entry.output_dir]
+        journal.record(entry.input, output_path)
+        with profiling.stage("hash"):
+            content_hash = hash_file(entry.input)
+        manifest.record(content_hash, entry.metadata, output_path, entry.input)
+
+    def record_failure(args: tuple[PlanEntry], error: tuple[str, str, bool]) -> None:
+        report.add(Failure(args[0].input, *error, retry=apply, args=args))
+
+    on_error = record_failure if report is not None else None
+    try:
+        if jobs > 1:
+            _run_parallel(
+                jobs,
+                _init_apply_worker,
+                (backend, profile),
+                _apply_in_worker,
+                work,
+                record,
+                on_error,
+            )
+        else:
+            _run_sequential(session, apply, work, record, on_error)
+        if report is not None:
+            _retry_failures(report, retries, session, record)
+    except KeyboardInterrupt:
+        click.echo("\nInterrupted by user", err=True)
+        sys.exit(130)
+    except Exception as e:
+        click.echo(f"Error: {e}", err=True)
+        sys.exit(1)
+    finally:
+        for _, journal in records.values():
+            journal.close()
 
-        for pdf_file in sorted(pdf_files):
+    if report is not None:
+        _finish_report(report, report_path)
+    sys.exit(0)
+
+
+@main.command()
+@click.option(
+    "-i",
+    "--input-dir",
+    required=True,
+    type=click.Path(exists=True, file_okay=False, dir_okay=True, path_type=Path),
+    help="Directory to watch for new PDF files",
+)
+@click.option(
+    "-o",
+    "--output-dir",
+    required=True,
+    type=click.Path(file_okay=False, dir_okay=True, path_type=Path),
+    help="Output directory to write tagged PDF files to",
+)
+@click.option(
+    "-t",
+    "--tag",
+    "additional_tags",
+    multiple=True,
+    help="Add custom tags to the keywords field (can be used multiple times)",
+)
+@click.option(
+    "--composers-csv",
+    type=click.Path(exists=True, path_type=Path),
+    default=None,
+    help="Path to composers.csv file (defaults to composers.csv in script directory)",
+)
+@click.option(
+    "--instrument-map",
+    "instrument_map_csv",
+    type=click.Path(exists=True, dir_okay=False, path_type=Path),
+    default=None,
+    help="CSV file with 'instrument,family' rows adding to or overriding the "
+    "built-in instrument families",
+)
+@click.option(
+    "--schema",
+    "schema_pattern",
+    default=DEFAULT_SCHEMA,
+    show_default=True,
+    help="Filename schema: {composer}, {work}, {opus}, {part} and {movement} "
+    "fields separated by literal text, with [...] around optional sections",
+)
+@click.option(
+    "--catalog",
+    "catalog_path",
+    type=click.Path(dir_okay=False, path_type=Path),
+    default=None,
+    help="Record every tagged part in this SQLite database, for the query "
+    "command; unchanged inputs already recorded are skipped without being read",
+)
+@click.option(
+    "--fuzzy-threshold",
+    type=click.FloatRange(0.0, 1.0),
+    default=DEFAULT_FUZZY_THRESHOLD,
+    show_default=True,
+    help="Minimum similarity for a misspelled composer surname to be matched "
+    "automatically",
+)
+@click.option(
+    "--backend",
+    type=click.Choice(BACKENDS),
+    default="exiftool",
+    show_default=True,
+    help="Metadata writer: exiftool, or native incremental updates",
+)
+@click.option(
+    "--settle",
+    type=click.FloatRange(min=0.0),
+    default=DEFAULT_SETTLE,
+    show_default=True,
+    help="Seconds without new arrivals before a batch of files is tagged",
+)
+@click.option(
+    "--poll-interval",
+    type=click.FloatRange(min=0.01),
+    default=DEFAULT_POLL_INTERVAL,
+    show_default=True,
+    help="Seconds between directory listings when polling",
+)
+@click.option(
+    "--polling",
+    "force_polling",
+    is_flag=True,
+    help="Poll the directory instead of using inotify (e.g. for network shares)",
+)
+def watch(
+    input_dir: Path,
+    output_dir: Path,
+    additional_tags: tuple[str, ...],
+    composers_csv: Path | None,
+    instrument_map_csv: Path | None,
+    schema_pattern: str,
+    catalog_path: Path | None,
+    fuzzy_threshold: float,
+    backend: str,
+    settle: float,
+    poll_interval: float,
+    force_polling: bool,
+) -> None:
+    """
+    Tag PDFs as they arrive in a directory, until stopped.
+
+    The composer table is loaded and exiftool is started once, then kept
+    ready for every file. PDFs already in the directory are tagged first;
+    after that each new PDF is tagged once its writer has finished with it
+    (inotify on Linux, otherwise polling until its size stops changing).
+    Files arriving together are tagged as one batch.
+
+    Files already tagged into the output directory with the same content
+    and metadata are skipped, so the watcher can be restarted safely. Only
+    the top level of the input directory is watched. Stop with Ctrl-C or
+    SIGTERM.
+    """
+    if output_dir.resolve() == input_dir.resolve():
+        click.echo(
+            "Error: --output-dir must differ from the watched directory.", err=True
+        )
+        sys.exit(1)
+
+    composer_lookup = _load_composer_lookup(composers_csv, fuzzy_threshold)
+    _load_instrument_map(instrument_map_csv)
+    schema = _compile_schema(schema_pattern)
+    tags_list = list(additional_tags) if additional_tags else None
+
+    try:
+        output_dir.mkdir(parents=True, exist_ok=True)
+    except OSError as e:
+        click.echo(
+            f"Error: Failed to create output directory '{output_dir}': {e}", err=True
+        )
+        sys.exit(1)
+
+    manifest = Manifest(output_dir)
+    output_index = OutputIndex()
+    catalog = _open_catalog(catalog_path)
+    session = ExifToolSession()
+
+    def tag_batch(batch: Iterable[Path]) -> None:
+        failed = 0
+        for pdf_file in batch:
             try:
-                process_file(pdf_file, composer_lookup, output_dir, tags_list)
+                process_file(
+                    pdf_file,
+                    composer_lookup,
+                    output_dir,
+                    tags_list,
+                    session,
+                    backend,
+                    manifest,
+                    output_index,
+                    schema,
+                    catalog,
+                )
             except Exception:
-                overall_status = 1
-                # Early exit on error (as per requirements)
-                sys.exit(1)
+                # Already logged; keep watching
+                failed += 1
+        sys.stdout.flush()
+        if catalog is not None:
+            # Queries see each batch as soon as it is tagged
+            catalog.commit()
+        if failed:
+            click.echo(f"{failed} file(s) could not be tagged.", err=True)
+
+    # Stop cleanly on SIGTERM as on Ctrl-C
+    previous_handler = signal.signal(signal.SIGTERM, signal.default_int_handler)
+    try:
+        with (
+            session,
+            DirectoryWatcher(
+                input_dir,
+                settle=settle,
+                poll_interval=poll_interval,
+                force_polling=force_polling,
+            ) as watcher,
+        ):
+            click.echo(
+                f"Watching {input_dir} for new PDF files ({watcher.mode}). "
+                "Press Ctrl-C to stop."
+            )
+            # Files that arrived before the watcher started
+            tag_batch(iter_pdf_files(input_dir))
+            for batch in watcher.batches():
+                tag_batch(batch)
+    except KeyboardInterrupt:
+        click.echo("\nStopped watching.", err=True)
+    except Exception as e:
+        click.echo(f"Error: {e}", err=True)
+        sys.exit(1)
+    finally:
+        signal.signal(signal.SIGTERM, previous_handler)
+        if catalog is not None:
+            catalog.close()
+
+
+@main.command()
+@click.argument("plan_file", type=click.File("r", encoding="utf-8"))
+@click.option(
+    "--chunk-size",
+    type=click.IntRange(min=1),
+    default=READ_CHUNK_SIZE,
+    show_default=True,
+    help="Files read per exiftool command when the native reader cannot read them",
+)
+def verify(plan_file: TextIO, chunk_size: int) -> None:
+    """
+    Check that the PDFs listed in a plan carry their planned metadata.
+
+    PLAN_FILE is a plan written with --plan ('-' for stdin). The output
+    file of every entry is read, natively where possible and otherwise in
+    batches through a single exiftool command, and compared with the
+    planned Title, Author, Subject and Keywords. Files whose metadata
+    differs or that cannot be read are listed; the exit status is 1 if
+    there are any.
+    """
+    pending: deque[PlanEntry] = deque()
+
+    def outputs() -> Iterator[Path]:
+        for entry in read_plan(plan_file):
+            pending.append(entry)
+            yield entry.output
+
+    matched = differ = unreadable = 0
+    try:
+        with ExifToolSession() as session:
+            for result in read_pdf_metadata_many(outputs(), session, chunk_size):
+                entry = pending.popleft()
+                if result.metadata is None:
+                    unreadable += 1
+                    click.echo(f"Unreadable: {result.path}: {result.error}", err=True)
+                    continue
+                fields = metadata_differences(entry.metadata, result.metadata)
+                if not fields:
+                    matched += 1
+                    continue
+                differ += 1
+                click.echo(f"Differs: {result.path}")
+                for field in fields:
+                    click.echo(
+                        f"  {field}: expected {entry.metadata[field]!r}, "
+                        f"found {result.metadata[field]!r}"
+                    )
     except KeyboardInterrupt:
         click.echo("\nInterrupted by user", err=True)
         sys.exit(130)
@@ -208,7 +1448,119 @@ def main(
         click.echo(f"Error: {e}", err=True)
         sys.exit(1)
 
-    sys.exit(overall_status)
+    total = matched + differ + unreadable
+    click.echo(
+        f"Verified {total} file(s): {matched} match, {differ} differ, "
+        f"{unreadable} unreadable."
+    )
+    sys.exit(1 if differ or unreadable else 0)
+
+
+@main.command()
+@click.option(
+    "--catalog",
+    "catalog_path",
+    required=True,
+    type=click.Path(exists=True, dir_okay=False, path_type=Path),
+    help="Catalog written by a run with --catalog",
+)
+@click.option("--composer", help="Composer surname as in the filenames, e.g. Brahms")
+@click.option("--work", help="Work as in the filenames, e.g. Symphony04")
+@click.option("--family", help="Instrument family, e.g. Brass")
+@click.option("--instrument", help="Instrument, e.g. Horn")
+@click.option("--part", help="Formatted part name, e.g. 'Horn 1'")
+@click.option(
+    "--limit", type=click.IntRange(min=1), default=None, help="List at most N parts"
+)
+@click.option("--json", "as_json", is_flag=True, help="Print one JSON object per part")
+def query(
+    catalog_path: Path,
+    composer: str | None,
+    work: str | None,
+    family: str | None,
+    instrument: str | None,
+    part: str | None,
+    limit: int | None,
+    as_json: bool,
+) -> None:
+    """
+    List the tagged parts recorded in a catalog.
+
+    Filters are case-insensitive and combined, e.g. every Brahms horn part:
+
+        query --catalog library.db --composer Brahms --instrument Horn
+
+    Each part is printed as its output path, title and composer, separated
+    by tabs. No PDF is read.
+    """
+    import sqlite3
+
+    from sheetmusic_metadata.catalog import QUERY_FIELDS, Catalog
+
+    filters = {
+        field: value
+        for field, value in zip(
+            QUERY_FIELDS, (composer, work, family, instrument, part), strict=True
+        )
+        if value is not None
+    }
+    found = 0
+    try:
+        with Catalog(catalog_path) as catalog:
+            for entry in catalog.query(limit, **filters):
+                found += 1
+                if as_json:
+                    values = {**vars(entry)}
+                    values["output"] = str(entry.output)
+                    values["input"] = str(entry.input)
+                    click.echo(json.dumps(values, ensure_ascii=False))
+                else:
+                    click.echo(f"{entry.output}\t{entry.title}\t{entry.author}")
+    except sqlite3.Error as e:
+        click.echo(f"Error: Failed to read catalog '{catalog_path}': {e}", err=True)
+        sys.exit(1)
+    click.echo(f"{found} part(s).", err=True)
+
+
+@main.command("merge-shards")
+@click.argument(
+    "output_dir",
+    type=click.Path(exists=True, file_okay=False, dir_okay=True, path_type=Path),
+)
+def merge_shards(output_dir: Path) -> None:
+    """
+    Combine the manifests and journals written by the shards of a run.
+
+    OUTPUT_DIR is the output directory shared by runs with --shard K/N.
+    Each shard's manifest and journal entries are appended to the main
+    manifest and journal, so that later runs without --shard skip what
+    the shards tagged, and the shard files are removed. Merging is safe to
+    repeat. Shards of which no journal is found are reported.
+    """
+    try:
+        shards, journal_entries = merge_journal_shards(output_dir)
+        manifest_shards, manifest_entries = merge_manifest_shards(output_dir)
+    except OSError as e:
+        click.echo(f"Error: Failed to merge shards: {e}", err=True)
+        sys.exit(1)
+
+    if not shards and not manifest_shards:
+        click.echo(f"No shard files found in {output_dir}")
+        return
+    for count in sorted({count for _, count in shards}):
+        missing = [
+            str(index) for index in range(1, count + 1) if (index, count) not in shards
+        ]
+        if missing:
+            click.echo(
+                f"Warning: no journal found for shard(s) {', '.join(missing)} "
+                f"of {count}.",
+                err=True,
+            )
+    click.echo(
+        f"Merged {len(set(shards) | set(manifest_shards))} shard(s): "
+        f"{journal_entries} journal and {manifest_entries} manifest entries added."
+    )
 
 
 if __name__ == "__main__":
@@ -0,0 +1,154 @@
+"""Cheap file copies: reflink clones, then in-kernel copies, then a plain copy."""
+
+import ctypes
+import errno
+import os
+import shutil
+import sys
+from pathlib import Path
+
+from sheetmusic_metadata import profiling
+
+# ioctl request number of FICLONE from <linux/fs.h>: _IOW(0x94, 9, int)
+_FICLONE = 0x40049409
+
+# Errors meaning "this copy method is not available here", as opposed to
+# a real I/O failure
+_UNSUPPORTED_ERRNOS = {
+    errno.EBADF,
+    errno.EINVAL,
+    errno.ENOSYS,
+    errno.ENOTSUP,
+    errno.EOPNOTSUPP,
+    errno.ENOTTY,
+    errno.EXDEV,
+    errno.EPERM,
+    getattr(errno, "ENOTSOCK", errno.EINVAL),
+}
+
+# Largest chunk handed to copy_file_range / sendfile in one call
+_CHUNK_SIZE = 1 << 30
+
+
+def _reflink_linux(source_fd: int, destination_fd: int) -> bool:
+    """Share the source's extents with the destination (btrfs, XFS, ...)."""
+    import fcntl
+
+    try:
+        fcntl.ioctl(destination_fd, _FICLONE, source_fd)
+    except OSError as e:
+        if e.errno in _UNSUPPORTED_ERRNOS:
+            return False
+        raise
+    return True
+
+
+def _reflink_macos(source: Path, destination: Path) -> bool:
+    """Clone with clonefile(2) on APFS; the destination must not exist yet."""
+    try:
+        clonefile = ctypes.CDLL(None, use_errno=True).clonefile
+    except AttributeError:
+        return False
+    clonefile.argtypes = [ctypes.c_char_p, ctypes.c_char_p, ctypes.c_int]
+    if clonefile(os.fsencode(source), os.fsencode(destination), 0) == 0:
+        return True
+    error = ctypes.get_errno()
+    if error in _UNSUPPORTED_ERRNOS:
+        return False
+    raise OSError(error, os.strerror(error), str(destination))
+
+
+def _copy_in_kernel(
+    copy_chunk, source_fd: int, destination_fd: int, offset: int, size: int
+) -> int:
+    """
+    Copy from offset to size with an in-kernel copy function.
+
+    Returns:
+        Offset reached; less than size if the method is unsupported (when
+        it fails before copying anything) or the source shrank
+    """
+    while offset < size:
+        try:
+            copied = copy_chunk(
+                source_fd, destination_fd, offset, min(size - offset, _CHUNK_SIZE)
+            )
+        except OSError as e:
+            if e.errno in _UNSUPPORTED_ERRNOS:
+                return offset
+            raise
+        if copied == 0:
+            break
+        offset += copied
+    return offset
+
+
+def _copy_file_range(source_fd: int, destination_fd: int, offset: int, count: int):
+    return os.copy_file_range(source_fd, destination_fd, count, offset, offset)
+
+
+def _sendfile(source_fd: int, destination_fd: int, offset: int, count: int):
+    # sendfile writes at the destination's file position
+    os.lseek(destination_fd, offset, os.SEEK_SET)
+    return os.sendfile(destination_fd, source_fd, offset, count)
+
+
+def clone_file(source: Path, destination: Path) -> str:
+    """
+    Copy a file as cheaply as the filesystem allows.
+
+    Tried in order: a reflink clone (FICLONE on Linux, clonefile on macOS),
+    which shares the data blocks and copies nothing; copy_file_range, which
+    copies inside the kernel (server-side on NFS and SMB); sendfile; and
+    finally a plain read/write copy. The destination is created or
+    truncated. The method used is counted for --profile.
+
+    Args:
+        source: File to copy
+        destination: Path of the copy
+
+    Returns:
+        Method used: "reflink", "copy_file_range", "sendfile" or "copy"
+
+    Raises:
+        OSError: If the file cannot be read or written
+    """
+    if sys.platform == "darwin":
+        destination.unlink(missing_ok=True)
+        if _reflink_macos(source, destination):
+            profiling.count("copy_reflink")
+            return "reflink"
+
+    with open(source, "rb") as src, open(destination, "wb") as dst:
+        source_fd = src.fileno()
+        destination_fd = dst.fileno()
+        if sys.platform.startswith("linux") and _reflink_linux(
+            source_fd, destination_fd
+        ):
+            profiling.count("copy_reflink")
+            return "reflink"
+
+        size = os.fstat(source_fd).st_size
+        offset = 0
+        method = "copy"
+        for name, copy_chunk in (
+            ("copy_file_range", _copy_file_range),
+            ("sendfile", _sendfile),
+        ):
+            if not hasattr(os, name):
+                continue
+            offset = _copy_in_kernel(
+                copy_chunk, source_fd, destination_fd, offset, size
+            )
+            if offset > 0:
+                method = name
+            if offset >= size:
+                break
+        else:
+            # Whatever is left (everything, if no in-kernel method works)
+            src.seek(offset)
+            dst.seek(offset)
+            shutil.copyfileobj(src, dst)
+
+    profiling.count(f"copy_{method}")
+    return method
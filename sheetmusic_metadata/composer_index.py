@@ -0,0 +1,411 @@
+"""Compiled composer index cached on disk between runs."""
+
+import csv
+import difflib
+import hashlib
+import heapq
+import os
+import pickle
+import tempfile
+import unicodedata
+from collections import Counter
+from pathlib import Path
+from typing import TYPE_CHECKING, BinaryIO, NamedTuple
+
+if TYPE_CHECKING:
+    from sheetmusic_metadata.composer_table import ComposerTable
+
+# Bump when the cached layout or the duplicate resolution rules change
+INDEX_VERSION = 3
+
+CACHE_DIRNAME = "sheetmusic-metadata"
+
+# Errors reading a cached index that is missing, truncated or written by an
+# incompatible version
+_CACHE_ERRORS = (OSError, pickle.UnpicklingError, EOFError, ValueError, TypeError)
+
+# Fuzzy search limits: posting-list entries visited per query, and how many
+# of the best trigram candidates are scored with difflib
+MAX_POSTINGS_VISITED = 50_000
+MAX_CANDIDATES = 32
+
+
+class ComposerIndex(NamedTuple):
+    """
+    Resolved composer mapping plus the structures used for fuzzy lookups.
+
+    Attributes:
+        names: Lowercased surname -> full name
+        duplicates: Lowercased surname -> (chosen name, ignored name)
+        folded_keys: Folded surnames (see fold_name), one per distinct fold
+        folded_to_key: Folded surname -> lowercased surname in names
+        trigrams: Trigram -> indexes into folded_keys containing it
+    """
+
+    names: dict[str, str]
+    duplicates: dict[str, tuple[str, str]]
+    folded_keys: list[str]
+    folded_to_key: dict[str, str]
+    trigrams: dict[str, list[int]]
+
+
+class _CSVKey(NamedTuple):
+    """Identity of the CSV file an index was built from."""
+
+    path: str
+    size: int
+    mtime_ns: int
+    sha256: str
+
+
+def default_cache_dir() -> Path:
+    """
+    Get the directory for cached composer indexes.
+
+    Returns:
+        $XDG_CACHE_HOME/sheetmusic-metadata, or ~/.cache/sheetmusic-metadata
+    """
+    base = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(base) / CACHE_DIRNAME
+
+
+def _index_path(csv_path: Path, cache_dir: Path) -> Path:
+    """Cache file for a CSV, named after its absolute path."""
+    digest = hashlib.sha256(os.fsencode(csv_path)).hexdigest()[:16]
+    return cache_dir / f"composers-{digest}.pickle"
+
+
+def table_path(csv_path: Path, cache_dir: Path | None = None) -> Path:
+    """
+    File for the shared composer table of a CSV (see composer_table).
+
+    Args:
+        csv_path: Path to composers.csv
+        cache_dir: Directory for cached indexes (defaults to default_cache_dir())
+    """
+    digest = hashlib.sha256(os.fsencode(csv_path.resolve())).hexdigest()[:16]
+    return (cache_dir or default_cache_dir()) / f"composers-{digest}.table"
+
+
+def _hash_csv(csv_path: Path) -> str:
+    with open(csv_path, "rb") as f:
+        return hashlib.file_digest(f, "sha256").hexdigest()
+
+
+def fold_name(name: str) -> str:
+    """
+    Fold a name for accent- and punctuation-insensitive comparison.
+
+    Args:
+        name: Surname as written in a filename or the CSV
+
+    Returns:
+        Casefolded letters and digits with diacritics removed
+        (e.g. "Dvořák" -> "dvorak", "Rimsky-Korsakov" -> "rimskykorsakov")
+    """
+    decomposed = unicodedata.normalize("NFKD", name.casefold())
+    return "".join(c for c in decomposed if c.isalnum())
+
+
+def _trigrams(folded: str) -> set[str]:
+    padded = f"$${folded}$"
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+def _fuzzy_tables(
+    names: dict[str, str],
+) -> tuple[list[str], dict[str, str], dict[str, list[int]]]:
+    """Build the folded-key table and trigram postings for a mapping."""
+    folded_to_key: dict[str, str] = {}
+    for key in names:
+        # setdefault: the first CSV entry wins if two surnames fold together
+        folded_to_key.setdefault(fold_name(key), key)
+    folded_keys = [folded for folded in folded_to_key if folded]
+    trigrams: dict[str, list[int]] = {}
+    for position, folded in enumerate(folded_keys):
+        for gram in _trigrams(folded):
+            trigrams.setdefault(gram, []).append(position)
+    return folded_keys, folded_to_key, trigrams
+
+
+def best_match(index: ComposerIndex, name: str) -> tuple[str, float] | None:
+    """
+    Find the closest surname in the index.
+
+    Candidates are gathered from the trigram postings, rarest trigrams
+    first, visiting at most MAX_POSTINGS_VISITED entries; the
+    MAX_CANDIDATES sharing the most trigrams are then scored with
+    difflib. The cost is therefore bounded regardless of index size.
+
+    Args:
+        index: Composer index
+        name: Surname to look up
+
+    Returns:
+        (lowercased surname in index.names, similarity between 0 and 1),
+        or None if nothing shares a trigram with the name
+    """
+    folded = fold_name(name)
+    if not folded:
+        return None
+    key = index.folded_to_key.get(folded)
+    if key is not None:
+        return key, 1.0
+
+    postings = sorted(
+        (index.trigrams[gram] for gram in _trigrams(folded) if gram in index.trigrams),
+        key=len,
+    )
+    shared: Counter[int] = Counter()
+    visited = 0
+    for posting in postings:
+        if visited and visited + len(posting) > MAX_POSTINGS_VISITED:
+            break
+        shared.update(posting)
+        visited += len(posting)
+    if not shared:
+        return None
+
+    best_key, best_score = "", 0.0
+    for position, _ in heapq.nlargest(
+        MAX_CANDIDATES, shared.items(), key=lambda item: item[1]
+    ):
+        candidate = index.folded_keys[position]
+        score = difflib.SequenceMatcher(None, folded, candidate).ratio()
+        if score > best_score:
+            best_key, best_score = index.folded_to_key[candidate], score
+    return best_key, best_score
+
+
+def build_index(csv_path: Path) -> ComposerIndex:
+    """
+    Parse a composers CSV and resolve duplicate surnames.
+
+    When a surname appears more than once, the more specific full name is
+    kept (see is_more_specific) and the pair is recorded in duplicates so
+    the lookup can warn when that surname is actually used.
+
+    Args:
+        csv_path: Path to composers.csv
+
+    Returns:
+        ComposerIndex with lowercased surnames as keys
+    """
+    names: dict[str, str] = {}
+    duplicates: dict[str, tuple[str, str]] = {}
+    with open(csv_path, encoding="utf-8") as f:
+        reader = csv.DictReader(f)
+        for row in reader:
+            simple_surname = row["simple_surname"].strip()
+            full_name = row["full_name"].strip()
+            key = simple_surname.lower()
+
+            # Handle duplicate surnames
+            if key in names:
+                existing_name = names[key]
+                # Prefer the most specific/complex mapping (longer, more detailed)
+                # This allows minimal definitions for common composers but
+                # specific ones for rarer variants
+                if is_more_specific(full_name, existing_name):
+                    names[key] = full_name
+                    duplicates[key] = (full_name, existing_name)
+                else:
+                    duplicates[key] = (existing_name, full_name)
+            else:
+                names[key] = full_name
+    return ComposerIndex(names, duplicates, *_fuzzy_tables(names))
+
+
+def load_index(csv_path: Path, cache_dir: Path | None = None) -> ComposerIndex:
+    """
+    Load the compiled index for a CSV, rebuilding it only if the CSV changed.
+
+    The cached index is reused without reading the CSV when its path, size
+    and modification time are unchanged. If only the modification time
+    differs (for example after a checkout), the CSV is hashed and the index
+    is still reused when the contents match. Cache read or write failures
+    are ignored and the index is built in memory.
+
+    Args:
+        csv_path: Path to composers.csv
+        cache_dir: Directory for cached indexes (defaults to default_cache_dir())
+
+    Returns:
+        ComposerIndex for the CSV
+
+    Raises:
+        FileNotFoundError: If the CSV does not exist
+    """
+    csv_path = csv_path.resolve()
+    stat = csv_path.stat()
+    cache_dir = cache_dir or default_cache_dir()
+
+    cached_key, index = _read_cache(_index_path(csv_path, cache_dir))
+    if index is not None and _matches(cached_key, csv_path, stat):
+        return index
+
+    sha256 = _hash_csv(csv_path)
+    if index is None or cached_key.sha256 != sha256:
+        index = build_index(csv_path)
+    key = _CSVKey(str(csv_path), stat.st_size, stat.st_mtime_ns, sha256)
+    _write_cache(csv_path, cache_dir, key, index)
+    return index
+
+
+def load_table(csv_path: Path, cache_dir: Path | None = None) -> "ComposerTable":
+    """
+    Map the composer table of a CSV for exact lookups.
+
+    When the cached index is up to date, only its key is unpickled and the
+    table written next to it is mapped, so opening takes the same time
+    whatever the size of the CSV; the fuzzy matching tables stay on disk
+    until load_index is called. Otherwise the index is loaded or rebuilt
+    as by load_index, and the table written from it.
+
+    Args:
+        csv_path: Path to composers.csv
+        cache_dir: Directory for cached indexes (defaults to default_cache_dir())
+
+    Returns:
+        ComposerTable with lowercased surnames as keys
+
+    Raises:
+        FileNotFoundError: If the CSV does not exist
+        OSError: If the table cannot be written
+    """
+    from sheetmusic_metadata.composer_table import ComposerTable, write_table
+
+    csv_path = csv_path.resolve()
+    cache_dir = cache_dir or default_cache_dir()
+    path = table_path(csv_path, cache_dir)
+    if _matches(_read_key(_index_path(csv_path, cache_dir)), csv_path, csv_path.stat()):
+        try:
+            return ComposerTable(path)
+        except (OSError, ValueError):
+            # Removed or damaged: written again below
+            pass
+    index = load_index(csv_path, cache_dir)
+    write_table(path, index.names, index.duplicates)
+    return ComposerTable(path)
+
+
+def _matches(key: _CSVKey | None, csv_path: Path, stat: os.stat_result) -> bool:
+    """True if a cache key was written for the CSV as it is now."""
+    return (
+        key is not None
+        and key.path == str(csv_path)
+        and key.size == stat.st_size
+        and key.mtime_ns == stat.st_mtime_ns
+    )
+
+
+def _load_key(f: BinaryIO) -> _CSVKey | None:
+    """Read the key at the start of a cached index, if of this version."""
+    version, key = pickle.load(f)
+    return _CSVKey(*key) if version == INDEX_VERSION else None
+
+
+def _read_key(index_path: Path) -> _CSVKey | None:
+    try:
+        with open(index_path, "rb") as f:
+            return _load_key(f)
+    except _CACHE_ERRORS:
+        return None
+
+
+def _read_cache(index_path: Path) -> tuple[_CSVKey | None, ComposerIndex | None]:
+    try:
+        with open(index_path, "rb") as f:
+            key = _load_key(f)
+            if key is None:
+                return None, None
+            return key, ComposerIndex(*pickle.load(f))
+    except _CACHE_ERRORS:
+        return None, None
+
+
+def _write_cache(
+    csv_path: Path, cache_dir: Path, key: _CSVKey, index: ComposerIndex
+) -> None:
+    """
+    Write the table and the index atomically so concurrent runs never see a
+    partial file.
+
+    The index file holds two pickles, the key and then the tables, so that
+    load_table can check the key without unpickling the tables. The table
+    is written first: a key that matches the CSV always has its table.
+    """
+    from sheetmusic_metadata.composer_table import write_table
+
+    index_path = _index_path(csv_path, cache_dir)
+    try:
+        write_table(table_path(csv_path, cache_dir), index.names, index.duplicates)
+        fd, tmp_name = tempfile.mkstemp(
+            dir=index_path.parent, prefix=f".{index_path.name}."
+        )
+        try:
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump(
+                    (INDEX_VERSION, tuple(key)), f, protocol=pickle.HIGHEST_PROTOCOL
+                )
+                pickle.dump(tuple(index), f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_name, index_path)
+        except BaseException:
+            os.unlink(tmp_name)
+            raise
+    except OSError:
+        # Read-only home or similar: the index is simply not cached
+        pass
+
+
+def _has_initials(name: str) -> bool:
+    """Check if a name contains initials (e.g., 'J.S.' or 'J. S.')."""
+    # Simple heuristic: check for patterns like "J.S." or "J. S."
+    parts = name.split()
+    for part in parts:
+        if len(part) <= 3 and part.endswith("."):
+            return True
+    return False
+
+
+def is_more_specific(name1: str, name2: str) -> bool:
+    """
+    Determine if name1 is more specific/complex than name2.
+
+    Prefers:
+    1. Longer names (more characters)
+    2. Names without initials (full names are more specific)
+    3. Names with more words/parts
+
+    Args:
+        name1: First name to compare
+        name2: Second name to compare
+
+    Returns:
+        True if name1 is more specific than name2
+    """
+    # Prefer longer names
+    if len(name1) > len(name2):
+        return True
+    if len(name1) < len(name2):
+        return False
+
+    # If same length, prefer names without initials (full names)
+    has_initials1 = _has_initials(name1)
+    has_initials2 = _has_initials(name2)
+
+    if not has_initials1 and has_initials2:
+        return True
+    if has_initials1 and not has_initials2:
+        return False
+
+    # If both have or don't have initials, prefer more words
+    words1 = len(name1.split())
+    words2 = len(name2.split())
+    if words1 > words2:
+        return True
+    if words1 < words2:
+        return False
+
+    # If still equal, prefer name1 (newer entry)
+    return True
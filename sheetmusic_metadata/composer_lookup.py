@@ -1,117 +1,209 @@
 """Composer name lookup from CSV file."""
 
-import csv
+import functools
 import sys
+from collections.abc import Mapping
 from pathlib import Path
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from sheetmusic_metadata.composer_index import ComposerIndex
+    from sheetmusic_metadata.composer_table import ComposerTable
+
+# Similarity at or above which a fuzzy match is used without a warning
+DEFAULT_FUZZY_THRESHOLD = 0.85
+
+# Number of distinct surnames whose fuzzy match result is remembered
+MATCH_CACHE_SIZE = 4096
 
 
 class ComposerLookup:
-    """Handles composer name lookups from CSV file."""
+    """
+    Handles composer name lookups from CSV file.
 
-    def __init__(self, csv_path: Path):
+    Exact surnames are answered from a composer table mapped from the
+    cache directory the first time a surname is looked up (see
+    composer_index.load_table), so creating a lookup that is never used
+    costs nothing and the first lookup does not grow with the CSV. The
+    index with the fuzzy matching tables is only loaded the first time a
+    surname is not found. Alternatively, a lookup attaches to a shared
+    table written by another lookup's share_table (as --jobs workers do),
+    and reports duplicated surnames for that lookup to warn about.
+    """
+
+    def __init__(
+        self,
+        csv_path: Path,
+        cache_dir: Path | None = None,
+        fuzzy_threshold: float = DEFAULT_FUZZY_THRESHOLD,
+        table: Path | None = None,
+    ):
         """
         Initialize composer lookup with CSV file path.
 
+        The CSV is compiled into an index that is cached on disk and only
+        rebuilt when the CSV changes (see composer_index.load_index). The
+        index is loaded on first use.
+
         Args:
             csv_path: Path to composers.csv file
+            cache_dir: Directory for the cached index (defaults to the user
+                       cache directory)
+            fuzzy_threshold: Minimum similarity (0-1) for a misspelled surname
+                             to be matched automatically; closer matches below
+                             it are only suggested in the warning
+            table: Optional table written by share_table for the same CSV,
+                   to attach to instead of loading the index
+
+        Raises:
+            FileNotFoundError: If the CSV does not exist
+            ValueError: If table is not a valid composer table
         """
         self.csv_path = csv_path
-        self._cache: dict[str, str] = {}
-        self._duplicates: dict[str, tuple[str, str]] = {}
-        self._load_composers()
+        self.cache_dir = cache_dir
+        self.fuzzy_threshold = fuzzy_threshold
+        self._index: ComposerIndex | None = None
+        self._table: ComposerTable | None = None
+        self._best_match = functools.lru_cache(maxsize=MATCH_CACHE_SIZE)(
+            self._find_best_match
+        )
+        # Duplicated surnames already warned about, so each is reported once
+        self._warned_duplicates: set[str] = set()
+        # (surname key, surname as written) of duplicated surnames used since
+        # the last drain_duplicates, when collecting them for another process
+        self._used_duplicates: list[tuple[str, str]] | None = None
+        if table is not None:
+            # Imported as a module, so that the name ComposerTable stays the
+            # one imported for type checking
+            from sheetmusic_metadata import composer_table
 
-    def _load_composers(self) -> None:
-        """Load composer mappings from CSV file."""
-        if not self.csv_path.exists():
+            self._table = composer_table.ComposerTable(table)
+            self._used_duplicates = []
+        elif not self.csv_path.exists():
             raise FileNotFoundError(f"composers.csv not found at {self.csv_path}")
 
-        with open(self.csv_path, encoding="utf-8") as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                simple_surname = row["simple_surname"].strip()
-                full_name = row["full_name"].strip()
-
-                # Handle duplicate surnames
-                if simple_surname.lower() in self._cache:
-                    existing_name = self._cache[simple_surname.lower()]
-                    # Prefer the most specific/complex mapping (longer, more detailed)
-                    # This allows minimal definitions for common composers but
-                    # specific ones for rarer variants
-                    if self._is_more_specific(full_name, existing_name):
-                        # New name is more specific - replace
-                        self._cache[simple_surname.lower()] = full_name
-                        # Store duplicate info for later warning when actually used
-                        self._duplicates[simple_surname.lower()] = (
-                            full_name,
-                            existing_name,
-                        )
-                    else:
-                        # Existing name is more specific - keep it
-                        # Store duplicate info for later warning when actually used
-                        self._duplicates[simple_surname.lower()] = (
-                            existing_name,
-                            full_name,
-                        )
-                else:
-                    self._cache[simple_surname.lower()] = full_name
-
-    @staticmethod
-    def _has_initials(name: str) -> bool:
-        """Check if a name contains initials (e.g., 'J.S.' or 'J. S.')."""
-        # Simple heuristic: check for patterns like "J.S." or "J. S."
-        parts = name.split()
-        for part in parts:
-            if len(part) <= 3 and part.endswith("."):
-                return True
-        return False
-
-    @staticmethod
-    def _is_more_specific(name1: str, name2: str) -> bool:
+    def _load_index(self) -> "ComposerIndex":
+        """Return the compiled index, loading it on first use."""
+        if self._index is None:
+            from sheetmusic_metadata.composer_index import load_index
+
+            self._index = load_index(self.csv_path, self.cache_dir)
+        return self._index
+
+    def _open_table(self) -> None:
+        """Map the table on first use, or load the index if it cannot be written."""
+        if self._table is not None or self._index is not None:
+            return
+        from sheetmusic_metadata.composer_index import load_table
+
+        try:
+            self._table = load_table(self.csv_path, self.cache_dir)
+        except (OSError, ValueError):
+            # Unwritable cache directory: the index is built in memory
+            self._load_index()
+
+    @property
+    def _cache(self) -> Mapping[str, str]:
+        """Lowercased surname -> full name, from the table or the index."""
+        self._open_table()
+        if self._table is not None:
+            return self._table
+        return self._load_index().names
+
+    def _find_best_match(self, composer_last_name: str) -> tuple[str, float] | None:
+        from sheetmusic_metadata.composer_index import best_match
+
+        return best_match(self._load_index(), composer_last_name)
+
+    def _ignored_duplicate(self, key: str) -> str | None:
+        """Name ignored for a surname listed more than once, if it is."""
+        self._open_table()
+        if self._table is not None:
+            return self._table.ignored(key)
+        duplicate = self._load_index().duplicates.get(key)
+        return duplicate[1] if duplicate is not None else None
+
+    def share_table(self) -> Path:
+        """
+        Write the resolved composer map as a table other processes can attach to.
+
+        The table is kept in the cache directory and only rewritten when
+        the map changes. Worker processes pass its path as `table` to map
+        it instead of each loading the index.
+
+        Returns:
+            Path of the table file
+
+        Raises:
+            OSError: If the table cannot be written
+        """
+        from sheetmusic_metadata.composer_index import load_table, table_path
+
+        # Writes the table if it is missing or out of date
+        load_table(self.csv_path, self.cache_dir).close()
+        return table_path(self.csv_path, self.cache_dir)
+
+    def drain_duplicates(self) -> list[tuple[str, str]]:
+        """
+        Return and forget the duplicated surnames used so far by an attached lookup.
+
+        An attached lookup does not print duplicate warnings; the process
+        that shared the table passes each (key, surname) pair to its own
+        warn_duplicate, which reports each surname once across all workers.
+        """
+        if not self._used_duplicates:
+            return []
+        used, self._used_duplicates = self._used_duplicates, []
+        return used
+
+    def warn_duplicate(self, key: str, composer_last_name: str) -> None:
+        """
+        Warn, once per surname, that a duplicated surname was used.
+
+        Args:
+            key: Lowercased surname in the map
+            composer_last_name: The surname as it appears in the filename
         """
-        Determine if name1 is more specific/complex than name2.
+        ignored_name = self._ignored_duplicate(key)
+        if ignored_name is None or key in self._warned_duplicates:
+            return
+        self._warned_duplicates.add(key)
+        print(
+            f"Warning: Multiple entries for '{composer_last_name}'. "
+            f"Using more specific '{self._cache[key]}' (ignoring '{ignored_name}').",
+            file=sys.stderr,
+        )
 
-        Prefers:
-        1. Longer names (more characters)
-        2. Names without initials (full names are more specific)
-        3. Names with more words/parts
+    def match(self, composer_last_name: str) -> tuple[str, float] | None:
+        """
+        Find the closest composer for a possibly misspelled or unaccented surname.
 
         Args:
-            name1: First name to compare
-            name2: Second name to compare
+            composer_last_name: The composer's last name as it appears in filename
 
         Returns:
-            True if name1 is more specific than name2
+            (full name, similarity between 0 and 1), where 1.0 means the
+            surname matched exactly once case, accents and punctuation are
+            ignored; None if no surname is similar at all
         """
-        # Prefer longer names
-        if len(name1) > len(name2):
-            return True
-        if len(name1) < len(name2):
-            return False
-
-        # If same length, prefer names without initials (full names)
-        has_initials1 = ComposerLookup._has_initials(name1)
-        has_initials2 = ComposerLookup._has_initials(name2)
-
-        if not has_initials1 and has_initials2:
-            return True
-        if has_initials1 and not has_initials2:
-            return False
-
-        # If both have or don't have initials, prefer more words
-        words1 = len(name1.split())
-        words2 = len(name2.split())
-        if words1 > words2:
-            return True
-        if words1 < words2:
-            return False
-
-        # If still equal, prefer name1 (newer entry)
-        return True
+        clean_key = composer_last_name.strip().lower()
+        if clean_key in self._cache:
+            return self._cache[clean_key], 1.0
+        result = self._best_match(clean_key)
+        if result is None:
+            return None
+        key, score = result
+        return self._cache[key], score
 
     def get_full_name(self, composer_last_name: str) -> str:
         """
         Get full composer name from last name.
 
+        Surnames that are not in the map exactly are matched ignoring case,
+        accents and punctuation, then by similarity (see match). Similar
+        surnames at or above the fuzzy threshold are used with a note;
+        anything less similar falls back with a warning.
+
         Args:
             composer_last_name: The composer's last name as it appears in filename
 
@@ -122,16 +214,29 @@ class ComposerLookup:
         # Trim whitespace and normalize case
         clean_key = composer_last_name.strip().lower()
 
+        suggestion = None
+        if clean_key not in self._cache:
+            result = self._best_match(clean_key)
+            if result is not None:
+                key, score = result
+                if score >= self.fuzzy_threshold:
+                    if score < 1.0:
+                        print(
+                            f"Note: '{composer_last_name}' not found in map. "
+                            f"Using closest match '{self._cache[key]}' "
+                            f"(similarity {score:.2f}).",
+                            file=sys.stderr,
+                        )
+                    clean_key = key
+                else:
+                    suggestion = (self._cache[key], score)
+
         # Warn about duplicates only when actually used
-        if clean_key in self._duplicates:
-            chosen_name, ignored_name = self._duplicates[clean_key]
-            print(
-                f"Warning: Multiple entries for '{composer_last_name}'. "
-                f"Using more specific '{chosen_name}' (ignoring '{ignored_name}').",
-                file=sys.stderr,
-            )
-            # Remove from duplicates so we only warn once per composer
-            del self._duplicates[clean_key]
+        if self._used_duplicates is not None:
+            if self._ignored_duplicate(clean_key) is not None:
+                self._used_duplicates.append((clean_key, composer_last_name))
+        else:
+            self.warn_duplicate(clean_key, composer_last_name)
 
         full_name = self._cache.get(clean_key)
 
@@ -142,11 +247,16 @@ class ComposerLookup:
                 if composer_last_name
                 else composer_last_name
             )
-            print(
+            message = (
                 f"Warning: Full name for '{composer_last_name}' not found in map. "
-                f"Using '{fallback_name}'.",
-                file=sys.stderr,
+                f"Using '{fallback_name}'."
             )
+            if suggestion is not None:
+                message += (
+                    f" Closest match: '{suggestion[0]}' "
+                    f"(similarity {suggestion[1]:.2f})."
+                )
+            print(message, file=sys.stderr)
             return fallback_name
 
         return full_name
@@ -0,0 +1,178 @@
+"""Read-only composer table that worker processes map into memory."""
+
+import bisect
+import mmap
+import os
+import struct
+import tempfile
+from array import array
+from collections.abc import Iterator, Mapping
+from pathlib import Path
+
+# Bump when the file layout changes
+TABLE_VERSION = 1
+
+_MAGIC = b"SMCT"
+# Magic, version, padding, byte-order mark and entry count, in native order:
+# the table is a per-machine cache, like the pickled index
+_HEADER = struct.Struct("=4sHHII")
+_BYTE_ORDER_MARK = 0x01020304
+# Strings stored per entry: surname key, full name, ignored duplicate name
+_FIELDS = 3
+
+
+def encode_table(names: Mapping[str, str], duplicates: Mapping[str, tuple]) -> bytes:
+    """
+    Encode a resolved composer mapping as a table.
+
+    The table is a header, then 3 * count + 1 offsets (unsigned 32-bit
+    integers) into a blob of UTF-8 strings. Entry i's key, full name and
+    ignored duplicate name (empty if the surname is not duplicated) are the
+    blob slices between consecutive offsets 3i to 3i + 3. Entries are sorted
+    by the UTF-8 bytes of their keys, so a key is found by binary search.
+
+    Args:
+        names: Lowercased surname -> full name
+        duplicates: Lowercased surname -> (chosen name, ignored name)
+
+    Returns:
+        Encoded table
+    """
+    entries = sorted(
+        (
+            key.encode(),
+            name.encode(),
+            duplicates[key][1].encode() if key in duplicates else b"",
+        )
+        for key, name in names.items()
+    )
+    offsets = array("I", [0])
+    blob = bytearray()
+    for entry in entries:
+        for field in entry:
+            blob += field
+            offsets.append(len(blob))
+    header = _HEADER.pack(_MAGIC, TABLE_VERSION, 0, _BYTE_ORDER_MARK, len(entries))
+    return header + offsets.tobytes() + blob
+
+
+def write_table(
+    path: Path, names: Mapping[str, str], duplicates: Mapping[str, tuple]
+) -> None:
+    """
+    Write a composer table, unless the file already holds the same table.
+
+    The file is replaced atomically, so processes that have the previous
+    table mapped keep reading it unchanged.
+
+    Args:
+        path: Table file to write
+        names: Lowercased surname -> full name
+        duplicates: Lowercased surname -> (chosen name, ignored name)
+
+    Raises:
+        OSError: If the file cannot be written
+    """
+    data = encode_table(names, duplicates)
+    try:
+        if path.read_bytes() == data:
+            return
+    except OSError:
+        pass
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_name, path)
+    except BaseException:
+        os.unlink(tmp_name)
+        raise
+
+
+class ComposerTable(Mapping[str, str]):
+    """
+    Composer table written by write_table, mapped read-only into memory.
+
+    Opening a table only maps the file: nothing is parsed or copied, and
+    every process that maps it shares the same pages of the page cache.
+    Lookups binary-search the sorted keys, decoding only the strings they
+    compare and return.
+    """
+
+    def __init__(self, path: Path):
+        """
+        Map a table file.
+
+        Args:
+            path: Table file written by write_table
+
+        Raises:
+            OSError: If the file cannot be opened
+            ValueError: If the file is not a table of this version
+        """
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        blob_start = 0
+        if len(self._mmap) >= _HEADER.size:
+            magic, version, _, byte_order_mark, count = _HEADER.unpack_from(self._mmap)
+            blob_start = _HEADER.size + (_FIELDS * count + 1) * 4
+        if (
+            not blob_start
+            or magic != _MAGIC
+            or version != TABLE_VERSION
+            or byte_order_mark != _BYTE_ORDER_MARK
+            or len(self._mmap) < blob_start
+        ):
+            self._mmap.close()
+            raise ValueError(f"'{path}' is not a composer table of this version")
+        self._count = count
+        self._blob_start = blob_start
+        self._offsets = memoryview(self._mmap)[_HEADER.size : blob_start].cast("I")
+
+    def _field(self, entry: int, field: int) -> bytes:
+        position = _FIELDS * entry + field
+        start = self._blob_start + self._offsets[position]
+        return self._mmap[start : self._blob_start + self._offsets[position + 1]]
+
+    def _find(self, key: str) -> int | None:
+        encoded = key.encode()
+        entry = bisect.bisect_left(
+            range(self._count), encoded, key=lambda i: self._field(i, 0)
+        )
+        if entry < self._count and self._field(entry, 0) == encoded:
+            return entry
+        return None
+
+    def __getitem__(self, key: str) -> str:
+        entry = self._find(key)
+        if entry is None:
+            raise KeyError(key)
+        return self._field(entry, 1).decode()
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __iter__(self) -> Iterator[str]:
+        for entry in range(self._count):
+            yield self._field(entry, 0).decode()
+
+    def ignored(self, key: str) -> str | None:
+        """
+        Name ignored in favour of the stored one for a duplicated surname.
+
+        Returns:
+            The less specific full name, or None if the surname is not
+            duplicated (or not in the table)
+        """
+        entry = self._find(key)
+        if entry is None:
+            return None
+        return self._field(entry, 2).decode() or None
+
+    def close(self) -> None:
+        """Unmap the table; safe to call repeatedly."""
+        if self._mmap.closed:
+            return
+        self._offsets.release()
+        self._mmap.close()
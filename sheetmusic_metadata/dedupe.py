@@ -0,0 +1,49 @@
+"""Detection of inputs with byte-identical content, for --dedupe."""
+
+import os
+from collections import defaultdict
+from collections.abc import Iterable
+from pathlib import Path
+
+from sheetmusic_metadata import profiling
+from sheetmusic_metadata.manifest import hash_file
+
+
+def find_duplicates(paths: Iterable[Path]) -> dict[Path, tuple[Path, str]]:
+    """
+    Find inputs whose content repeats that of an earlier input.
+
+    Inputs are grouped by size first, which needs only a stat; only inputs
+    that share their size with another are hashed (streamed, see
+    hash_file), so a library without duplicates costs one stat per file.
+    Files that cannot be read are left out, to fail when they are processed.
+
+    Args:
+        paths: Input files, in processing order
+
+    Returns:
+        Mapping from each duplicate to (the first input with the same
+        content, their content hash); inputs with unique content are absent
+    """
+    by_size: dict[int, list[Path]] = defaultdict(list)
+    for path in paths:
+        try:
+            by_size[os.stat(path).st_size].append(path)
+        except OSError:
+            continue
+
+    duplicates = {}
+    for same_size in by_size.values():
+        if len(same_size) < 2:
+            continue
+        originals: dict[str, Path] = {}
+        for path in same_size:
+            try:
+                with profiling.stage("hash"):
+                    content_hash = hash_file(path)
+            except OSError:
+                continue
+            original = originals.setdefault(content_hash, path)
+            if original is not path:
+                duplicates[path] = (original, content_hash)
+    return duplicates
@@ -0,0 +1,424 @@
+"""Persistent exiftool process using the -stay_open protocol."""
+
+import atexit
+import contextlib
+import subprocess
+import threading
+from typing import TYPE_CHECKING
+
+from sheetmusic_metadata import profiling
+
+if TYPE_CHECKING:
+    import asyncio
+
+EXIFTOOL_NOT_INSTALLED_MESSAGE = (
+    "exiftool is not installed. Please install it to continue.\n"
+    "On macOS with Homebrew, run: brew install exiftool"
+)
+
+# Seconds to wait for exiftool to exit after asking it to stop
+SHUTDOWN_TIMEOUT = 5.0
+
+
+class _ExifToolExited(Exception):
+    """Raised internally when the exiftool child exits mid-command."""
+
+
+class ExifToolSession:
+    """
+    Long-lived exiftool process that executes commands sent over stdin.
+
+    exiftool is started once with ``-stay_open True -@ -`` and each command is
+    written as one argument per line, terminated by ``-execute{N}``. exiftool
+    prints ``{readyN}`` on stdout when the command finishes, and ``-echo4``
+    prints the same sentinel on stderr so both streams can be framed.
+
+    The process is started lazily on the first command, restarted if it
+    crashes, and stopped by ``close()`` (also called on context manager exit
+    and at interpreter exit for the shared default session).
+    """
+
+    def __init__(self, executable: str = "exiftool"):
+        """
+        Initialize the session without starting exiftool.
+
+        Args:
+            executable: Name or path of the exiftool executable
+        """
+        self.executable = executable
+        self._process: subprocess.Popen[bytes] | None = None
+        self._lock = threading.Lock()
+        self._sequence = 0
+
+    def __enter__(self) -> "ExifToolSession":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    @property
+    def running(self) -> bool:
+        """True if the exiftool child process is alive."""
+        return self._process is not None and self._process.poll() is None
+
+    def start(self) -> None:
+        """
+        Start the exiftool process if it is not already running.
+
+        Raises:
+            FileNotFoundError: If exiftool is not installed
+        """
+        if self.running:
+            return
+        self._discard_process()
+        try:
+            self._process = subprocess.Popen(
+                [self.executable, "-stay_open", "True", "-@", "-"],
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                # Keep Ctrl-C away from exiftool so an in-flight write can
+                # finish before close() stops the process
+                start_new_session=True,
+            )
+        except (FileNotFoundError, PermissionError):
+            raise FileNotFoundError(EXIFTOOL_NOT_INSTALLED_MESSAGE)
+        profiling.count("exiftool_processes_started")
+
+    def execute(self, *args: str) -> subprocess.CompletedProcess[str]:
+        """
+        Run one exiftool command in the persistent process.
+
+        The command is retried once in a fresh process if exiftool exits
+        while running it.
+
+        Args:
+            *args: exiftool command-line arguments (one per element)
+
+        Returns:
+            CompletedProcess with decoded stdout and stderr. exiftool does not
+            report an exit status in -stay_open mode, so returncode is 1 when
+            the output contains errors and 0 otherwise.
+
+        Raises:
+            FileNotFoundError: If exiftool is not installed
+            ValueError: If an argument contains a newline
+            RuntimeError: If exiftool exits again after being restarted
+        """
+        for arg in args:
+            if "\n" in arg or "\r" in arg:
+                raise ValueError(f"exiftool arguments cannot contain newlines: {arg!r}")
+
+        profiling.count("exiftool_commands")
+        with self._lock:
+            for attempt in range(2):
+                self.start()
+                try:
+                    stdout, stderr = self._run_command(args)
+                    break
+                except _ExifToolExited:
+                    self._discard_process()
+                    if attempt:
+                        raise RuntimeError("exiftool exited while running a command")
+                except BaseException:
+                    # KeyboardInterrupt or similar mid-command: the protocol
+                    # is out of sync, so stop this process cleanly
+                    self._shutdown()
+                    raise
+
+        returncode = 1 if _output_has_errors(stdout, stderr) else 0
+        return subprocess.CompletedProcess(
+            ["exiftool", *args], returncode, stdout, stderr
+        )
+
+    def _run_command(self, args: tuple[str, ...]) -> tuple[str, str]:
+        """Send a command and read both streams up to the ready sentinel."""
+        assert self._process is not None
+        assert self._process.stdin is not None
+        self._sequence += 1
+        sentinel = f"{{ready{self._sequence}}}"
+        lines = [*args, "-echo4", sentinel, f"-execute{self._sequence}"]
+        try:
+            self._process.stdin.write(("\n".join(lines) + "\n").encode("utf-8"))
+            self._process.stdin.flush()
+        except (BrokenPipeError, OSError) as e:
+            raise _ExifToolExited from e
+
+        # stderr is drained while stdout is read: if exiftool filled the
+        # stderr pipe (e.g. one warning per file of a large -json batch)
+        # before printing the stdout sentinel, reading the streams one after
+        # the other would block both processes
+        stderr_stream = self._process.stderr
+        stderr_result: list = []
+
+        def read_stderr() -> None:
+            try:
+                stderr_result.append(self._read_until(stderr_stream, sentinel))
+            except (_ExifToolExited, OSError, ValueError):
+                # exiftool exited, or the caller discarded the process
+                stderr_result.append(None)
+
+        stderr_reader = threading.Thread(target=read_stderr, daemon=True)
+        stderr_reader.start()
+        # If this raises, the caller stops or discards the process, which
+        # ends the reader at end of file
+        stdout = self._read_until(self._process.stdout, sentinel)
+        stderr_reader.join()
+        stderr = stderr_result[0]
+        if stderr is None:
+            raise _ExifToolExited
+        return stdout, stderr
+
+    @staticmethod
+    def _read_until(stream, sentinel: str) -> str:
+        """Read lines from a pipe until the sentinel line is seen."""
+        marker = sentinel.encode("utf-8")
+        chunks = []
+        while True:
+            line = stream.readline()
+            if not line:
+                raise _ExifToolExited
+            if line.rstrip(b"\r\n") == marker:
+                break
+            chunks.append(line)
+        return b"".join(chunks).decode("utf-8", errors="replace")
+
+    def close(self) -> None:
+        """Ask exiftool to exit and wait for it; safe to call repeatedly."""
+        with self._lock:
+            self._shutdown()
+
+    def _shutdown(self) -> None:
+        if self._process is None:
+            return
+        if self._process.poll() is None:
+            try:
+                self._process.stdin.write(b"-stay_open\nFalse\n")
+                self._process.stdin.flush()
+            except (BrokenPipeError, OSError):
+                pass
+            try:
+                self._process.wait(timeout=SHUTDOWN_TIMEOUT)
+            except subprocess.TimeoutExpired:
+                self._process.kill()
+                self._process.wait()
+        self._discard_process()
+
+    def _discard_process(self) -> None:
+        """Close pipes of a process that has exited (or is being abandoned)."""
+        if self._process is None:
+            return
+        if self._process.poll() is None:
+            self._process.kill()
+            self._process.wait()
+        for stream in (self._process.stdin, self._process.stdout, self._process.stderr):
+            if stream is not None:
+                try:
+                    stream.close()
+                except OSError:
+                    pass
+        self._process = None
+
+
+class AsyncExifToolSession:
+    """
+    asyncio counterpart of ExifToolSession.
+
+    Speaks the same ``-stay_open`` protocol through a child started with
+    ``asyncio.create_subprocess_exec``, so waiting for exiftool never blocks
+    the event loop. Commands on one session run one at a time; use several
+    sessions to keep several exiftool processes busy.
+
+    If a command is cancelled (for example by a timeout) while exiftool is
+    running it, the process is killed, since its output would no longer
+    line up with the next command; the next command starts a fresh one.
+
+    asyncio is imported by the methods that use it rather than by this
+    module, which the command-line tool imports without needing it.
+    """
+
+    def __init__(self, executable: str = "exiftool"):
+        """
+        Initialize the session without starting exiftool.
+
+        Args:
+            executable: Name or path of the exiftool executable
+        """
+        import asyncio
+
+        self.executable = executable
+        self._process: asyncio.subprocess.Process | None = None
+        self._lock = asyncio.Lock()
+        self._sequence = 0
+
+    async def __aenter__(self) -> "AsyncExifToolSession":
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        await self.close()
+
+    @property
+    def running(self) -> bool:
+        """True if the exiftool child process is alive."""
+        return self._process is not None and self._process.returncode is None
+
+    async def start(self) -> None:
+        """
+        Start the exiftool process if it is not already running.
+
+        Raises:
+            FileNotFoundError: If exiftool is not installed
+        """
+        import asyncio
+
+        if self.running:
+            return
+        await self._discard_process()
+        try:
+            self._process = await asyncio.create_subprocess_exec(
+                self.executable,
+                "-stay_open",
+                "True",
+                "-@",
+                "-",
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                start_new_session=True,
+            )
+        except (FileNotFoundError, PermissionError):
+            raise FileNotFoundError(EXIFTOOL_NOT_INSTALLED_MESSAGE)
+        profiling.count("exiftool_processes_started")
+
+    async def execute(self, *args: str) -> subprocess.CompletedProcess[str]:
+        """
+        Run one exiftool command in the persistent process.
+
+        Behaves like ExifToolSession.execute: the command is retried once in
+        a fresh process if exiftool exits while running it.
+
+        Args:
+            *args: exiftool command-line arguments (one per element)
+
+        Returns:
+            CompletedProcess with decoded stdout and stderr, and returncode 1
+            when the output contains errors
+
+        Raises:
+            FileNotFoundError: If exiftool is not installed
+            ValueError: If an argument contains a newline
+            RuntimeError: If exiftool exits again after being restarted
+        """
+        for arg in args:
+            if "\n" in arg or "\r" in arg:
+                raise ValueError(f"exiftool arguments cannot contain newlines: {arg!r}")
+
+        profiling.count("exiftool_commands")
+        async with self._lock:
+            for attempt in range(2):
+                await self.start()
+                try:
+                    stdout, stderr = await self._run_command(args)
+                    break
+                except _ExifToolExited:
+                    await self._discard_process()
+                    if attempt:
+                        raise RuntimeError("exiftool exited while running a command")
+                except BaseException:
+                    # Cancelled mid-command: the protocol is out of sync
+                    await self._discard_process()
+                    raise
+
+        returncode = 1 if _output_has_errors(stdout, stderr) else 0
+        return subprocess.CompletedProcess(
+            ["exiftool", *args], returncode, stdout, stderr
+        )
+
+    async def _run_command(self, args: tuple[str, ...]) -> tuple[str, str]:
+        """Send a command and read both streams up to the ready sentinel."""
+        assert self._process is not None
+        assert self._process.stdin is not None
+        self._sequence += 1
+        sentinel = f"{{ready{self._sequence}}}"
+        lines = [*args, "-echo4", sentinel, f"-execute{self._sequence}"]
+        try:
+            self._process.stdin.write(("\n".join(lines) + "\n").encode("utf-8"))
+            await self._process.stdin.drain()
+        except (BrokenPipeError, ConnectionResetError, OSError) as e:
+            raise _ExifToolExited from e
+
+        import asyncio
+
+        # Both pipes are read at the same time, so a large output on one
+        # cannot stall exiftool while the other is being waited on
+        stdout, stderr = await asyncio.gather(
+            self._read_until(self._process.stdout, sentinel),
+            self._read_until(self._process.stderr, sentinel),
+        )
+        return stdout, stderr
+
+    @staticmethod
+    async def _read_until(stream: "asyncio.StreamReader", sentinel: str) -> str:
+        """Read lines from a pipe until the sentinel line is seen."""
+        marker = sentinel.encode("utf-8")
+        chunks = []
+        while True:
+            line = await stream.readline()
+            if not line:
+                raise _ExifToolExited
+            if line.rstrip(b"\r\n") == marker:
+                break
+            chunks.append(line)
+        return b"".join(chunks).decode("utf-8", errors="replace")
+
+    async def close(self) -> None:
+        """Ask exiftool to exit and wait for it; safe to call repeatedly."""
+        import asyncio
+
+        async with self._lock:
+            if self.running:
+                try:
+                    self._process.stdin.write(b"-stay_open\nFalse\n")
+                    await self._process.stdin.drain()
+                except (BrokenPipeError, ConnectionResetError, OSError):
+                    pass
+                try:
+                    await asyncio.wait_for(self._process.wait(), SHUTDOWN_TIMEOUT)
+                except TimeoutError:
+                    pass
+            await self._discard_process()
+
+    async def _discard_process(self) -> None:
+        """Kill the process if it is still running and wait for it to exit."""
+        process, self._process = self._process, None
+        if process is None:
+            return
+        if process.returncode is None:
+            with contextlib.suppress(ProcessLookupError):
+                process.kill()
+        await process.wait()
+
+
+def _output_has_errors(stdout: str, stderr: str) -> bool:
+    """Check exiftool output for errors (warnings alone are not errors)."""
+    if any(line.strip().startswith("Error:") for line in (stderr + stdout).split("\n")):
+        return True
+    return "files weren't updated" in stdout or "could not be read" in stdout
+
+
+_default_session: ExifToolSession | None = None
+_default_session_lock = threading.Lock()
+
+
+def get_default_session() -> ExifToolSession:
+    """
+    Get the process-wide shared exiftool session.
+
+    The session is created on first use and closed at interpreter exit.
+    """
+    global _default_session
+    with _default_session_lock:
+        if _default_session is None:
+            _default_session = ExifToolSession()
+            atexit.register(_default_session.close)
+        return _default_session
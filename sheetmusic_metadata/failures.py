@@ -0,0 +1,158 @@
+"""Failure collection and reporting for --keep-going runs."""
+
+import json
+import subprocess
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from sheetmusic_metadata.parsing import FilenameError
+
+# Exit status bits of a --keep-going run that had failures
+EXIT_PARSE_ERRORS = 4
+EXIT_WRITE_ERRORS = 8
+
+# Errors that retrying cannot fix: the input or exiftool is missing, a
+# planned output name is taken, or the file system refuses access
+_PERMANENT_ERRORS = (
+    FilenameError,
+    FileNotFoundError,
+    FileExistsError,
+    PermissionError,
+    IsADirectoryError,
+    NotADirectoryError,
+)
+
+
+def describe_error(error: Exception) -> tuple[str, str, bool]:
+    """
+    Classify an error raised while processing one file.
+
+    Args:
+        error: Exception raised by process_file or apply_plan_entry
+
+    Returns:
+        Tuple of (kind, message, retryable); kind is "parse" for filenames
+        that do not follow the schema and "write" for everything else
+    """
+    kind = "parse" if isinstance(error, FilenameError) else "write"
+    message = str(error)
+    if isinstance(error, subprocess.CalledProcessError) and error.output:
+        # exiftool's own error line is more useful than the command line
+        lines = [line.strip() for line in str(error.output).splitlines()]
+        message = next((line for line in lines if line.startswith("Error")), message)
+    return kind, message, not isinstance(error, _PERMANENT_ERRORS)
+
+
+@dataclass
+class Failure:
+    """One file that could not be processed."""
+
+    input: Path
+    kind: str
+    error: str
+    retryable: bool
+    attempts: int = 1
+    # Function that processed the file and its arguments, to call again in
+    # a retry pass
+    retry: Callable[..., Path] | None = field(default=None, repr=False, compare=False)
+    args: tuple = field(default=(), repr=False, compare=False)
+
+
+class FailureReport:
+    """
+    Failures collected during a --keep-going run, by kind.
+
+    Parse errors (filenames that do not follow the schema) are never
+    retried. Write errors that may be transient (exiftool crashing or
+    reporting an error, I/O errors) can be retried at the end of the run;
+    files that succeed on a retry are counted as recovered.
+    """
+
+    def __init__(self) -> None:
+        """Create an empty report."""
+        self._failures: dict[Path, Failure] = {}
+        self.recovered: list[Path] = []
+
+    def __len__(self) -> int:
+        return len(self._failures)
+
+    def add(self, failure: Failure) -> None:
+        """Record a failure, replacing an earlier one for the same input."""
+        self._failures[failure.input] = failure
+
+    def resolve(self, input_path: Path) -> None:
+        """Mark a failed input as recovered by a retry."""
+        if self._failures.pop(input_path, None) is not None:
+            self.recovered.append(input_path)
+
+    @property
+    def parse_errors(self) -> list[Failure]:
+        """Failures caused by filenames that do not follow the schema."""
+        return [f for f in self._failures.values() if f.kind == "parse"]
+
+    @property
+    def write_errors(self) -> list[Failure]:
+        """Failures while writing metadata."""
+        return [f for f in self._failures.values() if f.kind == "write"]
+
+    def retryable(self) -> list[Failure]:
+        """Write errors that may succeed if tried again."""
+        return [f for f in self.write_errors if f.retryable]
+
+    def exit_code(self) -> int:
+        """Exit status: 0, or EXIT_PARSE_ERRORS and/or EXIT_WRITE_ERRORS set."""
+        code = 0
+        if self.parse_errors:
+            code |= EXIT_PARSE_ERRORS
+        if self.write_errors:
+            code |= EXIT_WRITE_ERRORS
+        return code
+
+    def summary(self) -> str:
+        """Human-readable summary listing every failed file."""
+        counts = (
+            f"{len(self.parse_errors)} parse error(s), "
+            f"{len(self.write_errors)} write error(s), "
+            f"{len(self.recovered)} file(s) recovered by retrying."
+        )
+        lines = [counts]
+        for title, failures in (
+            ("Parse errors:", self.parse_errors),
+            ("Write errors:", self.write_errors),
+        ):
+            if failures:
+                lines.append(title)
+                for failure in failures:
+                    attempts = (
+                        f" (after {failure.attempts} attempts)"
+                        if failure.attempts > 1
+                        else ""
+                    )
+                    lines.append(f"  {failure.input}: {failure.error}{attempts}")
+        return "\n".join(lines)
+
+    def to_json(self) -> str:
+        """Serialize the report as a JSON document."""
+
+        def entries(failures: list[Failure]) -> list[dict]:
+            return [
+                {
+                    "input": str(failure.input),
+                    "error": failure.error,
+                    "retryable": failure.retryable,
+                    "attempts": failure.attempts,
+                }
+                for failure in failures
+            ]
+
+        return json.dumps(
+            {
+                "exit_code": self.exit_code(),
+                "parse_errors": entries(self.parse_errors),
+                "write_errors": entries(self.write_errors),
+                "recovered": [str(path) for path in self.recovered],
+            },
+            indent=2,
+            ensure_ascii=False,
+        )
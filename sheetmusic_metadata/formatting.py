@@ -2,6 +2,13 @@
 
 import re
 
+from sheetmusic_metadata.instrument_family import get_instrument_index
+
+# Part names written differently from the instrument map. Piccolo parts
+# have always been titled with a leading space; keep it so that existing
+# libraries are not retagged
+_DISPLAY_NAMES = {"Piccolo": " Piccolo"}
+
 
 def format_work_title(work_identifier: str) -> str:
     """
@@ -30,13 +37,44 @@ def format_work_title(work_identifier: str) -> str:
     return formatted
 
 
+def _spaced_like(name: str, text: str) -> str:
+    """
+    Insert the spaces of an instrument name into the text it was matched in.
+
+    The text keeps its own casing and separators: "doublebass" matched as
+    "Double Bass" becomes "double bass".
+    """
+    # Positions (in letters, ignoring spaces) at which the name has a space
+    word_starts = set()
+    letters = 0
+    for char in name:
+        if char == " ":
+            word_starts.add(letters)
+        else:
+            letters += 1
+    pieces = []
+    letters = 0
+    for char in text:
+        if char in " -_":
+            pieces.append(char)
+            continue
+        if letters in word_starts and pieces and pieces[-1] not in " -_":
+            pieces.append(" ")
+        pieces.append(char)
+        letters += 1
+    return "".join(pieces)
+
+
 def format_part_string(raw_part: str) -> str:
     """
     Format raw part string for display and tagging.
 
+    The part's own casing is kept; only spaces are added.
+
     Handles:
-    - Adding spaces between instrument names and numbers (e.g., "Violin1" -> "Violin 1")
-    - Special compound names: "DoubleBass" -> "Double Bass", "EnglishHorn" -> "English Horn"
+    - Spaces within instrument names from the instrument map:
+      "DoubleBass" -> "Double Bass", "BassClarinet" -> "Bass Clarinet"
+    - Adding spaces between names and numbers (e.g., "Violin1" -> "Violin 1")
     - Piccolo special case: "Piccolo" -> " Piccolo" (adds leading space)
 
     Args:
@@ -45,17 +83,26 @@ def format_part_string(raw_part: str) -> str:
     Returns:
         Formatted part name (e.g., "Violin 1")
     """
-    # Add space before numbers: ([A-Za-z]+)([0-9]+) -> \1 \2
-    formatted = re.sub(r"([A-Za-z]+)([0-9]+)", r"\1 \2", raw_part)
-
-    # Handle special compound names
-    formatted = formatted.replace("DoubleBass", "Double Bass")
-    formatted = formatted.replace("EnglishHorn", "English Horn")
-
-    # Piccolo special case: add leading space
-    formatted = formatted.replace("Piccolo", " Piccolo")
-
-    return formatted
+    index = get_instrument_index()
+    pieces = []
+    position = 0
+    while position < len(raw_part):
+        found = index.match(raw_part, position)
+        if found:
+            name, _, end = found
+            spelled = _spaced_like(name, raw_part[position:end])
+            if spelled == name:
+                spelled = _DISPLAY_NAMES.get(name, name)
+            pieces.append(spelled)
+            position = end
+            continue
+        char = raw_part[position]
+        # Add space before numbers: "Part2" -> "Part 2"
+        if char.isdigit() and position and raw_part[position - 1].isalpha():
+            pieces.append(" ")
+        pieces.append(char)
+        position += 1
+    return "".join(pieces)
 
 
 def format_opus_string(raw_opus: str) -> str:
@@ -1,64 +1,227 @@
 """Instrument family mapping for tagging."""
 
-# Mapping of base instrument names to their families
+import csv
+import functools
+import sys
+from collections.abc import Mapping
+from pathlib import Path
+
+# Mapping of instrument names to their families. Names may contain spaces;
+# they are matched regardless of case and spacing ("BassClarinet" in a
+# filename is "Bass Clarinet")
 INSTRUMENT_FAMILIES: dict[str, str] = {
     "Violin": "Strings",
     "Viola": "Strings",
     "Cello": "Strings",
-    "DoubleBass": "Strings",
+    "Double Bass": "Strings",
+    "Bass": "Strings",  # Orchestral shorthand for the double bass
+    "Piccolo": "Woodwind",
     "Flute": "Woodwind",
+    "Alto Flute": "Woodwind",
     "Oboe": "Woodwind",
+    "English Horn": "Woodwind",
+    "Cor Anglais": "Woodwind",
     "Clarinet": "Woodwind",
+    "Bass Clarinet": "Woodwind",
     "Bassoon": "Woodwind",
+    "Contrabassoon": "Woodwind",
+    "Saxophone": "Woodwind",
+    "Soprano Saxophone": "Woodwind",
+    "Alto Saxophone": "Woodwind",
+    "Tenor Saxophone": "Woodwind",
+    "Baritone Saxophone": "Woodwind",
     "Trumpet": "Brass",
+    "Cornet": "Brass",
     "Horn": "Brass",
     "Trombone": "Brass",
+    "Bass Trombone": "Brass",
+    "Euphonium": "Brass",
     "Tuba": "Brass",
     "Timpani": "Percussion",
     "Percussion": "Percussion",  # For generic percussion parts
+    "Snare Drum": "Percussion",
+    "Bass Drum": "Percussion",
+    "Cymbals": "Percussion",
+    "Glockenspiel": "Percussion",
+    "Xylophone": "Percussion",
     "Harp": "Harp",
     "Piano": "Keyboard",  # For orchestral piano parts
     "Celesta": "Keyboard",
     "Organ": "Keyboard",
+    "Harpsichord": "Keyboard",
 }
 
+# Characters ignored inside instrument names when matching
+_SEPARATORS = frozenset(" -_")
+# Trie key holding the (name, family) of a node that completes a name;
+# never a character of a normalized name
+_END = ""
+
+
+def _starts_word(text: str, position: int) -> bool:
+    """True if a name may start here: after a non-letter or a camelCase hump."""
+    if position == 0:
+        return True
+    previous = text[position - 1]
+    return not previous.isalpha() or (previous.islower() and text[position].isupper())
+
+
+def _ends_word(text: str, position: int) -> bool:
+    """True if a name may end here: "Horn" matches "Horn2" but not "Hornpipe"."""
+    return position == len(text) or not text[position].islower()
+
+
+class InstrumentIndex:
+    """
+    Longest-match index of instrument names.
+
+    Names are stored in a trie keyed on their lowercased characters without
+    separators, so "Bass Clarinet", "BassClarinet" and "bass-clarinet" are
+    the same name. A lookup walks the trie once from its starting position,
+    in time proportional to the length of the name found, and returns the
+    longest name that ends on a word boundary: "Bass Clarinet 1" is a bass
+    clarinet, not a bass.
+    """
+
+    def __init__(self, families: Mapping[str, str]):
+        """
+        Build the index.
+
+        Args:
+            families: Mapping of instrument names to families; a later name
+                      that normalizes like an earlier one replaces it
+        """
+        self._root: dict = {}
+        for name, family in families.items():
+            node = self._root
+            for char in name.lower():
+                if char not in _SEPARATORS:
+                    node = node.setdefault(char, {})
+            node[_END] = (name, family)
+        self.family_of = functools.lru_cache(maxsize=4096)(self._family_of)
+
+    def match(self, text: str, start: int = 0) -> tuple[str, str, int] | None:
+        """
+        Find the longest instrument name at a position of a part string.
+
+        Args:
+            text: Part string, raw ("BassClarinet1") or formatted
+            start: Position the name must start at
+
+        Returns:
+            Tuple of (name, family, end) for the longest name found, where
+            end is the position just after it, or None if there is none
+            (including when start is inside a word)
+        """
+        if not _starts_word(text, start):
+            return None
+        node = self._root
+        found = None
+        for position in range(start, len(text)):
+            char = text[position]
+            if char in _SEPARATORS and position > start:
+                continue
+            node = node.get(char.lower())
+            if node is None:
+                break
+            entry = node.get(_END)
+            if entry is not None and _ends_word(text, position + 1):
+                found = (*entry, position + 1)
+        return found
+
+    def _family_of(self, part: str) -> str | None:
+        """Family of the instrument a part string starts with (memoised)."""
+        text = part.lstrip()
+        found = self.match(text)
+        return found[1] if found is not None else None
+
+
+def load_instrument_map(csv_path: Path) -> dict[str, str]:
+    """
+    Load additional instrument families from a CSV file.
+
+    The file has an "instrument,family" header followed by one instrument
+    per row, e.g. "Flugelhorn,Brass". Entries add to INSTRUMENT_FAMILIES
+    and override it for instruments it already lists.
+
+    Args:
+        csv_path: Path to the CSV file
+
+    Returns:
+        Mapping of instrument names to families
+
+    Raises:
+        OSError: If the file cannot be read
+        ValueError: If the header or a row is invalid
+    """
+    families = {}
+    with open(csv_path, encoding="utf-8", newline="") as f:
+        reader = csv.DictReader(f)
+        if not reader.fieldnames or not {"instrument", "family"} <= set(
+            reader.fieldnames
+        ):
+            raise ValueError("expected an 'instrument,family' header")
+        for row in reader:
+            instrument = (row["instrument"] or "").strip()
+            family = (row["family"] or "").strip()
+            if not instrument or not family:
+                raise ValueError(
+                    f"line {reader.line_num}: instrument and family are required"
+                )
+            families[instrument] = family
+    return families
+
+
+_index = InstrumentIndex(INSTRUMENT_FAMILIES)
+# Instruments already warned about, so each is reported once per process
+_warned: set[str] = set()
+
+
+def set_instrument_map(families: Mapping[str, str] | None) -> None:
+    """
+    Use INSTRUMENT_FAMILIES extended with additional instruments.
+
+    Args:
+        families: Instruments to add or override (e.g. from
+                  load_instrument_map), or None for the built-in map only
+    """
+    global _index
+    _index = InstrumentIndex({**INSTRUMENT_FAMILIES, **(families or {})})
+    _warned.clear()
+
+
+def get_instrument_index() -> InstrumentIndex:
+    """Return the index of the instrument map in use."""
+    return _index
+
 
 def get_instrument_family(formatted_part_string: str) -> str:
     """
     Determine the instrument family tag for a formatted part string.
 
-    Extracts the base instrument name (first word) and looks it up in the
-    instrument families mapping.
+    Looks up the longest instrument name the part starts with, so
+    multi-word instruments such as "Bass Clarinet" are recognized.
 
     Args:
         formatted_part_string: Formatted part name (e.g., "Violin 1")
 
     Returns:
         Instrument family tag (e.g., "Strings")
-        Falls back to base instrument name if not found in mapping
+        Falls back to the first word of the part if no instrument matches
     """
-    # Extract base instrument name (first word)
-    base_instrument_name = formatted_part_string.split()[0]
-
-    # Handle special cases that might have been formatted
-    if base_instrument_name == "Double":
-        # Check if it's "Double Bass"
-        if "Double Bass" in formatted_part_string:
-            base_instrument_name = "DoubleBass"
-    elif base_instrument_name == "English":
-        # Check if it's "English Horn"
-        if "English Horn" in formatted_part_string:
-            base_instrument_name = "EnglishHorn"
-
-    instrument_family = INSTRUMENT_FAMILIES.get(base_instrument_name)
+    instrument_family = _index.family_of(formatted_part_string)
 
     if instrument_family is None:
-        # Fallback: use base instrument name as tag
-        print(
-            f"Warning: Instrument family for '{base_instrument_name}' not found "
-            "in map. Using base name as tag.",
-            file=__import__("sys").stderr,
-        )
+        # Fallback: use base instrument name (first word) as tag
+        words = formatted_part_string.split()
+        base_instrument_name = words[0] if words else formatted_part_string
+        if base_instrument_name not in _warned:
+            _warned.add(base_instrument_name)
+            print(
+                f"Warning: Instrument family for '{base_instrument_name}' not "
+                "found in map. Using base name as tag.",
+                file=sys.stderr,
+            )
         instrument_family = base_instrument_name
 
     return instrument_family
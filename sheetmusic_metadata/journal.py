@@ -0,0 +1,144 @@
+"""Checkpoint journal of inputs completed by a run, for --resume."""
+
+import json
+import os
+import time
+from pathlib import Path
+
+from sheetmusic_metadata import profiling
+from sheetmusic_metadata.sharding import Shard, merge_shard_files, shard_filename
+
+JOURNAL_FILENAME = ".sheetmusic-journal.jsonl"
+
+# The journal is fsynced after this many entries ...
+FSYNC_BATCH = 256
+# ... or once this many seconds have passed since the last fsync
+FSYNC_INTERVAL = 1.0
+
+
+def journal_key(input_path: Path) -> str:
+    """Key of an input in the journal: its absolute path, without any stat."""
+    return os.path.abspath(input_path)
+
+
+class Journal:
+    """
+    Append-only record of the inputs a run has finished, with their outputs.
+
+    Each line is a JSON object with the absolute input path and the output
+    path. Entries are appended with one write each, so they survive the
+    process being killed, and fsynced in batches (every FSYNC_BATCH
+    entries or FSYNC_INTERVAL seconds, and on close) so that a crash of
+    the whole machine loses at most the last moments of work.
+
+    Only one process may write a journal: with --jobs, the parent records
+    results as the workers report them, and each shard of a sharded run
+    has its own journal file.
+    """
+
+    def __init__(
+        self, output_dir: Path, resume: bool = False, shard: Shard | None = None
+    ):
+        """
+        Open the journal of an output directory.
+
+        Args:
+            output_dir: Output directory holding the journal file
+            resume: If True, load the entries of the interrupted run and
+                    append to them; otherwise start a new journal
+            shard: Optional (K, N) shard, to use that shard's journal file
+
+        Raises:
+            OSError: If the journal file cannot be opened
+        """
+        self.path = output_dir / shard_filename(JOURNAL_FILENAME, shard)
+        self._completed: set[str] = set()
+        if resume:
+            self._load()
+        flags = os.O_WRONLY | os.O_APPEND | os.O_CREAT
+        if not resume:
+            flags |= os.O_TRUNC
+        self._fd: int | None = os.open(self.path, flags, 0o644)
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def _load(self) -> None:
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        self._completed.add(json.loads(line)["input"])
+                    except (ValueError, KeyError, TypeError):
+                        # A crash mid-write can leave a partial last line
+                        continue
+        except FileNotFoundError:
+            pass
+
+    def __enter__(self) -> "Journal":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self._completed)
+
+    def __contains__(self, input_path: Path) -> bool:
+        """True if the input was completed by this or the interrupted run."""
+        return journal_key(input_path) in self._completed
+
+    def record(self, input_path: Path, output_path: Path) -> None:
+        """
+        Append an entry for an input that has been completed.
+
+        Args:
+            input_path: Input file
+            output_path: Output file written (or found by the manifest)
+        """
+        key = journal_key(input_path)
+        self._completed.add(key)
+        line = json.dumps(
+            {"input": key, "output": str(output_path)}, ensure_ascii=False
+        )
+        os.write(self._fd, (line + "\n").encode("utf-8"))
+        self._unsynced += 1
+        if (
+            self._unsynced >= FSYNC_BATCH
+            or time.monotonic() - self._last_sync >= FSYNC_INTERVAL
+        ):
+            self.sync()
+
+    def sync(self) -> None:
+        """Flush the entries written so far to disk."""
+        if self._fd is None or not self._unsynced:
+            return
+        with profiling.stage("journal_fsync"):
+            os.fsync(self._fd)
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def close(self) -> None:
+        """Sync and close the journal; safe to call repeatedly."""
+        if self._fd is None:
+            return
+        try:
+            self.sync()
+        finally:
+            os.close(self._fd)
+            self._fd = None
+
+
+def merge_journal_shards(output_dir: Path) -> tuple[list[Shard], int]:
+    """
+    Append the entries of the shards' journals to the main journal.
+
+    Args:
+        output_dir: Output directory shared by the shards
+
+    Returns:
+        Tuple of (shards merged, entries added)
+
+    Raises:
+        OSError: If a journal cannot be read or written
+    """
+    return merge_shard_files(output_dir, JOURNAL_FILENAME, lambda entry: entry["input"])
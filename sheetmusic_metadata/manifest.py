@@ -0,0 +1,224 @@
+"""Manifest of processed files, keyed by input content hash."""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+
+from sheetmusic_metadata import profiling
+from sheetmusic_metadata.sharding import Shard, merge_shard_files, shard_filename
+
+MANIFEST_FILENAME = ".sheetmusic-manifest.jsonl"
+
+
+def hash_file(filepath: Path) -> str:
+    """
+    Compute the SHA-256 hex digest of a file's contents.
+
+    Args:
+        filepath: Path to the file
+
+    Returns:
+        Hex digest string
+    """
+    with open(filepath, "rb") as f:
+        digest = hashlib.file_digest(f, "sha256").hexdigest()
+        profiling.add_bytes(read=f.tell())
+    return digest
+
+
+class Manifest:
+    """
+    Record of inputs already tagged into an output directory.
+
+    Each line of the manifest file is a JSON object with the input content
+    hash, the metadata written, the output path (relative to the output
+    directory) and the input path. Lookups are keyed by content and
+    metadata, not by input path, so moved or renamed inputs are still
+    recognised; with --recursive, a copy of an input in another
+    subdirectory still gets its own output there (see lookup).
+
+    Entries recorded while the manifest is open are kept apart from those
+    loaded (see lookup_recorded).
+
+    A shard records into its own manifest file, since appends from several
+    machines to one file on a network share are not atomic; it also reads
+    the main manifest, into which merge_shard_files combines the shards'.
+    """
+
+    def __init__(
+        self,
+        output_dir: Path,
+        ignore_existing: bool = False,
+        shard: Shard | None = None,
+    ):
+        """
+        Load the manifest for an output directory.
+
+        Args:
+            output_dir: Output directory holding the manifest file
+            ignore_existing: If True, do not load earlier entries (new
+                             entries are still recorded)
+            shard: Optional (K, N) shard, to record into that shard's file
+        """
+        self.output_dir = output_dir
+        self.path = output_dir / shard_filename(MANIFEST_FILENAME, shard)
+        # key -> {output: input, or None for entries without one}
+        self._entries: dict[tuple[str, ...], dict[str, str | None]] = {}
+        # (key, output subdirectory) -> output, for entries recorded since
+        # the manifest was loaded
+        self._recorded: dict[tuple[tuple[str, ...], str], str] = {}
+        if not ignore_existing:
+            self._load(output_dir / MANIFEST_FILENAME)
+            if shard is not None:
+                self._load(self.path)
+
+    def _load(self, path: Path) -> None:
+        try:
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                        key = self._key(entry["hash"], entry["metadata"])
+                        outputs = self._entries.setdefault(key, {})
+                        outputs[entry["output"]] = entry.get("input")
+                    except (ValueError, KeyError, TypeError):
+                        # A run killed mid-write can leave a partial last line
+                        continue
+        except FileNotFoundError:
+            pass
+
+    @staticmethod
+    def _key(content_hash: str, metadata: dict[str, str]) -> tuple[str, ...]:
+        return (content_hash, *sorted(metadata.items()))
+
+    def __len__(self) -> int:
+        loaded = {
+            (key, output)
+            for key, outputs in self._entries.items()
+            for output in outputs
+        }
+        recorded = {(key, output) for (key, _), output in self._recorded.items()}
+        return len(loaded | recorded)
+
+    def outputs(self) -> set[Path]:
+        """Output files of the entries loaded and recorded so far."""
+        loaded = [output for outputs in self._entries.values() for output in outputs]
+        outputs = [*loaded, *self._recorded.values()]
+        return {self.output_dir / output for output in outputs}
+
+    def lookup(
+        self, content_hash: str, metadata: dict[str, str], directory: Path
+    ) -> Path | None:
+        """
+        Find the output of an earlier run for the same content and metadata.
+
+        Only the entries loaded when the manifest was opened are searched.
+        An output in another directory is only used if the input it was
+        written from no longer exists, i.e. the input was moved; a copy of
+        an input that is still there gets its own output.
+
+        Args:
+            content_hash: Hash of the input file (see hash_file)
+            metadata: Metadata fields that would be written
+            directory: Directory the output would be written to
+
+        Returns:
+            Path to the earlier output, or None if there is no matching entry
+            whose output file still exists
+        """
+        subdirectory = os.path.relpath(directory, self.output_dir)
+        moved = None
+        outputs = self._entries.get(self._key(content_hash, metadata), {})
+        for output, input_path in outputs.items():
+            output_path = self.output_dir / output
+            if not output_path.exists():
+                continue
+            if os.path.relpath(output_path.parent, self.output_dir) == subdirectory:
+                return output_path
+            if (
+                moved is None
+                and input_path is not None
+                and not os.path.exists(input_path)
+            ):
+                moved = output_path
+        return moved
+
+    def lookup_recorded(
+        self, content_hash: str, metadata: dict[str, str], directory: Path
+    ) -> Path | None:
+        """
+        Find an output recorded since loading, in a directory, for the same
+        content and metadata.
+
+        Args:
+            content_hash: Hash of the input file (see hash_file)
+            metadata: Metadata fields that would be written
+            directory: Directory the output would be written to
+
+        Returns:
+            Path to the output, or None if none was recorded into directory
+            or its output file no longer exists
+        """
+        subdirectory = os.path.relpath(directory, self.output_dir)
+        output = self._recorded.get((self._key(content_hash, metadata), subdirectory))
+        if output is None:
+            return None
+        output_path = self.output_dir / output
+        return output_path if output_path.exists() else None
+
+    def record(
+        self,
+        content_hash: str,
+        metadata: dict[str, str],
+        output_path: Path,
+        input_path: Path | None = None,
+    ) -> None:
+        """
+        Append an entry for a file that has just been written.
+
+        Each entry is written with a single append so that several worker
+        processes can share one manifest file.
+
+        Args:
+            content_hash: Hash of the input file
+            metadata: Metadata fields that were written
+            output_path: Path of the output file
+            input_path: Optional input file, to tell later runs whether an
+                        input with the same content was moved or copied
+        """
+        output = os.path.relpath(output_path, self.output_dir)
+        subdirectory = os.path.relpath(output_path.parent, self.output_dir)
+        self._recorded[(self._key(content_hash, metadata), subdirectory)] = output
+        entry = {"hash": content_hash, "metadata": metadata, "output": output}
+        if input_path is not None:
+            entry["input"] = os.path.abspath(input_path)
+        line = json.dumps(entry, ensure_ascii=False)
+        fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, (line + "\n").encode("utf-8"))
+        finally:
+            os.close(fd)
+
+
+def merge_manifest_shards(output_dir: Path) -> tuple[list[Shard], int]:
+    """
+    Append the entries of the shards' manifests to the main manifest.
+
+    Args:
+        output_dir: Output directory shared by the shards
+
+    Returns:
+        Tuple of (shards merged, entries added)
+
+    Raises:
+        OSError: If a manifest cannot be read or written
+    """
+    return merge_shard_files(
+        output_dir,
+        MANIFEST_FILENAME,
+        lambda entry: (
+            Manifest._key(entry["hash"], entry["metadata"]),
+            entry["output"],
+        ),
+    )
@@ -0,0 +1,111 @@
+"""Index of output directory names for O(1) conflict-free output paths."""
+
+import os
+import re
+import threading
+from pathlib import Path
+
+from sheetmusic_metadata.sharding import Shard, shard_counter
+
+# "Name (3)" -> ("Name", "3"), as written for conflicting outputs
+_COUNTER_PATTERN = re.compile(r"^(.*) \((\d+)\)$")
+
+
+def reserve_path(path: Path) -> bool:
+    """
+    Atomically create an empty placeholder file at path.
+
+    Returns:
+        True if the placeholder was created, False if the path already exists
+    """
+    try:
+        fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o644)
+    except FileExistsError:
+        return False
+    os.close(fd)
+    return True
+
+
+class OutputIndex:
+    """
+    Highest "(N)" conflict suffix per file name in each output directory.
+
+    A directory is listed once, the first time a name is reserved in it;
+    after that the next free suffix for a name is known without probing
+    "(1)", "(2)", ... one stat at a time. The index is only a hint: every
+    name is still claimed with O_CREAT|O_EXCL, and a name taken by another
+    process (or created after the listing) just moves on to the next
+    suffix. Reservations are safe across threads and processes.
+
+    Use one index per run: files deleted from the output directory during
+    the run are not noticed, so their suffixes are not reused.
+
+    With a shard, only the suffixes belonging to that shard are used (see
+    shard_counter), so shards running on different machines never race
+    for the same name.
+    """
+
+    def __init__(self, shard: Shard | None = None) -> None:
+        """
+        Create an empty index; directories are listed on first use.
+
+        Args:
+            shard: Optional (K, N) shard whose suffixes to use
+        """
+        self.shard = shard
+        self._lock = threading.Lock()
+        # directory -> {(stem, suffix): highest counter seen}
+        self._directories: dict[Path, dict[tuple[str, str], int]] = {}
+
+    def _counters(self, output_dir: Path) -> dict[tuple[str, str], int]:
+        counters = self._directories.get(output_dir)
+        if counters is None:
+            counters = {}
+            with os.scandir(output_dir) as entries:
+                for entry in entries:
+                    if not entry.name.startswith("."):
+                        self._note(counters, Path(entry.name))
+            self._directories[output_dir] = counters
+        return counters
+
+    @staticmethod
+    def _note(counters: dict[tuple[str, str], int], name: Path) -> None:
+        match = _COUNTER_PATTERN.match(name.stem)
+        if match is None:
+            return
+        key = (match.group(1), name.suffix)
+        counters[key] = max(counters.get(key, 0), int(match.group(2)))
+
+    def reserve(self, output_dir: Path, filename: str) -> tuple[Path, bool]:
+        """
+        Reserve a unique output path, appending (1), (2), etc. if needed.
+
+        The chosen path is created as an empty placeholder, which the caller
+        must replace with the real file or remove on failure.
+
+        Args:
+            output_dir: Existing directory to write the file to
+            filename: Original filename
+
+        Returns:
+            Tuple of (output_path, was_conflict) where was_conflict is True
+            if the name was taken and a suffix was added
+        """
+        output_path = output_dir / filename
+        if reserve_path(output_path):
+            with self._lock:
+                if output_dir in self._directories:
+                    self._note(self._directories[output_dir], output_path)
+            return (output_path, False)
+
+        stem = output_path.stem
+        suffix = output_path.suffix
+        with self._lock:
+            counters = self._counters(output_dir)
+            counter = shard_counter(counters.get((stem, suffix), 0) + 1, self.shard)
+            while True:
+                new_path = output_dir / f"{stem} ({counter}){suffix}"
+                if reserve_path(new_path):
+                    counters[(stem, suffix)] = counter
+                    return (new_path, True)
+                counter = shard_counter(counter + 1, self.shard)
@@ -1,10 +1,18 @@
 """Filename parsing module for extracting components from PDF filenames."""
 
+import functools
+import os
+import re
+import sys
 from dataclasses import dataclass
 from pathlib import Path
 
 
-@dataclass
+class FilenameError(ValueError):
+    """Raised when a filename does not follow the naming schema."""
+
+
+@dataclass(frozen=True, slots=True)
 class FilenameComponents:
     """Parsed components from a PDF filename."""
 
@@ -12,59 +20,187 @@ class FilenameComponents:
     work_identifier: str
     opus: str
     part: str
+    movement: str = ""
+
+
+# Schema fields and the FilenameComponents attributes they fill
+SCHEMA_FIELDS = {
+    "composer": "composer_last_name",
+    "work": "work_identifier",
+    "opus": "opus",
+    "part": "part",
+    "movement": "movement",
+}
+# Fields every schema must contain and every filename must fill
+REQUIRED_FIELDS = ("composer", "work", "part")
+
+# Composer_Work_Opus_Part.pdf, or Composer_Work_Part.pdf without an opus
+DEFAULT_SCHEMA = "{composer}_{work}[_{opus}]_{part}"
+
+# A {field} placeholder, an optional section, or a run of literal text
+_SCHEMA_TOKEN = re.compile(r"\{(\w*)\}|(\[)|(\])|([^{}\[\]]+)|(.)")
+
+
+def _stem(filename: str) -> str:
+    """Path(filename).stem, without building a Path for plain names."""
+    if os.sep in filename or (os.altsep and os.altsep in filename):
+        return Path(filename).stem
+    stem, _, suffix = filename.rpartition(".")
+    # No suffix for "name", ".hidden" or "name."
+    return stem if stem and suffix else filename
+
+
+class FilenameSchema:
+    """
+    A filename schema compiled to a single regular expression.
+
+    A schema is the filename stem with {field} placeholders for composer,
+    work, opus, part and movement; text between placeholders is matched
+    literally, and [...] marks an optional section. Field values cannot
+    contain any of the literal characters of the schema, so with the
+    default schema "{composer}_{work}[_{opus}]_{part}" a name splits on
+    underscores into three or four fields. Files without an opus get
+    "NoOp".
+    """
+
+    __slots__ = ("_regex", "fields", "pattern")
+
+    def __init__(self, pattern: str):
+        """
+        Compile a schema.
+
+        Args:
+            pattern: Schema, e.g. "{work}_{composer}_{part}"
+
+        Raises:
+            ValueError: If the schema is malformed, repeats or does not know
+                a field, lacks a required field, or has two fields with no
+                literal text between them
+        """
+        self.pattern = pattern
+        tokens = list(_SCHEMA_TOKEN.finditer(pattern))
+        separators = "".join(token[4] for token in tokens if token[4] is not None)
+        # A field value is anything without the schema's literal characters
+        value = f"[^{re.escape(''.join(sorted(set(separators))))}]*"
+
+        regex = []
+        fields: list[str] = []
+        optional = False
+        previous_was_field = False
+        for token in tokens:
+            field, open_bracket, close_bracket, literal, stray = token.groups()
+            if field is not None:
+                if field not in SCHEMA_FIELDS:
+                    raise ValueError(
+                        f"Unknown field '{{{field}}}' in schema '{pattern}'; "
+                        f"expected one of {', '.join(SCHEMA_FIELDS)}"
+                    )
+                if field in fields:
+                    raise ValueError(f"Field '{{{field}}}' repeated in '{pattern}'")
+                if previous_was_field:
+                    raise ValueError(
+                        f"Fields must be separated by literal text in '{pattern}'"
+                    )
+                fields.append(field)
+                regex.append(f"(?P<{field}>{value})")
+                previous_was_field = True
+            elif open_bracket or close_bracket:
+                if bool(open_bracket) == optional:
+                    raise ValueError(f"Unbalanced or nested [...] in '{pattern}'")
+                optional = bool(open_bracket)
+                regex.append("(?:" if open_bracket else ")?")
+            elif literal is not None:
+                regex.append(re.escape(literal))
+                previous_was_field = False
+            else:
+                raise ValueError(f"Unexpected '{stray}' in schema '{pattern}'")
+        if optional:
+            raise ValueError(f"Unbalanced or nested [...] in '{pattern}'")
+        missing = [field for field in REQUIRED_FIELDS if field not in fields]
+        if missing:
+            raise ValueError(
+                f"Schema '{pattern}' lacks the required field(s) "
+                f"{', '.join('{' + field + '}' for field in missing)}"
+            )
+
+        self.fields = tuple(fields)
+        self._regex = re.compile("".join(regex))
 
+    def __repr__(self) -> str:
+        return f"FilenameSchema({self.pattern!r})"
 
-def parse_filename(filename: str) -> FilenameComponents:
+    def parse(self, filename: str) -> FilenameComponents:
+        """
+        Parse a PDF filename into its components.
+
+        Args:
+            filename: The PDF filename (with or without .pdf extension)
+
+        Returns:
+            FilenameComponents with parsed values; strings are interned, so
+            the composers and parts shared by many files are stored once
+
+        Raises:
+            FilenameError: If the filename doesn't match the schema
+        """
+        # Remove .pdf extension if present
+        filename_no_ext = _stem(filename)
+
+        match = self._regex.fullmatch(filename_no_ext)
+        if match is None:
+            raise FilenameError(
+                f"Filename '{filename_no_ext}' does not match the expected schema "
+                f"'{self.pattern}'."
+            )
+
+        values = match.groupdict()
+        # Basic validation: ensure essential parts are not empty
+        if not all(values[field] for field in REQUIRED_FIELDS):
+            raise FilenameError(
+                f"Filename '{filename_no_ext}' is missing one of the required "
+                "components (Composer, Work, Part)."
+            )
+
+        opus = values.get("opus")
+        movement = values.get("movement")
+        return FilenameComponents(
+            composer_last_name=sys.intern(values["composer"]),
+            work_identifier=sys.intern(values["work"]),
+            opus="NoOp" if opus is None else sys.intern(opus),
+            part=sys.intern(values["part"]),
+            movement=sys.intern(movement) if movement else "",
+        )
+
+
+@functools.lru_cache(maxsize=32)
+def compile_schema(pattern: str) -> FilenameSchema:
+    """
+    Compile a schema, reusing the compiled form of a pattern seen before.
+
+    Raises:
+        ValueError: If the schema is invalid
+    """
+    return FilenameSchema(pattern)
+
+
+def parse_filename(
+    filename: str, schema: FilenameSchema | None = None
+) -> FilenameComponents:
     """
     Parse a PDF filename into its components.
 
-    Supports two schemas:
+    With the default schema, supports:
     - 4-part: Composer_Work_Opus_Part.pdf
     - 3-part: Composer_Work_Part.pdf (no opus)
 
     Args:
         filename: The PDF filename (with or without .pdf extension)
+        schema: Optional compiled schema (defaults to DEFAULT_SCHEMA)
 
     Returns:
         FilenameComponents with parsed values
 
     Raises:
-        ValueError: If filename doesn't match expected schema
+        FilenameError: If filename doesn't match expected schema
     """
-    # Remove .pdf extension if present
-    filename_no_ext = Path(filename).stem
-
-    # Split by underscore
-    parts = filename_no_ext.split("_")
-
-    if len(parts) == 3:
-        # Schema: Composer_Work_Part (no Opus)
-        composer_last_name = parts[0]
-        work_identifier = parts[1]
-        opus = "NoOp"
-        part = parts[2]
-    elif len(parts) == 4:
-        # Schema: Composer_Work_Opus_Part
-        composer_last_name = parts[0]
-        work_identifier = parts[1]
-        opus = parts[2]
-        part = parts[3]
-    else:
-        raise ValueError(
-            f"Filename '{filename_no_ext}' does not match the expected schema "
-            f"(3 or 4 parts). Found {len(parts)} parts."
-        )
-
-    # Basic validation: ensure essential parts are not empty
-    if not composer_last_name or not work_identifier or not part:
-        raise ValueError(
-            f"Filename '{filename_no_ext}' is missing one of the required "
-            "components (Composer, Work, Part)."
-        )
-
-    return FilenameComponents(
-        composer_last_name=composer_last_name,
-        work_identifier=work_identifier,
-        opus=opus,
-        part=part,
-    )
+    return (schema or compile_schema(DEFAULT_SCHEMA)).parse(filename)
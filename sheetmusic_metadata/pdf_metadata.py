@@ -1,38 +1,97 @@
-"""PDF metadata writing using exiftool."""
+"""PDF metadata writing using exiftool or the native incremental writer."""
 
+import json
+import os
 import subprocess
 import sys
+from collections.abc import Iterable, Iterator, Sequence
+from dataclasses import dataclass
 from pathlib import Path
 
+from sheetmusic_metadata import profiling
+from sheetmusic_metadata.cloning import clone_file
+from sheetmusic_metadata.exiftool_session import (
+    AsyncExifToolSession,
+    ExifToolSession,
+    get_default_session,
+)
+from sheetmusic_metadata.output_index import OutputIndex
+from sheetmusic_metadata.pdf_native import (
+    UnsupportedPDFError,
+    read_info,
+    write_info_incremental,
+)
 
-def _get_unique_output_path(output_dir: Path, filename: str) -> tuple[Path, bool]:
+# Metadata writer backends selectable with --backend
+BACKENDS = ("exiftool", "native")
+
+# Info dictionary fields written and read by this tool
+METADATA_FIELDS = ("Title", "Author", "Subject", "Keywords")
+
+# Files read per exiftool command by read_pdf_metadata_many
+READ_CHUNK_SIZE = 256
+
+
+def _get_unique_output_path(
+    output_dir: Path, filename: str, output_index: OutputIndex | None = None
+) -> tuple[Path, bool]:
     """
-    Get a unique output path, appending (1), (2), etc. if file exists.
+    Reserve a unique output path, appending (1), (2), etc. if file exists.
+
+    The chosen path is created as an empty placeholder with O_CREAT|O_EXCL,
+    so concurrent callers (threads or processes) never get the same path.
+    The caller must replace the placeholder with the real file, or remove
+    it on failure.
 
     Args:
         output_dir: Directory to write the file to
         filename: Original filename
+        output_index: Index of existing names shared across calls in a run
+                      (a fresh one is used if None)
 
     Returns:
         Tuple of (output_path, was_conflict) where was_conflict is True if
         the file already existed and a suffix was added
     """
-    output_path = output_dir / filename
+    if output_index is None:
+        output_index = OutputIndex()
+    return output_index.reserve(output_dir, filename)
 
-    if not output_path.exists():
-        return (output_path, False)
 
-    # File exists, need to add suffix
-    stem = output_path.stem
-    suffix = output_path.suffix
-    counter = 1
+def _prepare_output(
+    filepath: Path,
+    output_dir: Path | None,
+    output_index: OutputIndex | None,
+    output_name: str | None,
+) -> tuple[Path | None, Path]:
+    """
+    Reserve the output path and choose the temporary file to write first.
+
+    Returns:
+        Tuple of (temp_path, final_output_path); temp_path is None when the
+        input is updated in place
+    """
+    if output_dir is None:
+        # Default behavior: overwrite the original file
+        return (None, filepath)
 
-    while True:
-        new_filename = f"{stem} ({counter}){suffix}"
-        new_path = output_dir / new_filename
-        if not new_path.exists():
-            return (new_path, True)
-        counter += 1
+    # Ensure the output directory exists
+    output_dir.mkdir(parents=True, exist_ok=True)
+    # Get unique output path (handle conflicts)
+    output_name = output_name or filepath.name
+    with profiling.stage("reserve_output"):
+        output_path, was_conflict = _get_unique_output_path(
+            output_dir, output_name, output_index
+        )
+    if was_conflict:
+        print(
+            f"  Warning: File '{output_name}' already exists in output directory. "
+            f"Writing to '{output_path.name}' instead.",
+            file=sys.stderr,
+        )
+    # The reserved placeholder is replaced by renaming a hidden temporary
+    # file over it once the metadata has been written
+    return (output_dir / f".{os.urandom(16).hex()}-{output_path.name}", output_path)
 
 
 def apply_pdf_metadata(
@@ -42,9 +101,13 @@ def apply_pdf_metadata(
     pdf_subject: str,
     pdf_keywords: str,
     output_dir: Path | None = None,
+    session: ExifToolSession | None = None,
+    backend: str = "exiftool",
+    output_index: OutputIndex | None = None,
+    output_name: str | None = None,
 ) -> Path:
     """
-    Apply metadata to a PDF file using exiftool.
+    Apply metadata to a PDF file using exiftool or the native writer.
 
     Args:
         filepath: Path to the PDF file
@@ -54,6 +117,14 @@ def apply_pdf_metadata(
         pdf_keywords: PDF Keywords metadata (comma-separated)
         output_dir: Optional directory to write output file to.
                     If None, overwrites the original file.
+        session: Optional exiftool session (defaults to the shared session)
+        backend: "exiftool", or "native" to append an incremental update
+                 without exiftool (falls back to exiftool for PDFs the
+                 native writer cannot handle)
+        output_index: Index of output names shared across a run, so
+                      conflicting names are resolved without probing
+        output_name: File name to use in output_dir (defaults to the input's
+                     name); a (1), (2), etc. suffix is still added if taken
 
     Returns:
         Path to the output file (same as input if overwriting, or new path if output_dir specified)
@@ -63,19 +134,354 @@ def apply_pdf_metadata(
         subprocess.CalledProcessError: If exiftool fails
         OSError: If file operations fail
     """
-    # Check if exiftool is available
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown metadata backend '{backend}'")
+
+    temp_path, final_output_path = _prepare_output(
+        filepath, output_dir, output_index, output_name
+    )
+
+    written = False
     try:
-        subprocess.run(
-            ["exiftool", "-ver"],
-            capture_output=True,
-            check=True,
+        appended = _write_metadata(
+            filepath,
+            {
+                "Title": pdf_title,
+                "Author": pdf_author,
+                "Subject": pdf_subject,
+                "Keywords": pdf_keywords,
+            },
+            temp_path,
+            session,
+            backend,
         )
-    except (subprocess.CalledProcessError, FileNotFoundError):
-        raise FileNotFoundError(
-            "exiftool is not installed. Please install it to continue.\n"
-            "On macOS with Homebrew, run: brew install exiftool"
+        if profiling.get_profiler() is not None:
+            _count_write_bytes(filepath, temp_path or filepath, appended)
+        if temp_path is not None:
+            with profiling.stage("rename"):
+                os.replace(temp_path, final_output_path)
+        written = True
+    finally:
+        if not written and temp_path is not None:
+            # The write failed: release the reserved output name
+            temp_path.unlink(missing_ok=True)
+            final_output_path.unlink(missing_ok=True)
+
+    return final_output_path
+
+
+def _write_metadata(
+    filepath: Path,
+    info: dict[str, str],
+    destination: Path | None,
+    session: ExifToolSession | None,
+    backend: str,
+) -> int | None:
+    """
+    Write metadata with a backend, to destination or over the original.
+
+    Returns:
+        Bytes appended by the native writer, or None if exiftool wrote
+    """
+    if backend == "native":
+        try:
+            with profiling.stage("native_write"):
+                return write_info_incremental(filepath, info, destination)
+        except UnsupportedPDFError as e:
+            print(
+                f"  Warning: Native writer cannot update '{filepath.name}' ({e}). "
+                "Falling back to exiftool.",
+                file=sys.stderr,
+            )
+    with profiling.stage("exiftool_write"):
+        _write_with_exiftool(
+            session or get_default_session(),
+            filepath,
+            info["Title"],
+            info["Author"],
+            info["Subject"],
+            info["Keywords"],
+            destination,
         )
+    return None
 
+
+def reuse_tagged_pdf(
+    filepath: Path,
+    tagged: Sequence[Path],
+    pdf_title: str,
+    pdf_author: str,
+    pdf_subject: str,
+    pdf_keywords: str,
+    output_dir: Path,
+    session: ExifToolSession | None = None,
+    backend: str = "exiftool",
+    output_index: OutputIndex | None = None,
+) -> Path:
+    """
+    Write a PDF from the outputs already tagged for copies of it.
+
+    `tagged` must hold outputs written for inputs with the same content as
+    `filepath`. If one of them already carries the metadata, the output is
+    a hardlink to it (or, across filesystems, a clone; see clone_file), so
+    nothing is written at all. Otherwise the metadata is appended to a
+    clone of the first as an incremental update.
+
+    The native writer does not update XMP, so the update is only possible
+    for outputs without an XMP stream, i.e. those of the native backend:
+    exiftool adds one to every file it writes. Otherwise the input is
+    written with the backend as apply_pdf_metadata would.
+
+    Args:
+        filepath: Path to the PDF file
+        tagged: Output files of inputs with the same content (at least one)
+        pdf_title: PDF Title metadata
+        pdf_author: PDF Author metadata
+        pdf_subject: PDF Subject metadata
+        pdf_keywords: PDF Keywords metadata (comma-separated)
+        output_dir: Directory to write the output file to
+        session: Optional exiftool session (defaults to the shared session)
+        backend: Backend for the fallback write ("exiftool" or "native")
+        output_index: Index of output names shared across a run
+
+    Returns:
+        Path to the output file
+
+    Raises:
+        FileNotFoundError: If exiftool is needed but not installed
+        subprocess.CalledProcessError: If exiftool fails
+        OSError: If file operations fail
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown metadata backend '{backend}'")
+
+    info = {
+        "Title": pdf_title,
+        "Author": pdf_author,
+        "Subject": pdf_subject,
+        "Keywords": pdf_keywords,
+    }
+    temp_path, final_output_path = _prepare_output(
+        filepath, output_dir, output_index, None
+    )
+
+    written = False
+    try:
+        try:
+            with profiling.stage("dedupe_write"):
+                source, method = _copy_tagged(tagged, info, temp_path)
+            print(f"  Same content as '{source.name}': output written by {method}.")
+            profiling.count("dedupe_" + method.replace(" ", "_"))
+        except UnsupportedPDFError:
+            temp_path.unlink(missing_ok=True)
+            appended = _write_metadata(filepath, info, temp_path, session, backend)
+            if profiling.get_profiler() is not None:
+                _count_write_bytes(filepath, temp_path, appended)
+        with profiling.stage("rename"):
+            os.replace(temp_path, final_output_path)
+        written = True
+    finally:
+        if not written:
+            temp_path.unlink(missing_ok=True)
+            final_output_path.unlink(missing_ok=True)
+
+    return final_output_path
+
+
+def _copy_tagged(
+    tagged: Sequence[Path], info: dict[str, str], destination: Path
+) -> tuple[Path, str]:
+    """
+    Link a tagged file with the same metadata into destination, or update one.
+
+    Returns:
+        Tuple of (tagged file used, how the file was written: "hardlink",
+        "reflink", "copy" or "incremental update")
+
+    Raises:
+        UnsupportedPDFError: If no tagged file has the metadata and the
+            first cannot be updated natively
+    """
+    for source in tagged:
+        try:
+            current = read_info(source)
+        except UnsupportedPDFError:
+            continue
+        if all(current.get(key) == value for key, value in info.items()):
+            break
+    else:
+        appended = write_info_incremental(tagged[0], info, destination)
+        profiling.add_bytes(written=appended)
+        return tagged[0], "incremental update"
+    try:
+        os.link(source, destination)
+        return source, "hardlink"
+    except OSError:
+        # Across filesystems, or on one without hardlinks
+        method = clone_file(source, destination)
+    return source, "reflink" if method == "reflink" else "copy"
+
+
+async def apply_pdf_metadata_async(
+    filepath: Path,
+    pdf_title: str,
+    pdf_author: str,
+    pdf_subject: str,
+    pdf_keywords: str,
+    output_dir: Path | None = None,
+    session: AsyncExifToolSession | None = None,
+    backend: str = "exiftool",
+    output_index: OutputIndex | None = None,
+    output_name: str | None = None,
+) -> Path:
+    """
+    Apply metadata to a PDF file without blocking the event loop.
+
+    Same behavior and arguments as apply_pdf_metadata, except that exiftool
+    runs in an AsyncExifToolSession and the native writer runs in the
+    loop's default thread pool. If the call is cancelled, the write is
+    stopped (exiftool is killed; a native write in progress is allowed to
+    finish) and the reserved output name is released.
+
+    Args:
+        filepath: Path to the PDF file
+        pdf_title: PDF Title metadata
+        pdf_author: PDF Author metadata
+        pdf_subject: PDF Subject metadata
+        pdf_keywords: PDF Keywords metadata (comma-separated)
+        output_dir: Optional directory to write output file to.
+                    If None, overwrites the original file.
+        session: Optional async exiftool session; if None and exiftool is
+                 needed, a session is started for this call only
+        backend: "exiftool" or "native" (see apply_pdf_metadata)
+        output_index: Index of output names shared across a run
+        output_name: File name to use in output_dir (defaults to the input's
+                     name)
+
+    Returns:
+        Path to the output file
+
+    Raises:
+        FileNotFoundError: If exiftool is not installed
+        subprocess.CalledProcessError: If exiftool fails
+        OSError: If file operations fail
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown metadata backend '{backend}'")
+
+    temp_path, final_output_path = _prepare_output(
+        filepath, output_dir, output_index, output_name
+    )
+
+    written = False
+    try:
+        if backend == "native":
+            try:
+                with profiling.stage("native_write"):
+                    appended = await _run_to_completion(
+                        write_info_incremental,
+                        filepath,
+                        {
+                            "Title": pdf_title,
+                            "Author": pdf_author,
+                            "Subject": pdf_subject,
+                            "Keywords": pdf_keywords,
+                        },
+                        temp_path,
+                    )
+                written = True
+            except UnsupportedPDFError as e:
+                print(
+                    f"  Warning: Native writer cannot update '{filepath.name}' ({e}). "
+                    "Falling back to exiftool.",
+                    file=sys.stderr,
+                )
+        if not written:
+            exiftool_args = _exiftool_write_args(
+                filepath, pdf_title, pdf_author, pdf_subject, pdf_keywords, temp_path
+            )
+            with profiling.stage("exiftool_write"):
+                if session is not None:
+                    result = await session.execute(*exiftool_args)
+                else:
+                    async with AsyncExifToolSession() as own_session:
+                        result = await own_session.execute(*exiftool_args)
+            _check_exiftool_write(result, exiftool_args)
+            appended = None
+        if profiling.get_profiler() is not None:
+            _count_write_bytes(filepath, temp_path or filepath, appended)
+        if temp_path is not None:
+            with profiling.stage("rename"):
+                os.replace(temp_path, final_output_path)
+        written = True
+    finally:
+        if not written and temp_path is not None:
+            # The write failed or was cancelled: release the reserved name
+            temp_path.unlink(missing_ok=True)
+            final_output_path.unlink(missing_ok=True)
+
+    return final_output_path
+
+
+async def _run_to_completion(func, *args):
+    """
+    Run a blocking function in the default thread pool.
+
+    If the caller is cancelled, the function still runs to the end before
+    the cancellation is passed on, so its files can be cleaned up safely.
+    """
+    # Imported here: the command-line tool never needs asyncio
+    import asyncio
+
+    future = asyncio.ensure_future(asyncio.to_thread(func, *args))
+    try:
+        return await asyncio.shield(future)
+    except asyncio.CancelledError:
+        await asyncio.wait([future])
+        if not future.cancelled():
+            future.exception()  # Mark any error as retrieved
+        raise
+
+
+def _count_write_bytes(source: Path, written_path: Path, appended: int | None) -> None:
+    """Count the bytes a write read and wrote, for --profile."""
+    if appended is not None and written_path == source:
+        # Native in-place update: only the new section is written (the
+        # pages read through mmap are not counted)
+        profiling.add_bytes(written=appended)
+    else:
+        # Whole-file copy or exiftool rewrite
+        profiling.add_bytes(
+            read=source.stat().st_size, written=written_path.stat().st_size
+        )
+
+
+def _write_with_exiftool(
+    session: ExifToolSession,
+    filepath: Path,
+    pdf_title: str,
+    pdf_author: str,
+    pdf_subject: str,
+    pdf_keywords: str,
+    destination: Path | None,
+) -> None:
+    """Write metadata with exiftool, to destination or over the original."""
+    exiftool_args = _exiftool_write_args(
+        filepath, pdf_title, pdf_author, pdf_subject, pdf_keywords, destination
+    )
+    # Run exiftool in the persistent session (starting it if needed)
+    _check_exiftool_write(session.execute(*exiftool_args), exiftool_args)
+
+
+def _exiftool_write_args(
+    filepath: Path,
+    pdf_title: str,
+    pdf_author: str,
+    pdf_subject: str,
+    pdf_keywords: str,
+    destination: Path | None,
+) -> list[str]:
+    """Build the exiftool arguments that write the metadata fields."""
     exiftool_args = [
         f"-Title={pdf_title}",
         f"-Author={pdf_author}",
@@ -83,143 +489,223 @@ def apply_pdf_metadata(
         f"-Keywords={pdf_keywords}",
         "-e",  # Exclude these tags from reading
     ]
-
-    if output_dir is not None:
-        # Ensure the output directory exists
-        output_dir.mkdir(parents=True, exist_ok=True)
-        # Get unique output path (handle conflicts)
-        output_path, was_conflict = _get_unique_output_path(output_dir, filepath.name)
-        if was_conflict:
-            print(
-                f"  Warning: File '{filepath.name}' already exists in output directory. "
-                f"Writing to '{output_path.name}' instead.",
-                file=sys.stderr,
-            )
-        # Write to a new file in the specified directory
-        exiftool_args.extend(["-o", str(output_path)])
-        final_output_path = output_path
+    if destination is not None:
+        exiftool_args.extend(["-o", str(destination)])
     else:
-        # Default behavior: overwrite the original file
         exiftool_args.append("-overwrite_original")
-        final_output_path = filepath
-
     exiftool_args.append(str(filepath))
+    return exiftool_args
 
-    # Run exiftool
-    result = subprocess.run(
-        ["exiftool"] + exiftool_args,
-        capture_output=True,
-        text=True,
-        check=False,
-    )
 
-    # Check for actual errors (not just warnings)
-    # exiftool returns 0 on success, but may return 1 even with warnings
-    # Look for "Error:" in stderr to distinguish from warnings
-    # Also check stdout for success message: "X image files updated"
-    has_error = False
+def _check_exiftool_write(
+    result: subprocess.CompletedProcess[str], exiftool_args: list[str]
+) -> None:
+    """Raise CalledProcessError if an exiftool write command failed."""
+    # exiftool may report warnings (e.g. about xref tables) without failing;
+    # the session only flags output containing actual errors
     if result.returncode != 0:
-        # Check if there are actual errors (not just warnings about xref tables, etc.)
-        error_lines = [
-            line
-            for line in (result.stderr + result.stdout).split("\n")
-            if line.strip().startswith("Error:")
-        ]
-        if error_lines:
-            has_error = True
-        # Check if file was actually updated
-        elif "files updated" not in result.stdout:
-            # No success message and non-zero return code - likely an error
-            if (
-                "files weren't updated" in result.stdout
-                or "could not be read" in result.stdout
-            ):
-                has_error = True
-
-    if has_error:
         raise subprocess.CalledProcessError(
             result.returncode,
             ["exiftool"] + exiftool_args,
             result.stderr + "\n" + result.stdout,
         )
 
-    return final_output_path
-
 
-def read_pdf_metadata(filepath: Path) -> dict[str, str]:
+def read_pdf_metadata(
+    filepath: Path, session: ExifToolSession | None = None
+) -> dict[str, str]:
     """
-    Read PDF metadata using exiftool.
+    Read PDF metadata, natively where possible and with exiftool otherwise.
+
+    The native reader memory-maps the file and only touches its tail and the
+    objects leading to the Info dictionary. Encrypted, unsupported or
+    malformed files are read with a single exiftool call.
 
     Args:
         filepath: Path to the PDF file
+        session: Optional exiftool session (defaults to the shared session)
 
     Returns:
-        Dictionary with metadata fields (Title, Author, Subject, Keywords)
+        Dictionary with metadata fields (Title, Author, Subject, Keywords);
+        missing fields are empty strings
 
     Raises:
-        FileNotFoundError: If exiftool is not installed
+        FileNotFoundError: If the file does not exist, or exiftool is needed
+            but not installed
         subprocess.CalledProcessError: If exiftool fails
     """
-    # Check if exiftool is available
     try:
-        subprocess.run(
-            ["exiftool", "-ver"],
-            capture_output=True,
-            check=True,
-        )
-    except (subprocess.CalledProcessError, FileNotFoundError):
-        raise FileNotFoundError(
-            "exiftool is not installed. Please install it to continue.\n"
-            "On macOS with Homebrew, run: brew install exiftool"
+        with profiling.stage("native_read"):
+            info = read_info(filepath)
+    except UnsupportedPDFError:
+        # Encrypted or malformed; exiftool may still read it
+        with profiling.stage("exiftool_read"):
+            return _read_with_exiftool(session or get_default_session(), filepath)
+    return {field: info.get(field, "") for field in METADATA_FIELDS}
+
+
+def _read_with_exiftool(session: ExifToolSession, filepath: Path) -> dict[str, str]:
+    """Read the metadata fields with one exiftool -json command."""
+    args = ["-json", *(f"-{field}" for field in METADATA_FIELDS), str(filepath)]
+    result = session.execute(*args)
+    if result.returncode != 0:
+        raise subprocess.CalledProcessError(
+            result.returncode, result.args, result.stdout, result.stderr
         )
+    records = json.loads(result.stdout or "[]")
+    record = records[0] if records else {}
+    return {field: _json_value_to_text(record.get(field)) for field in METADATA_FIELDS}
 
-    # Read specific metadata fields using tab-separated format
-    result = subprocess.run(
-        [
-            "exiftool",
-            "-Title",
-            "-Author",
-            "-Subject",
-            "-Keywords",
-            "-T",  # Tab-separated output
-            str(filepath),
-        ],
-        capture_output=True,
-        text=True,
-        check=True,
-    )
 
-    # Parse the tab-separated output (format: "Title\tAuthor\tSubject\tKeywords")
-    # Filter out warning lines
-    lines = [
-        line.strip()
-        for line in result.stdout.strip().split("\n")
-        if line.strip() and not line.strip().startswith("Warning:")
-    ]
+def _json_value_to_text(value: object) -> str:
+    """Convert an exiftool -json value (string, number or list) to text."""
+    if value is None:
+        return ""
+    if isinstance(value, list):
+        return ", ".join(str(item) for item in value)
+    return str(value)
+
 
-    metadata = {}
-    if lines:
-        # First non-warning line should be tab-separated values
-        parts = lines[0].split("\t")
-        if len(parts) >= 4:
-            metadata["Title"] = parts[0].strip() if parts[0].strip() != "-" else ""
-            metadata["Author"] = parts[1].strip() if parts[1].strip() != "-" else ""
-            metadata["Subject"] = parts[2].strip() if parts[2].strip() != "-" else ""
-            metadata["Keywords"] = parts[3].strip() if parts[3].strip() != "-" else ""
-
-    # Fallback: try reading individual fields if tab format didn't work
-    if not metadata or all(not v for v in metadata.values()):
-        for field in ["Title", "Author", "Subject", "Keywords"]:
-            field_result = subprocess.run(
-                ["exiftool", f"-{field}", "-s", "-S", str(filepath)],
-                capture_output=True,
-                text=True,
-                check=False,
+@dataclass
+class MetadataReadResult:
+    """Metadata read from one file by read_pdf_metadata_many."""
+
+    path: Path
+    # Title, Author, Subject and Keywords; None if the file could not be read
+    metadata: dict[str, str] | None
+    error: str | None = None
+
+
+def read_pdf_metadata_many(
+    paths: Iterable[Path],
+    session: ExifToolSession | None = None,
+    chunk_size: int = READ_CHUNK_SIZE,
+) -> Iterator[MetadataReadResult]:
+    """
+    Read the metadata of many PDFs, yielding results as they are read.
+
+    Paths are taken in chunks of `chunk_size`. Within a chunk, each file
+    is read natively where possible, and the files the native reader
+    cannot handle are read together with a single exiftool -json command,
+    so exiftool's per-command overhead is paid once per chunk rather than
+    once per file. Only one chunk of paths is held in memory at a time.
+
+    A file that cannot be read does not stop the others: its result has
+    metadata None and the reason in error.
+
+    Args:
+        paths: PDF files to read (may be a lazy iterable)
+        session: Optional exiftool session (defaults to the shared session)
+        chunk_size: Number of files per chunk
+
+    Yields:
+        MetadataReadResult for each path, in the order given
+
+    Raises:
+        FileNotFoundError: If exiftool is needed but not installed
+    """
+    chunk: list[Path] = []
+    for path in paths:
+        chunk.append(path)
+        if len(chunk) >= chunk_size:
+            yield from _read_chunk(chunk, session)
+            chunk = []
+    if chunk:
+        yield from _read_chunk(chunk, session)
+
+
+def _read_chunk(
+    paths: list[Path], session: ExifToolSession | None
+) -> list[MetadataReadResult]:
+    """Read one chunk natively, batching the leftovers into one exiftool call."""
+    results: list[MetadataReadResult | None] = []
+    unsupported: list[int] = []
+    for index, path in enumerate(paths):
+        try:
+            with profiling.stage("native_read"):
+                info = read_info(path)
+        except OSError as e:
+            results.append(MetadataReadResult(path, None, e.strerror or str(e)))
+            continue
+        except UnsupportedPDFError:
+            # Encrypted or malformed; exiftool may still read it, or reports
+            # why it cannot
+            unsupported.append(index)
+            results.append(None)
+            continue
+        metadata = {field: info.get(field, "") for field in METADATA_FIELDS}
+        results.append(MetadataReadResult(path, metadata))
+
+    if unsupported:
+        with profiling.stage("exiftool_read"):
+            batch = _read_many_with_exiftool(
+                session or get_default_session(), [paths[i] for i in unsupported]
+            )
+        for index, result in zip(unsupported, batch, strict=True):
+            results[index] = result
+    return results
+
+
+def _read_many_with_exiftool(
+    session: ExifToolSession, paths: list[Path]
+) -> list[MetadataReadResult]:
+    """Read the metadata fields of several files with one exiftool -json command."""
+    results: dict[int, MetadataReadResult] = {}
+    readable: list[tuple[int, str]] = []
+    for index, path in enumerate(paths):
+        name = str(path)
+        if "\n" in name or "\r" in name:
+            # Cannot be passed through the -stay_open argument file
+            results[index] = MetadataReadResult(
+                path, None, "filename contains a newline"
             )
-            if field_result.returncode == 0:
-                value = field_result.stdout.strip()
-                # Filter out warnings
-                if value and not value.startswith("Warning:"):
-                    metadata[field] = value
+        else:
+            readable.append((index, name))
+
+    if readable:
+        # exiftool reports unreadable files in the output rather than failing
+        # the command, so the return code is not checked here. Filenames are
+        # passed as UTF-8 (already the case outside Windows).
+        result = session.execute(
+            "-json",
+            "-charset",
+            "filename=utf8",
+            *(f"-{field}" for field in METADATA_FIELDS),
+            *(name for _, name in readable),
+        )
+        try:
+            records = json.loads(result.stdout or "[]")
+        except ValueError:
+            records = []
+        by_source = {
+            record.get("SourceFile"): record
+            for record in records
+            if isinstance(record, dict)
+        }
+        errors = _errors_by_file(result.stderr)
+        for index, name in readable:
+            record = by_source.get(name)
+            if record is None:
+                message = errors.get(name, "exiftool returned no metadata")
+                results[index] = MetadataReadResult(paths[index], None, message)
+            elif "Error" in record:
+                results[index] = MetadataReadResult(
+                    paths[index], None, str(record["Error"])
+                )
+            else:
+                metadata = {
+                    field: _json_value_to_text(record.get(field))
+                    for field in METADATA_FIELDS
+                }
+                results[index] = MetadataReadResult(paths[index], metadata)
+    return [results[index] for index in range(len(paths))]
+
 
-    return metadata
+def _errors_by_file(stderr: str) -> dict[str, str]:
+    """Map filenames to exiftool error lines such as "Error: File not found - a.pdf"."""
+    errors = {}
+    for line in stderr.splitlines():
+        if line.startswith("Error") and " - " in line:
+            message, name = line.rsplit(" - ", 1)
+            errors[name] = message.split(":", 1)[-1].strip()
+    return errors
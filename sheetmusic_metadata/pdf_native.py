@@ -0,0 +1,750 @@
+"""Native PDF Info dictionary reading and incremental-update writing."""
+
+import mmap
+import re
+import zlib
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+from typing import NamedTuple
+
+from sheetmusic_metadata.cloning import clone_file
+
+WHITESPACE = b"\x00\t\n\x0c\r "
+DELIMITERS = b"()<>[]{}/%"
+
+# startxref is required to be in the last 1024 bytes; allow some trailing junk
+TAIL_SIZE = 4096
+
+_XREF_ENTRY_RE = re.compile(rb"(\d+)[ \t]+(\d+)[ \t]+([nf])")
+_NUMBER_RE = re.compile(rb"[+-]?(?:\d+\.?\d*|\.\d+)")
+_LITERAL_ESCAPES = {
+    ord("n"): b"\n",
+    ord("r"): b"\r",
+    ord("t"): b"\t",
+    ord("b"): b"\b",
+    ord("f"): b"\f",
+    ord("("): b"(",
+    ord(")"): b")",
+    ord("\\"): b"\\",
+}
+
+
+class UnsupportedPDFError(ValueError):
+    """Raised when a PDF cannot be handled natively (malformed or encrypted)."""
+
+
+class Name(str):
+    """A PDF name object, stored without the leading slash."""
+
+
+class Ref(NamedTuple):
+    """An indirect object reference."""
+
+    number: int
+    generation: int
+
+
+class _Lexer:
+    """Tokenizer and object parser over a bytes-like buffer (bytes or mmap)."""
+
+    def __init__(self, data, pos: int = 0):
+        self.data = data
+        self.pos = pos
+
+    def skip_whitespace(self) -> None:
+        data = self.data
+        size = len(data)
+        pos = self.pos
+        while pos < size:
+            char = data[pos]
+            if char in WHITESPACE:
+                pos += 1
+            elif char == 0x25:  # % starts a comment running to end of line
+                while pos < size and data[pos] not in b"\r\n":
+                    pos += 1
+            else:
+                break
+        self.pos = pos
+
+    def read_keyword(self) -> bytes:
+        self.skip_whitespace()
+        data = self.data
+        start = self.pos
+        pos = start
+        while (
+            pos < len(data)
+            and data[pos] not in WHITESPACE
+            and data[pos] not in DELIMITERS
+        ):
+            pos += 1
+        self.pos = pos
+        return bytes(data[start:pos])
+
+    def expect_keyword(self, keyword: bytes) -> None:
+        found = self.read_keyword()
+        if found != keyword:
+            raise UnsupportedPDFError(
+                f"Expected '{keyword.decode()}' at offset {self.pos}, found {found!r}"
+            )
+
+    def read_int(self) -> int:
+        token = self.read_keyword()
+        if not token.isdigit():
+            raise UnsupportedPDFError(f"Expected integer at offset {self.pos}")
+        return int(token)
+
+    def parse_object(self):
+        """Parse one direct object (or an 'N G R' reference) at the cursor."""
+        self.skip_whitespace()
+        data = self.data
+        if self.pos >= len(data):
+            raise UnsupportedPDFError("Unexpected end of file")
+        char = data[self.pos]
+        if char == 0x2F:  # /
+            return self._parse_name()
+        if char == 0x3C:  # <
+            if data[self.pos + 1 : self.pos + 2] == b"<":
+                return self._parse_dict()
+            return self._parse_hex_string()
+        if char == 0x28:  # (
+            return self._parse_literal_string()
+        if char == 0x5B:  # [
+            return self._parse_array()
+        if char in b"+-.0123456789":
+            return self._parse_number_or_ref()
+        keyword = self.read_keyword()
+        if keyword == b"true":
+            return True
+        if keyword == b"false":
+            return False
+        if keyword == b"null":
+            return None
+        raise UnsupportedPDFError(f"Unexpected token {keyword!r} at offset {self.pos}")
+
+    def _parse_name(self) -> Name:
+        self.pos += 1
+        raw = self.read_keyword() if self._at_regular() else b""
+        if b"#" in raw:
+            raw = re.sub(
+                rb"#([0-9A-Fa-f]{2})", lambda m: bytes.fromhex(m[1].decode()), raw
+            )
+        return Name(raw.decode("latin-1"))
+
+    def _at_regular(self) -> bool:
+        if self.pos >= len(self.data):
+            return False
+        char = self.data[self.pos]
+        return char not in WHITESPACE and char not in DELIMITERS
+
+    def _parse_dict(self) -> dict:
+        self.pos += 2
+        result = {}
+        while True:
+            self.skip_whitespace()
+            if self.data[self.pos : self.pos + 2] == b">>":
+                self.pos += 2
+                return result
+            key = self.parse_object()
+            if not isinstance(key, Name):
+                raise UnsupportedPDFError(f"Dictionary key is not a name at {self.pos}")
+            result[str(key)] = self.parse_object()
+
+    def _parse_array(self) -> list:
+        self.pos += 1
+        result = []
+        while True:
+            self.skip_whitespace()
+            if self.pos >= len(self.data):
+                raise UnsupportedPDFError("Unterminated array")
+            if self.data[self.pos] == 0x5D:  # ]
+                self.pos += 1
+                return result
+            result.append(self.parse_object())
+
+    def _parse_hex_string(self) -> bytes:
+        end = self.data.find(b">", self.pos)
+        if end < 0:
+            raise UnsupportedPDFError("Unterminated hex string")
+        digits = bytes(
+            c for c in self.data[self.pos + 1 : end] if c not in WHITESPACE
+        ).decode("latin-1")
+        self.pos = end + 1
+        if len(digits) % 2:
+            digits += "0"
+        try:
+            return bytes.fromhex(digits)
+        except ValueError as e:
+            raise UnsupportedPDFError(f"Invalid hex string: {e}") from e
+
+    def _parse_literal_string(self) -> bytes:
+        data = self.data
+        size = len(data)
+        pos = self.pos + 1
+        depth = 1
+        out = bytearray()
+        while pos < size:
+            char = data[pos]
+            pos += 1
+            if char == 0x5C:  # backslash
+                if pos >= size:
+                    break
+                char = data[pos]
+                pos += 1
+                if char in _LITERAL_ESCAPES:
+                    out += _LITERAL_ESCAPES[char]
+                elif 0x30 <= char <= 0x37:  # up to three octal digits
+                    digits = bytes([char])
+                    while len(digits) < 3 and pos < size and 0x30 <= data[pos] <= 0x37:
+                        digits += bytes([data[pos]])
+                        pos += 1
+                    out.append(int(digits, 8) & 0xFF)
+                elif char == 0x0D:  # escaped end-of-line is a line continuation
+                    if pos < size and data[pos] == 0x0A:
+                        pos += 1
+                elif char != 0x0A:
+                    out.append(char)
+            elif char == 0x28:
+                depth += 1
+                out.append(char)
+            elif char == 0x29:
+                depth -= 1
+                if depth == 0:
+                    self.pos = pos
+                    return bytes(out)
+                out.append(char)
+            elif char == 0x0D:  # bare CR or CRLF reads as LF
+                if pos < size and data[pos] == 0x0A:
+                    pos += 1
+                out.append(0x0A)
+            else:
+                out.append(char)
+        raise UnsupportedPDFError("Unterminated literal string")
+
+    def _parse_number_or_ref(self):
+        match = _NUMBER_RE.match(self.data, self.pos)
+        if not match:
+            raise UnsupportedPDFError(f"Invalid number at offset {self.pos}")
+        token = match[0]
+        self.pos = match.end()
+        if not token.isdigit():
+            return float(token) if b"." in token else int(token)
+        # An unsigned integer may start an 'N G R' reference
+        saved = self.pos
+        self.skip_whitespace()
+        generation = _NUMBER_RE.match(self.data, self.pos)
+        if generation and generation[0].isdigit():
+            self.pos = generation.end()
+            self.skip_whitespace()
+            if self.data[self.pos : self.pos + 1] == b"R":
+                self.pos += 1
+                if not self._at_regular():
+                    return Ref(int(token), int(generation[0]))
+        self.pos = saved
+        return int(token)
+
+
+def _decode_predictor(data: bytes, params: dict) -> bytes:
+    """Undo PNG row predictors (DecodeParms /Predictor >= 10)."""
+    predictor = params.get("Predictor", 1)
+    if predictor == 1:
+        return data
+    if predictor < 10:
+        raise UnsupportedPDFError(f"Unsupported predictor {predictor}")
+    colors = params.get("Colors", 1)
+    bits = params.get("BitsPerComponent", 8)
+    columns = params.get("Columns", 1)
+    bpp = max(1, (colors * bits + 7) // 8)
+    row_size = (colors * bits * columns + 7) // 8
+    out = bytearray()
+    previous = bytearray(row_size)
+    for start in range(0, len(data), row_size + 1):
+        kind = data[start]
+        row = bytearray(data[start + 1 : start + 1 + row_size])
+        row.extend(bytes(row_size - len(row)))
+        for i in range(row_size):
+            left = row[i - bpp] if i >= bpp else 0
+            up = previous[i]
+            if kind == 1:
+                row[i] = (row[i] + left) & 0xFF
+            elif kind == 2:
+                row[i] = (row[i] + up) & 0xFF
+            elif kind == 3:
+                row[i] = (row[i] + (left + up) // 2) & 0xFF
+            elif kind == 4:
+                up_left = previous[i - bpp] if i >= bpp else 0
+                estimate = left + up - up_left
+                distances = (
+                    abs(estimate - left),
+                    abs(estimate - up),
+                    abs(estimate - up_left),
+                )
+                if distances[0] <= distances[1] and distances[0] <= distances[2]:
+                    row[i] = (row[i] + left) & 0xFF
+                elif distances[1] <= distances[2]:
+                    row[i] = (row[i] + up) & 0xFF
+                else:
+                    row[i] = (row[i] + up_left) & 0xFF
+            elif kind != 0:
+                raise UnsupportedPDFError(f"Invalid PNG row filter {kind}")
+        out += row
+        previous = row
+    return bytes(out)
+
+
+class _PDFDocument:
+    """Cross-reference table and trailer of a PDF, with object lookup."""
+
+    def __init__(self, data):
+        self.data = data
+        self.startxref = self._find_startxref()
+        self.entries: dict[int, tuple[int, int, int]] = {}
+        self._next_section: int | None = self.startxref
+        self._seen_sections: set[int] = set()
+        self._object_streams: dict[int, tuple[bytes, dict[int, int]]] = {}
+        # Older sections in the /Prev chain are only read when an object
+        # is not found in the newer ones
+        self.trailer, self.is_xref_stream = self._load_next_section()
+
+    def _find_startxref(self) -> int:
+        tail_start = max(0, len(self.data) - TAIL_SIZE)
+        index = self.data.rfind(b"startxref", tail_start)
+        if index < 0:
+            raise UnsupportedPDFError("No startxref found")
+        lexer = _Lexer(self.data, index + len(b"startxref"))
+        offset = lexer.read_int()
+        if offset >= len(self.data):
+            raise UnsupportedPDFError("startxref points past end of file")
+        return offset
+
+    def _load_next_section(self) -> tuple[dict, bool]:
+        """Read the next (older) xref section in the /Prev chain."""
+        offset = self._next_section
+        if offset in self._seen_sections or offset >= len(self.data):
+            raise UnsupportedPDFError("Invalid /Prev chain in xref")
+        self._seen_sections.add(offset)
+        trailer, is_stream = self._read_xref_section(offset)
+        # Hybrid files point to an xref stream for compressed objects
+        if isinstance(trailer.get("XRefStm"), int):
+            self._read_xref_section(trailer["XRefStm"])
+        prev = trailer.get("Prev")
+        self._next_section = prev if isinstance(prev, int) else None
+        return trailer, is_stream
+
+    def _entry(self, number: int) -> tuple[int, int, int] | None:
+        while number not in self.entries and self._next_section is not None:
+            self._load_next_section()
+        return self.entries.get(number)
+
+    def _read_xref_section(self, offset: int) -> tuple[dict, bool]:
+        """Read one xref section; older entries never override newer ones."""
+        if self.data[offset : offset + 4] == b"xref":
+            return self._read_xref_table(offset + 4), False
+        return self._read_xref_stream(offset), True
+
+    def _read_xref_table(self, pos: int) -> dict:
+        lexer = _Lexer(self.data, pos)
+        while True:
+            lexer.skip_whitespace()
+            if self.data[lexer.pos : lexer.pos + 7] == b"trailer":
+                lexer.pos += 7
+                break
+            first = lexer.read_int()
+            count = lexer.read_int()
+            for number in range(first, first + count):
+                lexer.skip_whitespace()
+                match = _XREF_ENTRY_RE.match(self.data, lexer.pos)
+                if not match:
+                    raise UnsupportedPDFError(f"Malformed xref entry at {lexer.pos}")
+                lexer.pos = match.end()
+                if match[3] == b"n":
+                    entry = (1, int(match[1]), int(match[2]))
+                else:
+                    entry = (0, 0, 0)
+                self.entries.setdefault(number, entry)
+        trailer = lexer.parse_object()
+        if not isinstance(trailer, dict):
+            raise UnsupportedPDFError("Trailer is not a dictionary")
+        return trailer
+
+    def _read_xref_stream(self, offset: int) -> dict:
+        _, stream_dict, data_start = self._parse_indirect(offset)
+        if (
+            not isinstance(stream_dict, dict)
+            or stream_dict.get("Type") != "XRef"
+            or data_start is None
+        ):
+            raise UnsupportedPDFError(f"No xref table or stream at offset {offset}")
+        data = self.stream_data(stream_dict, data_start)
+        widths = stream_dict.get("W")
+        if not isinstance(widths, list) or len(widths) != 3:
+            raise UnsupportedPDFError("Invalid /W in xref stream")
+        index = stream_dict.get("Index", [0, stream_dict.get("Size", 0)])
+        row_size = sum(widths)
+        pos = 0
+        for first, count in zip(index[::2], index[1::2]):
+            for number in range(first, first + count):
+                row = data[pos : pos + row_size]
+                pos += row_size
+                if len(row) < row_size:
+                    raise UnsupportedPDFError("Truncated xref stream")
+                fields = []
+                start = 0
+                for width in widths:
+                    fields.append(int.from_bytes(row[start : start + width], "big"))
+                    start += width
+                kind = fields[0] if widths[0] else 1
+                self.entries.setdefault(number, (kind, fields[1], fields[2]))
+        return stream_dict
+
+    def _parse_indirect(self, offset: int) -> tuple[Ref, object, int | None]:
+        """Parse 'N G obj ... endobj' at offset; return the stream start if any."""
+        lexer = _Lexer(self.data, offset)
+        number = lexer.read_int()
+        generation = lexer.read_int()
+        lexer.expect_keyword(b"obj")
+        value = lexer.parse_object()
+        lexer.skip_whitespace()
+        data_start = None
+        if self.data[lexer.pos : lexer.pos + 6] == b"stream":
+            data_start = lexer.pos + 6
+            if self.data[data_start : data_start + 2] == b"\r\n":
+                data_start += 2
+            elif self.data[data_start : data_start + 1] in (b"\n", b"\r"):
+                data_start += 1
+        return Ref(number, generation), value, data_start
+
+    def stream_data(self, stream_dict: dict, data_start: int) -> bytes:
+        """Return the decoded contents of a stream object."""
+        length = self.resolve(stream_dict.get("Length"))
+        end = data_start + length if isinstance(length, int) else -1
+        if end < 0 or b"endstream" not in self.data[end : end + 32]:
+            # Missing or wrong /Length: fall back to scanning for endstream
+            end = self.data.find(b"endstream", data_start)
+            if end < 0:
+                raise UnsupportedPDFError("Unterminated stream")
+            while end > data_start and self.data[end - 1] in b"\r\n":
+                end -= 1
+        raw = self.data[data_start:end]
+
+        filters = stream_dict.get("Filter", [])
+        params = stream_dict.get("DecodeParms") or {}
+        if not isinstance(filters, list):
+            filters = [filters]
+            params = [params]
+        elif not isinstance(params, list):
+            params = [params] * len(filters)
+        for name, filter_params in zip(filters, params):
+            if name != "FlateDecode":
+                raise UnsupportedPDFError(f"Unsupported stream filter /{name}")
+            try:
+                raw = zlib.decompress(raw)
+            except zlib.error as e:
+                raise UnsupportedPDFError(f"Corrupt Flate stream: {e}") from e
+            raw = _decode_predictor(raw, self.resolve(filter_params) or {})
+        return raw
+
+    def resolve(self, value):
+        """Follow an indirect reference (direct values are returned as-is)."""
+        if not isinstance(value, Ref):
+            return value
+        entry = self._entry(value.number)
+        if entry is None or entry[0] == 0:
+            return None
+        kind, location, _ = entry
+        if kind == 2:
+            return self._object_from_stream(location, value.number)
+        if kind != 1:
+            return None
+        ref, obj, _ = self._parse_indirect(location)
+        if ref.number != value.number:
+            raise UnsupportedPDFError(f"xref offset for object {value.number} is wrong")
+        return obj
+
+    def _object_from_stream(self, stream_number: int, number: int):
+        """Parse an object stored in a compressed object stream (/ObjStm)."""
+        cached = self._object_streams.get(stream_number)
+        if cached is None:
+            entry = self._entry(stream_number)
+            if entry is None or entry[0] != 1:
+                raise UnsupportedPDFError(f"Object stream {stream_number} not found")
+            _, stream_dict, data_start = self._parse_indirect(entry[1])
+            if (
+                data_start is None
+                or not isinstance(stream_dict, dict)
+                or stream_dict.get("Type") != "ObjStm"
+            ):
+                raise UnsupportedPDFError(f"Object {stream_number} is not an ObjStm")
+            content = self.stream_data(stream_dict, data_start)
+            header = _Lexer(content)
+            first = stream_dict.get("First", 0)
+            offsets = {}
+            for _ in range(stream_dict.get("N", 0)):
+                object_number = header.read_int()
+                offsets[object_number] = first + header.read_int()
+            cached = (content, offsets)
+            self._object_streams[stream_number] = cached
+        content, offsets = cached
+        if number not in offsets:
+            raise UnsupportedPDFError(
+                f"Object {number} missing from object stream {stream_number}"
+            )
+        return _Lexer(content, offsets[number]).parse_object()
+
+
+def _serialize(value) -> bytes:
+    """Serialize a parsed PDF object back to PDF syntax."""
+    if isinstance(value, Name):
+        return b"/" + _escape_name(value)
+    if isinstance(value, bool):
+        return b"true" if value else b"false"
+    if value is None:
+        return b"null"
+    if isinstance(value, Ref):
+        return b"%d %d R" % (value.number, value.generation)
+    if isinstance(value, int):
+        return b"%d" % value
+    if isinstance(value, float):
+        return (b"%.6f" % value).rstrip(b"0").rstrip(b".")
+    if isinstance(value, bytes):
+        if all(0x20 <= c < 0x7F for c in value):
+            escaped = (
+                value.replace(b"\\", b"\\\\")
+                .replace(b"(", b"\\(")
+                .replace(b")", b"\\)")
+            )
+            return b"(" + escaped + b")"
+        return b"<" + value.hex().upper().encode("ascii") + b">"
+    if isinstance(value, list):
+        return b"[" + b" ".join(_serialize(item) for item in value) + b"]"
+    if isinstance(value, dict):
+        items = b"".join(
+            b"/" + _escape_name(key) + b" " + _serialize(item)
+            for key, item in value.items()
+        )
+        return b"<<" + items + b">>"
+    raise TypeError(f"Cannot serialize {type(value).__name__} to PDF")
+
+
+def _escape_name(name: str) -> bytes:
+    out = bytearray()
+    for char in name.encode("latin-1"):
+        if char < 0x21 or char > 0x7E or char in DELIMITERS or char == 0x23:
+            out += b"#%02X" % char
+        else:
+            out.append(char)
+    return bytes(out)
+
+
+# PDFDocEncoding matches Latin-1 except for these code points (PDF 32000
+# Annex D); 0x7F, 0x9F and 0xAD are undefined and decode to U+FFFD
+_PDFDOC_DIFFERENCES = {
+    0x18: "\u02d8", 0x19: "\u02c7", 0x1A: "\u02c6", 0x1B: "\u02d9",
+    0x1C: "\u02dd", 0x1D: "\u02db", 0x1E: "\u02da", 0x1F: "\u02dc",
+    0x7F: "\ufffd", 0x80: "\u2022", 0x81: "\u2020", 0x82: "\u2021",
+    0x83: "\u2026", 0x84: "\u2014", 0x85: "\u2013", 0x86: "\u0192",
+    0x87: "\u2044", 0x88: "\u2039", 0x89: "\u203a", 0x8A: "\u2212",
+    0x8B: "\u2030", 0x8C: "\u201e", 0x8D: "\u201c", 0x8E: "\u201d",
+    0x8F: "\u2018", 0x90: "\u2019", 0x91: "\u201a", 0x92: "\u2122",
+    0x93: "\ufb01", 0x94: "\ufb02", 0x95: "\u0141", 0x96: "\u0152",
+    0x97: "\u0160", 0x98: "\u0178", 0x99: "\u017d", 0x9A: "\u0131",
+    0x9B: "\u0142", 0x9C: "\u0153", 0x9D: "\u0161", 0x9E: "\u017e",
+    0x9F: "\ufffd", 0xA0: "\u20ac", 0xAD: "\ufffd",
+}  # fmt: skip
+_PDFDOC_TABLE = str.maketrans(_PDFDOC_DIFFERENCES)
+
+
+def decode_text_string(raw: bytes) -> str:
+    """
+    Decode a PDF text string.
+
+    Strings starting with a UTF-16BE byte order mark are UTF-16BE (a UTF-8
+    BOM, allowed since PDF 2.0, selects UTF-8); anything else is
+    PDFDocEncoding.
+    """
+    if raw.startswith(b"\xfe\xff"):
+        return raw[2:].decode("utf-16-be", errors="replace")
+    if raw.startswith(b"\xef\xbb\xbf"):
+        return raw[3:].decode("utf-8", errors="replace")
+    return raw.decode("latin-1").translate(_PDFDOC_TABLE)
+
+
+def encode_text_string(text: str) -> bytes:
+    """
+    Encode a Python string as a PDF text string.
+
+    Plain ASCII is stored as-is; anything else uses UTF-16BE with a byte
+    order mark, which every PDF reader understands.
+    """
+    if text.isascii():
+        return text.encode("ascii")
+    return b"\xfe\xff" + text.encode("utf-16-be")
+
+
+@contextmanager
+def _open_document(path: Path) -> Iterator[_PDFDocument]:
+    """
+    Memory-map a PDF and parse its trailer.
+
+    Pages are only faulted in for the tail of the file and the objects that
+    are actually resolved, so opening a very large score is cheap.
+    """
+    with open(path, "rb") as f:
+        try:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError as e:
+            raise UnsupportedPDFError(f"Cannot map '{path}': {e}") from e
+        try:
+            if data.find(b"%PDF-", 0, 1024) < 0:
+                raise UnsupportedPDFError("Missing %PDF- header")
+            yield _PDFDocument(data)
+        except UnsupportedPDFError:
+            raise
+        except (
+            AttributeError,
+            IndexError,
+            KeyError,
+            TypeError,
+            ValueError,
+            RecursionError,
+        ) as e:
+            # An object of an unexpected type where a dictionary, number or
+            # array was needed
+            raise UnsupportedPDFError(f"Malformed PDF: {e}") from e
+        finally:
+            data.close()
+
+
+def read_info(path: Path) -> dict[str, str]:
+    """
+    Read the Info dictionary of a PDF without exiftool.
+
+    Args:
+        path: Path to the PDF file
+
+    Returns:
+        Dictionary of Info entries with text string values, decoded to str
+
+    Raises:
+        UnsupportedPDFError: If the file is encrypted or malformed
+        OSError: If the file cannot be opened
+    """
+    with _open_document(path) as document:
+        if "Encrypt" in document.trailer:
+            raise UnsupportedPDFError("PDF is encrypted")
+        info = document.resolve(document.trailer.get("Info"))
+        if not isinstance(info, dict):
+            return {}
+        result = {}
+        for key, value in info.items():
+            value = document.resolve(value)
+            if isinstance(value, bytes):
+                result[key] = decode_text_string(value)
+        return result
+
+
+def _build_update(document: _PDFDocument, info: dict, data_end: int) -> bytes:
+    """Build an incremental update section that replaces the Info object."""
+    trailer = document.trailer
+    info_number = trailer.get("Size")
+    if not isinstance(info_number, int):
+        raise UnsupportedPDFError("Trailer has no /Size")
+
+    # Keep the update on its own line after the original %%EOF
+    prefix = b"" if document.data[data_end - 1 : data_end] in (b"\n", b"\r") else b"\n"
+    info_offset = data_end + len(prefix)
+    body = prefix + b"%d 0 obj\n%s\nendobj\n" % (info_number, _serialize(info))
+    xref_offset = data_end + len(body)
+
+    new_trailer = {"Root": trailer["Root"], "Info": Ref(info_number, 0)}
+    if "ID" in trailer:
+        new_trailer["ID"] = trailer["ID"]
+    new_trailer["Prev"] = document.startxref
+
+    if document.is_xref_stream:
+        # Cross-reference streams cannot be followed by a classic table, so
+        # write a small uncompressed xref stream covering both new objects
+        stream_number = info_number + 1
+        width = max(1, (xref_offset.bit_length() + 7) // 8)
+        rows = b"".join(
+            b"\x01" + offset.to_bytes(width, "big") + b"\x00"
+            for offset in (info_offset, xref_offset)
+        )
+        stream_dict = {
+            "Type": Name("XRef"),
+            "Size": stream_number + 1,
+            "Index": [info_number, 2],
+            "W": [1, width, 1],
+            **new_trailer,
+            "Length": len(rows),
+        }
+        xref = (
+            b"%d 0 obj\n%s\nstream\n" % (stream_number, _serialize(stream_dict))
+            + rows
+            + b"\nendstream\nendobj\n"
+        )
+    else:
+        xref = (
+            # Repeating the object 0 free entry keeps strict readers happy
+            b"xref\n0 1\n0000000000 65535 f\r\n"
+            + b"%d 1\n%010d 00000 n\r\n" % (info_number, info_offset)
+            + b"trailer\n"
+            + _serialize({"Size": info_number + 1, **new_trailer})
+            + b"\n"
+        )
+    return body + xref + b"startxref\n%d\n%%%%EOF\n" % xref_offset
+
+
+def write_info_incremental(
+    source: Path, info: dict[str, str], destination: Path | None = None
+) -> int:
+    """
+    Set Info dictionary entries by appending an incremental update.
+
+    The original bytes are left untouched: a new Info object, an xref
+    section (or xref stream, matching the file) and a trailer with /Prev are
+    appended, so the cost depends on the size of the metadata rather than
+    the size of the PDF. Existing Info entries not named in `info` are kept.
+
+    Args:
+        source: Path to the PDF file
+        info: Info entries to set (e.g. {"Title": "...", "Author": "..."})
+        destination: Optional path to write the updated copy to. The copy
+                     is a reflink clone where the filesystem supports it
+                     (see clone_file). If None, the update is appended to
+                     the source file.
+
+    Returns:
+        Number of bytes appended
+
+    Raises:
+        UnsupportedPDFError: If the file is encrypted, malformed, or carries
+            an XMP metadata stream that would go stale
+        OSError: If file operations fail
+    """
+    with _open_document(source) as document:
+        if "Encrypt" in document.trailer:
+            raise UnsupportedPDFError("PDF is encrypted")
+        catalog = document.resolve(document.trailer.get("Root"))
+        if not isinstance(catalog, dict):
+            raise UnsupportedPDFError("Missing document catalog")
+        if "Metadata" in catalog:
+            # Only exiftool keeps XMP in sync with the Info dictionary
+            raise UnsupportedPDFError("PDF has an XMP metadata stream")
+
+        new_info = document.resolve(document.trailer.get("Info"))
+        new_info = dict(new_info) if isinstance(new_info, dict) else {}
+        for key, value in info.items():
+            new_info[key] = encode_text_string(value)
+        update = _build_update(document, new_info, len(document.data))
+
+    if destination is None:
+        with open(source, "ab") as f:
+            f.write(update)
+    else:
+        # The copy shares the source's blocks where the filesystem supports
+        # reflinks, so only the update itself is written
+        clone_file(source, destination)
+        with open(destination, "ab") as f:
+            f.write(update)
+    return len(update)
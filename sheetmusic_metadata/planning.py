@@ -0,0 +1,303 @@
+"""Metadata plans: compute every file's metadata up front, apply it later."""
+
+import json
+import os
+import sys
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+from pathlib import Path
+
+from sheetmusic_metadata import profiling
+from sheetmusic_metadata.composer_lookup import ComposerLookup
+from sheetmusic_metadata.exiftool_session import ExifToolSession
+from sheetmusic_metadata.formatting import (
+    format_opus_string,
+    format_part_string,
+    format_work_title,
+)
+from sheetmusic_metadata.instrument_family import get_instrument_family
+from sheetmusic_metadata.output_index import OutputIndex
+from sheetmusic_metadata.parsing import FilenameSchema, parse_filename
+from sheetmusic_metadata.pdf_metadata import METADATA_FIELDS, apply_pdf_metadata
+from sheetmusic_metadata.sharding import Shard, shard_counter
+
+
+def build_metadata(
+    filename: str,
+    composer_lookup: ComposerLookup,
+    additional_tags: list[str] | None = None,
+    schema: FilenameSchema | None = None,
+) -> dict[str, str]:
+    """
+    Compute the PDF metadata for a file from its name alone.
+
+    Args:
+        filename: Name of the PDF file
+        composer_lookup: ComposerLookup instance
+        additional_tags: Optional list of additional tags to add to keywords
+        schema: Optional filename schema (defaults to DEFAULT_SCHEMA)
+
+    Returns:
+        Dict with Title, Author, Subject and Keywords
+
+    Raises:
+        ValueError: If filename parsing fails
+    """
+    with profiling.stage("parse"):
+        components = parse_filename(filename, schema)
+
+    # Lookup composer name (use PDF-compatible format to avoid forScore splitting on commas)
+    with profiling.stage("lookup"):
+        full_composer_name = composer_lookup.get_full_name_for_pdf(
+            components.composer_last_name
+        )
+
+    # Format components
+    with profiling.stage("format"):
+        formatted_work_title = format_work_title(components.work_identifier)
+        if components.movement:
+            formatted_work_title += f": {format_work_title(components.movement)}"
+        formatted_part = format_part_string(components.part)
+        formatted_opus = format_opus_string(components.opus)
+        instrument_family_tag = get_instrument_family(formatted_part)
+
+    # Build keywords list
+    keywords = ["Orchestral", formatted_part]
+    if formatted_opus != "NoOp":
+        keywords.append(formatted_opus)
+    keywords.append(instrument_family_tag)
+    if additional_tags:
+        keywords.extend(additional_tags)
+
+    return {
+        "Title": f"{formatted_work_title} - {formatted_part} Part",
+        "Author": full_composer_name,
+        "Subject": "Orchestral",
+        "Keywords": ",".join(keywords),
+    }
+
+
+@dataclass
+class PlanEntry:
+    """One line of a plan: the input file, its target path and its metadata."""
+
+    input: Path
+    output: Path
+    metadata: dict[str, str]
+    # Output directory of the run, holding its manifest and journal; None
+    # for plans written before it was recorded
+    output_dir: Path | None = None
+
+    def to_json(self) -> str:
+        """Serialize the entry as a single JSON line (without newline)."""
+        data = {"input": str(self.input), "output": str(self.output), **self.metadata}
+        if self.output_dir is not None:
+            data["output_dir"] = str(self.output_dir)
+        return json.dumps(data, ensure_ascii=False)
+
+    @classmethod
+    def from_json(cls, line: str) -> "PlanEntry":
+        """
+        Parse an entry written by to_json.
+
+        Raises:
+            ValueError: If the line is not a valid plan entry
+        """
+        data = json.loads(line)
+        if not isinstance(data, dict):
+            raise ValueError("expected a JSON object")
+        missing = [
+            key for key in ("input", "output", *METADATA_FIELDS) if key not in data
+        ]
+        if missing:
+            raise ValueError(f"missing {', '.join(missing)}")
+        return cls(
+            Path(data["input"]),
+            Path(data["output"]),
+            {field: str(data[field]) for field in METADATA_FIELDS},
+            Path(data["output_dir"]) if "output_dir" in data else None,
+        )
+
+
+def read_plan(lines: Iterable[str]) -> Iterator[PlanEntry]:
+    """
+    Parse plan entries lazily, one per non-blank line.
+
+    Args:
+        lines: Lines of a plan file
+
+    Yields:
+        PlanEntry for each line
+
+    Raises:
+        ValueError: If a line is not a valid plan entry (with its line number)
+    """
+    for number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            yield PlanEntry.from_json(line)
+        except ValueError as e:
+            raise ValueError(f"Invalid plan entry on line {number}: {e}") from e
+
+
+def metadata_differences(expected: dict[str, str], actual: dict[str, str]) -> list[str]:
+    """
+    List the metadata fields whose values differ.
+
+    Keywords are compared as lists of comma-separated items, ignoring the
+    spacing around commas, since readers such as exiftool rejoin them with
+    ", ".
+
+    Args:
+        expected: Planned metadata
+        actual: Metadata read from the PDF
+
+    Returns:
+        Names of the fields that differ, in METADATA_FIELDS order
+    """
+
+    def normalized(field: str, value: str) -> object:
+        if field == "Keywords":
+            return [item.strip() for item in value.split(",")]
+        return value
+
+    return [
+        field
+        for field in METADATA_FIELDS
+        if normalized(field, expected.get(field, ""))
+        != normalized(field, actual.get(field, ""))
+    ]
+
+
+class OutputPlanner:
+    """
+    Predict output paths, including (1), (2), etc. suffixes, without writing.
+
+    Each output directory is listed once; names handed out earlier in the
+    same plan count as taken. The prediction can be overtaken by files
+    written before the plan is applied, in which case the apply step fails
+    for that file rather than writing it under another name.
+    """
+
+    def __init__(self, shard: Shard | None = None) -> None:
+        """
+        Create a planner with no directories listed yet.
+
+        Args:
+            shard: Optional (K, N) shard whose suffixes to use, as for
+                   OutputIndex
+        """
+        self.shard = shard
+        self._names: dict[Path, set[str]] = {}
+        self._next_counter: dict[tuple[Path, str, str], int] = {}
+
+    def _taken(self, output_dir: Path) -> set[str]:
+        names = self._names.get(output_dir)
+        if names is None:
+            try:
+                with os.scandir(output_dir) as entries:
+                    names = {entry.name for entry in entries}
+            except FileNotFoundError:
+                names = set()
+            self._names[output_dir] = names
+        return names
+
+    def plan(self, output_dir: Path, filename: str) -> Path:
+        """
+        Choose the output path a file would be written to.
+
+        Args:
+            output_dir: Directory the file will be written to
+            filename: Original filename
+
+        Returns:
+            Planned output path
+        """
+        taken = self._taken(output_dir)
+        if filename not in taken:
+            taken.add(filename)
+            return output_dir / filename
+
+        name = Path(filename)
+        key = (output_dir, name.stem, name.suffix)
+        counter = shard_counter(self._next_counter.get(key, 1), self.shard)
+        while f"{name.stem} ({counter}){name.suffix}" in taken:
+            counter = shard_counter(counter + 1, self.shard)
+        new_filename = f"{name.stem} ({counter}){name.suffix}"
+        taken.add(new_filename)
+        self._next_counter[key] = counter + 1
+        return output_dir / new_filename
+
+
+def apply_plan_entry(
+    entry: PlanEntry,
+    session: ExifToolSession | None = None,
+    backend: str = "exiftool",
+    output_index: OutputIndex | None = None,
+) -> Path:
+    """
+    Write the metadata of one plan entry.
+
+    The output is written to the planned path only, so that `verify` checks
+    the file that was written: if that name has been taken since the plan
+    was made, the entry fails.
+
+    Args:
+        entry: Plan entry to apply
+        session: Optional exiftool session shared across files
+        backend: Metadata writer backend ("exiftool" or "native")
+        output_index: Optional index of output names shared across the run
+
+    Returns:
+        Path to the output file
+
+    Raises:
+        FileNotFoundError: If the input file or exiftool is missing
+        FileExistsError: If the planned output already exists
+        subprocess.CalledProcessError: If exiftool fails
+    """
+    print(f"Processing file: {entry.input.name}")
+    print(f"Composer: {entry.metadata['Author']}")
+    print(f'Title: "{entry.metadata["Title"]}"')
+    print(f'Keywords (Tags): "{entry.metadata["Keywords"]}"')
+
+    try:
+        if not entry.input.is_file():
+            raise FileNotFoundError(f"Input file '{entry.input}' not found")
+        if entry.output.exists():
+            raise FileExistsError(
+                f"Planned output '{entry.output}' already exists; plan again "
+                "to choose a free name"
+            )
+        output_path = apply_pdf_metadata(
+            entry.input,
+            entry.metadata["Title"],
+            entry.metadata["Author"],
+            entry.metadata["Subject"],
+            entry.metadata["Keywords"],
+            entry.output.parent,
+            session=session,
+            backend=backend,
+            output_index=output_index,
+            output_name=entry.output.name,
+        )
+        if output_path != entry.output:
+            # Taken by another process since the check above
+            output_path.unlink()
+            raise FileExistsError(
+                f"Planned output '{entry.output}' already exists; plan again "
+                "to choose a free name"
+            )
+        print("  Successfully applied metadata.")
+    except Exception as e:
+        print(
+            f"  Error: Failed to apply metadata to '{entry.input.name}'.",
+            file=sys.stderr,
+        )
+        print(f"  {e}", file=sys.stderr)
+        print("---")
+        raise
+
+    print("---")
+    return output_path
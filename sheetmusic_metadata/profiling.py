@@ -0,0 +1,155 @@
+"""Optional per-stage timing and I/O counters for --profile."""
+
+import contextlib
+import time
+from array import array
+
+# Shared no-op context returned by stage() while profiling is disabled
+_DISABLED = contextlib.nullcontext()
+
+
+class _StageTimer:
+    """Context manager that records one duration for a stage."""
+
+    __slots__ = ("_samples", "_start")
+
+    def __init__(self, samples: array):
+        self._samples = samples
+
+    def __enter__(self) -> None:
+        self._start = time.perf_counter_ns()
+
+    def __exit__(self, *exc_info: object) -> None:
+        self._samples.append(time.perf_counter_ns() - self._start)
+
+
+class Profiler:
+    """Collects stage durations (in nanoseconds), byte counts and counters."""
+
+    def __init__(self) -> None:
+        """Create an empty profiler."""
+        self._reset()
+
+    def _reset(self) -> None:
+        self.samples: dict[str, array] = {}
+        self.bytes_read = 0
+        self.bytes_written = 0
+        self.counters: dict[str, int] = {}
+
+    def stage(self, name: str) -> _StageTimer:
+        """Time a block as one sample of the named stage."""
+        samples = self.samples.get(name)
+        if samples is None:
+            samples = self.samples[name] = array("q")
+        return _StageTimer(samples)
+
+    def drain(self) -> dict:
+        """
+        Return everything collected so far as plain data and start over.
+
+        Used by worker processes to send their measurements to the parent,
+        which adds them with merge().
+        """
+        state = {
+            "samples": self.samples,
+            "bytes_read": self.bytes_read,
+            "bytes_written": self.bytes_written,
+            "counters": self.counters,
+        }
+        self._reset()
+        return state
+
+    def merge(self, state: dict) -> None:
+        """Add measurements returned by another profiler's drain()."""
+        for name, samples in state["samples"].items():
+            self.samples.setdefault(name, array("q")).extend(samples)
+        self.bytes_read += state["bytes_read"]
+        self.bytes_written += state["bytes_written"]
+        for name, value in state["counters"].items():
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def report(self) -> dict:
+        """
+        Summarize the measurements.
+
+        Returns:
+            Dict with per-stage count, total and mean/p50/p95/p99/max
+            latencies (milliseconds), bytes read and written, and counters
+        """
+        stages = {}
+        for name, samples in sorted(self.samples.items()):
+            ordered = sorted(samples)
+            total = sum(ordered)
+            stages[name] = {
+                "count": len(ordered),
+                "total_s": total / 1e9,
+                "mean_ms": total / len(ordered) / 1e6 if ordered else 0.0,
+                "p50_ms": _percentile(ordered, 50) / 1e6,
+                "p95_ms": _percentile(ordered, 95) / 1e6,
+                "p99_ms": _percentile(ordered, 99) / 1e6,
+                "max_ms": (ordered[-1] if ordered else 0) / 1e6,
+            }
+        return {
+            "stages": stages,
+            "bytes_read": self.bytes_read,
+            "bytes_written": self.bytes_written,
+            "counters": dict(sorted(self.counters.items())),
+        }
+
+
+def _percentile(ordered: list[int], percent: int) -> int:
+    """Nearest-rank percentile of an already sorted list."""
+    if not ordered:
+        return 0
+    rank = -(-percent * len(ordered) // 100)  # ceil
+    return ordered[max(rank, 1) - 1]
+
+
+_profiler: Profiler | None = None
+
+
+def enable() -> Profiler:
+    """Start collecting measurements in this process."""
+    global _profiler
+    if _profiler is None:
+        _profiler = Profiler()
+    return _profiler
+
+
+def disable() -> None:
+    """Stop collecting measurements and discard them."""
+    global _profiler
+    _profiler = None
+
+
+def get_profiler() -> Profiler | None:
+    """Get the active profiler, or None if profiling is disabled."""
+    return _profiler
+
+
+def stage(name: str) -> contextlib.AbstractContextManager:
+    """
+    Time a block as one sample of the named stage.
+
+    While profiling is disabled this returns a shared no-op context manager,
+    so instrumented code pays only a function call.
+
+    Args:
+        name: Stage name used in the report
+    """
+    if _profiler is None:
+        return _DISABLED
+    return _profiler.stage(name)
+
+
+def add_bytes(read: int = 0, written: int = 0) -> None:
+    """Count bytes read and written (ignored while profiling is disabled)."""
+    if _profiler is not None:
+        _profiler.bytes_read += read
+        _profiler.bytes_written += written
+
+
+def count(name: str, increment: int = 1) -> None:
+    """Increment a named counter (ignored while profiling is disabled)."""
+    if _profiler is not None:
+        _profiler.counters[name] = _profiler.counters.get(name, 0) + increment
@@ -0,0 +1,85 @@
+"""Streaming discovery of PDF files in an input directory tree."""
+
+import os
+import sys
+from collections.abc import Iterator
+from pathlib import Path
+
+
+def iter_pdf_files(
+    root: Path, recursive: bool = False, exclude: Path | None = None
+) -> Iterator[Path]:
+    """
+    Yield PDF files under a directory in sorted order, as they are found.
+
+    Each directory is read with a single os.scandir pass and its PDFs are
+    yielded before descending into its subdirectories, so processing can
+    start on the first file straight away. Only one directory listing is
+    held at a time, plus the pending subdirectory names of each level
+    being walked.
+
+    Hidden entries (names starting with ".") are skipped, as are
+    symlinked directories so that link cycles cannot be followed.
+    Subdirectories that cannot be read are skipped with a warning.
+
+    Args:
+        root: Directory to scan
+        recursive: If True, also scan subdirectories
+        exclude: Directory to leave out of the scan (e.g. an output
+                 directory inside the input tree)
+
+    Yields:
+        Paths of files whose name ends in ".pdf"
+
+    Raises:
+        OSError: If the root directory cannot be read
+    """
+    excluded = _identity(exclude) if exclude is not None else None
+    # Stack of iterators over sorted subdirectory paths, one per level
+    stack: list[Iterator[Path]] = [iter([root])]
+    while stack:
+        directory = next(stack[-1], None)
+        if directory is None:
+            stack.pop()
+            continue
+
+        try:
+            files, subdirs = _list_directory(directory, excluded)
+        except OSError as e:
+            if directory == root:
+                raise
+            # A subdirectory removed or made unreadable mid-scan
+            print(f"Warning: Skipping directory '{directory}': {e}", file=sys.stderr)
+            continue
+        for name in files:
+            yield directory / name
+        if recursive and subdirs:
+            stack.append(iter([directory / name for name in subdirs]))
+
+
+def _list_directory(
+    directory: Path, excluded: tuple[int, int] | None
+) -> tuple[list[str], list[str]]:
+    """Return sorted PDF file names and subdirectory names of one directory."""
+    files = []
+    subdirs = []
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if entry.name.startswith("."):
+                continue
+            if entry.is_dir(follow_symlinks=False):
+                if excluded is None or _identity(Path(entry.path)) != excluded:
+                    subdirs.append(entry.name)
+            elif entry.name.endswith(".pdf") and entry.is_file():
+                files.append(entry.name)
+    files.sort()
+    subdirs.sort()
+    return files, subdirs
+
+
+def _identity(path: Path) -> tuple[int, int] | None:
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    return stat.st_dev, stat.st_ino
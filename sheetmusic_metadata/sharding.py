@@ -0,0 +1,145 @@
+"""Deterministic split of an input set into shards run on separate machines."""
+
+import hashlib
+import json
+import os
+import re
+from collections.abc import Callable
+from pathlib import Path, PurePath
+
+# A shard: (K, N) for the K-th of N shards, K counted from 1
+Shard = tuple[int, int]
+
+
+def parse_shard(spec: str) -> Shard:
+    """
+    Parse a "K/N" shard specification.
+
+    Raises:
+        ValueError: If the specification is not K/N with 1 <= K <= N
+    """
+    match = re.fullmatch(r"\s*(\d+)\s*/\s*(\d+)\s*", spec)
+    if match is None:
+        raise ValueError(f"expected K/N (e.g. 2/4), got '{spec}'")
+    index, count = int(match.group(1)), int(match.group(2))
+    if not 1 <= index <= count:
+        raise ValueError(f"K must be between 1 and N, got '{spec}'")
+    return index, count
+
+
+def shard_of(relative_path: PurePath, count: int) -> int:
+    """
+    Choose the shard of an input from its path relative to the input directory.
+
+    The path is hashed with BLAKE2b, so every machine assigns the same
+    inputs to the same shard regardless of listing order, mount point or
+    Python's hash randomization.
+
+    Args:
+        relative_path: Path of the input relative to the input directory
+        count: Number of shards
+
+    Returns:
+        Shard number, from 1 to count
+    """
+    key = os.fsencode(relative_path.as_posix())
+    digest = hashlib.blake2b(key, digest_size=8).digest()
+    return int.from_bytes(digest, "big") % count + 1
+
+
+def shard_counter(counter: int, shard: Shard | None) -> int:
+    """
+    Smallest "(N)" conflict suffix at or above counter that a shard may use.
+
+    Shard K of N only uses suffixes congruent to K modulo N, so shards
+    writing into the same directory never compete for a name.
+    """
+    if shard is None:
+        return counter
+    index, count = shard
+    return counter + (index - counter) % count
+
+
+def shard_filename(filename: str, shard: Shard | None) -> str:
+    """Name of a shard's own copy of a bookkeeping file (manifest, journal)."""
+    if shard is None:
+        return filename
+    stem, dot, suffix = filename.rpartition(".")
+    return f"{stem}.shard-{shard[0]}-of-{shard[1]}{dot}{suffix}"
+
+
+def _shard_files(output_dir: Path, filename: str) -> dict[Shard, Path]:
+    """Find the shard copies of a bookkeeping file in an output directory."""
+    stem, _, suffix = filename.rpartition(".")
+    pattern = re.compile(
+        rf"{re.escape(stem)}\.shard-(\d+)-of-(\d+)\.{re.escape(suffix)}"
+    )
+    found = {}
+    with os.scandir(output_dir) as entries:
+        for entry in entries:
+            match = pattern.fullmatch(entry.name)
+            if match is not None:
+                found[(int(match.group(1)), int(match.group(2)))] = Path(entry.path)
+    return found
+
+
+def merge_shard_files(
+    output_dir: Path, filename: str, key: Callable[[dict], object]
+) -> tuple[list[Shard], int]:
+    """
+    Append the entries of every shard's copy of a JSONL file to the main one.
+
+    Entries already in the main file (by `key`) are not repeated, so merging
+    again after a failed merge is safe. The shard copies are removed once
+    their entries are on disk.
+
+    Args:
+        output_dir: Output directory shared by the shards
+        filename: Name of the main file, e.g. MANIFEST_FILENAME
+        key: Function returning the identity of an entry
+
+    Returns:
+        Tuple of (shards merged, entries added)
+
+    Raises:
+        OSError: If a file cannot be read or written
+    """
+    shard_files = _shard_files(output_dir, filename)
+    if not shard_files:
+        return [], 0
+
+    main_path = output_dir / filename
+    seen = {entry_key for entry_key, _ in _read_entries(main_path, key)}
+
+    added = 0
+    with open(main_path, "a", encoding="utf-8") as main:
+        for shard in sorted(shard_files):
+            for entry_key, line in _read_entries(shard_files[shard], key):
+                if entry_key not in seen:
+                    seen.add(entry_key)
+                    main.write(line.rstrip("\n") + "\n")
+                    added += 1
+        main.flush()
+        os.fsync(main.fileno())
+
+    for path in shard_files.values():
+        path.unlink()
+    return sorted(shard_files), added
+
+
+def _read_entries(
+    path: Path, key: Callable[[dict], object]
+) -> list[tuple[object, str]]:
+    """Keys and lines of the valid entries of a JSONL file, if it exists."""
+    entries = []
+    try:
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entries.append((key(json.loads(line)), line))
+                except (ValueError, KeyError, TypeError):
+                    # A crash mid-write can leave a partial last line
+                    continue
+    except FileNotFoundError:
+        pass
+    return entries
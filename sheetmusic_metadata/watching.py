@@ -0,0 +1,255 @@
+"""Detection of PDFs arriving in a directory, for the watch command."""
+
+import ctypes
+import os
+import select
+import struct
+import sys
+import time
+from collections.abc import Iterator
+from pathlib import Path
+
+# Seconds without new arrivals before a batch is handed out
+DEFAULT_SETTLE = 0.2
+# Longest a file waits for a batch to close while arrivals keep coming
+DEFAULT_MAX_BATCH_DELAY = 0.5
+# Seconds between directory listings when inotify is not available
+DEFAULT_POLL_INTERVAL = 0.25
+
+# inotify constants from <sys/inotify.h>
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_TO = 0x00000080
+_IN_Q_OVERFLOW = 0x00004000
+_IN_IGNORED = 0x00008000
+_IN_NONBLOCK = os.O_NONBLOCK
+_IN_CLOEXEC = os.O_CLOEXEC
+# struct inotify_event: int wd; uint32_t mask, cookie, len; char name[len]
+_EVENT_HEADER = struct.Struct("iIII")
+
+
+def _is_pdf_name(name: str) -> bool:
+    """Match the files iter_pdf_files picks up."""
+    return name.endswith(".pdf") and not name.startswith(".")
+
+
+class _Inotify:
+    """Minimal inotify binding through ctypes (Linux only)."""
+
+    def __init__(self, directory: Path):
+        libc = ctypes.CDLL(None, use_errno=True)
+        # AttributeError here (no inotify in this libc) selects polling
+        init1 = libc.inotify_init1
+        add_watch = libc.inotify_add_watch
+        add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        self.fd = init1(_IN_NONBLOCK | _IN_CLOEXEC)
+        if self.fd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno))
+        # Files written in place are ready once closed; files moved in
+        # (e.g. renamed from a temporary name) are ready immediately
+        mask = _IN_CLOSE_WRITE | _IN_MOVED_TO
+        if add_watch(self.fd, os.fsencode(directory), mask) < 0:
+            errno = ctypes.get_errno()
+            os.close(self.fd)
+            raise OSError(errno, os.strerror(errno), str(directory))
+
+    def read(self, timeout: float) -> tuple[set[str], bool]:
+        """
+        Wait up to `timeout` seconds for events.
+
+        Returns:
+            Tuple of (names, overflowed); overflowed is True if the kernel
+            dropped events, so the directory must be listed again
+
+        Raises:
+            FileNotFoundError: If the watched directory was removed
+        """
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return set(), False
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return set(), False
+        names = set()
+        overflowed = False
+        offset = 0
+        while offset < len(data):
+            _, mask, _, length = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            name = os.fsdecode(data[offset : offset + length].rstrip(b"\0"))
+            offset += length
+            if mask & _IN_Q_OVERFLOW:
+                overflowed = True
+            elif mask & _IN_IGNORED:
+                raise FileNotFoundError("The watched directory was removed")
+            elif _is_pdf_name(name):
+                names.add(name)
+        return names, overflowed
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+class DirectoryWatcher:
+    """
+    Report PDFs that finish arriving in a directory, in batches.
+
+    inotify is used where available: a file is ready when the writer
+    closes it or when it is moved into the directory. Elsewhere (or if
+    inotify cannot be set up, e.g. the watch limit is reached) the
+    directory is listed every `poll_interval` seconds and a file is ready
+    once its size and modification time stop changing between listings.
+
+    Arrivals are collected until none has come for `settle` seconds, or
+    the oldest has waited `max_batch_delay` seconds, so a burst of scans
+    becomes one batch while a single file is still handed out within a
+    fraction of a second.
+
+    Only the directory itself is watched, not its subdirectories. Files
+    already present when the watcher is created are not reported; list
+    them separately after creating the watcher so none is missed.
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        settle: float = DEFAULT_SETTLE,
+        max_batch_delay: float = DEFAULT_MAX_BATCH_DELAY,
+        poll_interval: float = DEFAULT_POLL_INTERVAL,
+        force_polling: bool = False,
+    ):
+        """
+        Start watching a directory.
+
+        Args:
+            directory: Directory to watch
+            settle: Quiet period in seconds that closes a batch
+            max_batch_delay: Longest wait in seconds before a batch is
+                             closed while files keep arriving
+            poll_interval: Seconds between listings when polling
+            force_polling: Poll even if inotify is available
+
+        Raises:
+            OSError: If the directory cannot be read
+        """
+        self.directory = directory
+        self.settle = settle
+        self.max_batch_delay = max_batch_delay
+        self.poll_interval = poll_interval
+        self._inotify: _Inotify | None = None
+        if not force_polling and sys.platform.startswith("linux"):
+            try:
+                self._inotify = _Inotify(directory)
+            except (AttributeError, OSError) as e:
+                print(
+                    f"Warning: inotify is not available ({e}); polling "
+                    f"'{directory}' every {poll_interval}s instead.",
+                    file=sys.stderr,
+                )
+        # Polling state: the signature of each PDF at the last listing, and
+        # the signature it had when it was last reported
+        self._signatures = self._list_signatures()
+        self._reported = dict(self._signatures)
+
+    @property
+    def mode(self) -> str:
+        """How arrivals are detected: "inotify" or "polling"."""
+        return "inotify" if self._inotify is not None else "polling"
+
+    def __enter__(self) -> "DirectoryWatcher":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Stop watching; safe to call repeatedly."""
+        if self._inotify is not None:
+            self._inotify.close()
+            self._inotify = None
+
+    def _list_signatures(self) -> dict[str, tuple[int, int]]:
+        signatures = {}
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                if _is_pdf_name(entry.name):
+                    try:
+                        if entry.is_file():
+                            stat = entry.stat()
+                            signatures[entry.name] = (stat.st_size, stat.st_mtime_ns)
+                    except OSError:
+                        continue
+        return signatures
+
+    def _wait(self, timeout: float) -> set[str]:
+        """Wait up to `timeout` seconds and return names that became ready."""
+        if self._inotify is not None:
+            names, overflowed = self._inotify.read(timeout)
+            if overflowed:
+                # Events were lost: hand out everything currently present;
+                # files already tagged are skipped by the manifest
+                names.update(self._list_signatures())
+            return names
+
+        time.sleep(timeout)
+        previous = self._signatures
+        self._signatures = self._list_signatures()
+        ready = set()
+        for name, signature in self._signatures.items():
+            # Unchanged across two listings and not yet reported as such
+            if (
+                previous.get(name) == signature
+                and self._reported.get(name) != signature
+            ):
+                self._reported[name] = signature
+                ready.add(name)
+        for name in self._reported.keys() - self._signatures.keys():
+            del self._reported[name]
+        return ready
+
+    def batches(self) -> Iterator[list[Path]]:
+        """
+        Yield batches of ready PDFs, sorted by name, until closed.
+
+        Files that disappear before their batch closes are left out.
+
+        Raises:
+            FileNotFoundError: If the watched directory is removed
+        """
+        pending: set[str] = set()
+        first_arrival = last_arrival = 0.0
+        while True:
+            if not pending:
+                timeout = self.poll_interval if self._inotify is None else 1.0
+            elif self._inotify is None:
+                timeout = self.poll_interval
+            else:
+                now = time.monotonic()
+                timeout = max(
+                    min(
+                        last_arrival + self.settle,
+                        first_arrival + self.max_batch_delay,
+                    )
+                    - now,
+                    0.0,
+                )
+            names = self._wait(timeout)
+            now = time.monotonic()
+            if names:
+                if not pending:
+                    first_arrival = now
+                last_arrival = now
+                pending |= names
+            if pending and (
+                now - last_arrival >= self.settle
+                or now - first_arrival >= self.max_batch_delay
+            ):
+                batch = [
+                    self.directory / name
+                    for name in sorted(pending)
+                    if (self.directory / name).is_file()
+                ]
+                pending = set()
+                if batch:
+                    yield batch
@@ -0,0 +1,97 @@
+"""Builders for small synthetic PDFs used by the tests."""
+
+import zlib
+
+
+def build_pdf(
+    xref_stream: bool = False, catalog_extra: bytes = b"", trailer_extra: bytes = b""
+) -> bytes:
+    """Build a minimal one-page PDF with an Info dictionary."""
+    objects = [
+        b"<</Type/Catalog/Pages 2 0 R" + catalog_extra + b">>",
+        b"<</Type/Pages/Kids[3 0 R]/Count 1>>",
+        b"<</Type/Page/Parent 2 0 R/MediaBox[0 0 612 792]>>",
+        b"<</Producer(Test Suite)/Title(Old Title)>>",
+    ]
+    out = bytearray(b"%PDF-1.5\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    xref_offset = len(out)
+    if xref_stream:
+        rows = (
+            b"\x00\x00\x00\x00"
+            + b"".join(
+                b"\x01" + offset.to_bytes(2, "big") + b"\x00" for offset in offsets
+            )
+            + b"\x01"
+            + xref_offset.to_bytes(2, "big")
+            + b"\x00"
+        )
+        out += (
+            b"5 0 obj\n<</Type/XRef/Size 6/W[1 2 1]/Root 1 0 R/Info 4 0 R"
+            + trailer_extra
+            + b"/Length %d>>\nstream\n" % len(rows)
+            + rows
+            + b"\nendstream\nendobj\n"
+        )
+    else:
+        out += b"xref\n0 5\n0000000000 65535 f\r\n"
+        out += b"".join(b"%010d 00000 n\r\n" % offset for offset in offsets)
+        out += b"trailer\n<</Size 5/Root 1 0 R/Info 4 0 R" + trailer_extra + b">>\n"
+    out += b"startxref\n%d\n%%%%EOF\n" % xref_offset
+    return bytes(out)
+
+
+def build_object_stream_pdf(info: bytes) -> bytes:
+    """
+    Build a PDF whose Info dictionary is stored in a compressed object stream.
+
+    The xref stream is Flate-compressed with the PNG Up predictor, as written
+    by most PDF 1.5+ producers.
+    """
+    objects = [
+        b"<</Type/Catalog/Pages 2 0 R>>",
+        b"<</Type/Pages/Kids[3 0 R]/Count 1>>",
+        b"<</Type/Page/Parent 2 0 R/MediaBox[0 0 612 792]>>",
+    ]
+    out = bytearray(b"%PDF-1.5\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+
+    header = b"4 0 "
+    packed = zlib.compress(header + info)
+    offsets.append(len(out))
+    out += (
+        b"5 0 obj\n<</Type/ObjStm/N 1/First %d/Filter/FlateDecode/Length %d>>\n"
+        % (len(header), len(packed))
+        + b"stream\n"
+        + packed
+        + b"\nendstream\nendobj\n"
+    )
+
+    xref_offset = len(out)
+    rows = [
+        (0, 0, 0),
+        *((1, offset, 0) for offset in offsets[:3]),
+        (2, 5, 0),  # object 4 lives in object stream 5
+        (1, offsets[3], 0),
+        (1, xref_offset, 0),
+    ]
+    previous = bytes(4)
+    encoded = bytearray()
+    for kind, field2, field3 in rows:
+        row = bytes([kind]) + field2.to_bytes(2, "big") + bytes([field3])
+        encoded += b"\x02" + bytes((a - b) & 0xFF for a, b in zip(row, previous))
+        previous = row
+    packed = zlib.compress(bytes(encoded))
+    out += (
+        b"6 0 obj\n<</Type/XRef/Size 7/W[1 2 1]/Root 1 0 R/Info 4 0 R"
+        b"/Filter/FlateDecode/DecodeParms<</Predictor 12/Columns 4>>"
+        b"/Length %d>>\nstream\n" % len(packed) + packed + b"\nendstream\nendobj\n"
+    )
+    out += b"startxref\n%d\n%%%%EOF\n" % xref_offset
+    return bytes(out)
@@ -0,0 +1,253 @@
+"""Tests for the asyncio API (apply_pdf_metadata_async and process_files)."""
+
+import asyncio
+import shutil
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from sheetmusic_metadata import pdf_metadata
+from sheetmusic_metadata.async_pipeline import process_files
+from sheetmusic_metadata.composer_lookup import ComposerLookup
+from sheetmusic_metadata.exiftool_session import AsyncExifToolSession
+from sheetmusic_metadata.pdf_metadata import apply_pdf_metadata_async
+from sheetmusic_metadata.pdf_native import read_info
+from tests.pdf_builders import build_pdf
+
+requires_exiftool = pytest.mark.skipif(
+    not shutil.which("exiftool"),
+    reason="exiftool is not installed",
+)
+
+
+@pytest.fixture
+def composer_lookup():
+    """Create a composer lookup with test data."""
+    csv_path = Path(__file__).parent.parent / "composers.csv"
+    if csv_path.exists():
+        return ComposerLookup(csv_path)
+    else:
+        pytest.skip("composers.csv not found")
+
+
+def _write_inputs(input_dir: Path, names: list[str]) -> list[Path]:
+    input_dir.mkdir()
+    paths = []
+    for name in names:
+        path = input_dir / name
+        path.write_bytes(build_pdf())
+        paths.append(path)
+    return paths
+
+
+async def _collect(results) -> list:
+    return [result async for result in results]
+
+
+def test_async_session_missing_executable_raises_file_not_found():
+    """Test that a missing exiftool executable is reported clearly."""
+
+    async def run():
+        async with AsyncExifToolSession(executable="exiftool-does-not-exist") as s:
+            await s.execute("-ver")
+
+    with pytest.raises(FileNotFoundError, match="exiftool is not installed"):
+        asyncio.run(run())
+
+
+def test_async_session_rejects_newlines_in_arguments():
+    """Test that arguments that would break the argfile framing are rejected."""
+    session = AsyncExifToolSession()
+    with pytest.raises(ValueError, match="newlines"):
+        asyncio.run(session.execute("-Title=Line 1\nLine 2"))
+    assert not session.running
+
+
+def test_apply_pdf_metadata_async_native(tmp_path):
+    """Test that the async writer produces the same output as the sync one."""
+    (source,) = _write_inputs(tmp_path / "in", ["Test.pdf"])
+    output_dir = tmp_path / "out"
+
+    output = asyncio.run(
+        apply_pdf_metadata_async(
+            source, "Title", "Author", "Orchestral", "A,B", output_dir, backend="native"
+        )
+    )
+
+    assert output == output_dir / "Test.pdf"
+    info = read_info(output)
+    assert info["Title"] == "Title"
+    assert info["Keywords"] == "A,B"
+    assert sorted(p.name for p in output_dir.iterdir()) == ["Test.pdf"]
+
+
+def test_process_files_yields_every_result(tmp_path, composer_lookup):
+    """Test that successes and parse failures are all reported."""
+    names = [
+        "Beethoven_Symphony05_Op67_Violin1.pdf",
+        "Mozart_Symphony40_Op550_Cello.pdf",
+        "Brahms_Symphony01_Op68_Viola.pdf",
+        "not-a-valid-name.pdf",
+    ]
+    paths = _write_inputs(tmp_path / "in", names)
+    output_dir = tmp_path / "out"
+
+    results = asyncio.run(
+        _collect(
+            process_files(
+                paths, composer_lookup, output_dir, backend="native", concurrency=2
+            )
+        )
+    )
+
+    by_name = {result.input.name: result for result in results}
+    assert sorted(by_name) == sorted(names)
+    assert not by_name["not-a-valid-name.pdf"].ok
+    assert isinstance(by_name["not-a-valid-name.pdf"].error, ValueError)
+    beethoven = by_name["Beethoven_Symphony05_Op67_Violin1.pdf"]
+    assert beethoven.ok
+    assert read_info(beethoven.output)["Author"] == "Ludwig van Beethoven"
+    assert len(list(output_dir.iterdir())) == 3
+
+
+def test_process_files_reports_composer_index_errors(tmp_path):
+    """Test that a composer index that cannot be loaded fails each file."""
+    csv_path = tmp_path / "composers.csv"
+    csv_path.write_text("simple_surname,full_name\n", encoding="utf-8")
+    composer_lookup = ComposerLookup(csv_path)
+    csv_path.unlink()
+    paths = _write_inputs(tmp_path / "in", ["Beethoven_Symphony05_Op67_Violin1.pdf"])
+
+    results = asyncio.run(
+        _collect(process_files(paths, composer_lookup, tmp_path, backend="native"))
+    )
+
+    assert [type(result.error) for result in results] == [FileNotFoundError]
+    assert results[0].metadata is None
+
+
+def test_process_files_accepts_async_iterables(tmp_path, composer_lookup):
+    """Test that paths can come from an asynchronous source."""
+    paths = _write_inputs(tmp_path / "in", ["Beethoven_Symphony05_Op67_Violin1.pdf"])
+
+    async def source():
+        for path in paths:
+            await asyncio.sleep(0)
+            yield path
+
+    results = asyncio.run(
+        _collect(process_files(source(), composer_lookup, tmp_path, backend="native"))
+    )
+
+    assert [result.ok for result in results] == [True]
+
+
+def test_process_files_limits_concurrency(tmp_path, composer_lookup, monkeypatch):
+    """Test that no more than `concurrency` files are written at once."""
+    names = [f"Beethoven_Symphony{n:02d}_Op67_Violin1.pdf" for n in range(8)]
+    paths = _write_inputs(tmp_path / "in", names)
+    lock = threading.Lock()
+    active = 0
+    peak = 0
+    write = pdf_metadata.write_info_incremental
+
+    def slow_write(*args):
+        nonlocal active, peak
+        with lock:
+            active += 1
+            peak = max(peak, active)
+        time.sleep(0.02)
+        with lock:
+            active -= 1
+        return write(*args)
+
+    monkeypatch.setattr(pdf_metadata, "write_info_incremental", slow_write)
+
+    results = asyncio.run(
+        _collect(
+            process_files(
+                paths,
+                composer_lookup,
+                tmp_path / "out",
+                backend="native",
+                concurrency=3,
+            )
+        )
+    )
+
+    assert all(result.ok for result in results)
+    assert len(results) == 8
+    assert 1 < peak <= 3
+
+
+def test_process_files_timeout_releases_output_name(
+    tmp_path, composer_lookup, monkeypatch
+):
+    """Test that a file over the timeout is reported and leaves no files."""
+    paths = _write_inputs(tmp_path / "in", ["Beethoven_Symphony05_Op67_Violin1.pdf"])
+    output_dir = tmp_path / "out"
+    write = pdf_metadata.write_info_incremental
+
+    def slow_write(*args):
+        time.sleep(0.3)
+        return write(*args)
+
+    monkeypatch.setattr(pdf_metadata, "write_info_incremental", slow_write)
+
+    (result,) = asyncio.run(
+        _collect(
+            process_files(
+                paths, composer_lookup, output_dir, backend="native", timeout=0.05
+            )
+        )
+    )
+
+    assert isinstance(result.error, TimeoutError)
+    assert "Timed out" in str(result.error)
+    assert list(output_dir.iterdir()) == []
+
+
+def test_process_files_cancellation_cleans_up(tmp_path, composer_lookup, monkeypatch):
+    """Test that cancelling the consumer stops the run without stray files."""
+    names = [f"Beethoven_Symphony{n:02d}_Op67_Violin1.pdf" for n in range(6)]
+    paths = _write_inputs(tmp_path / "in", names)
+    output_dir = tmp_path / "out"
+    write = pdf_metadata.write_info_incremental
+
+    def slow_write(*args):
+        time.sleep(0.1)
+        return write(*args)
+
+    monkeypatch.setattr(pdf_metadata, "write_info_incremental", slow_write)
+
+    async def run():
+        task = asyncio.create_task(
+            _collect(
+                process_files(
+                    paths, composer_lookup, output_dir, backend="native", concurrency=2
+                )
+            )
+        )
+        await asyncio.sleep(0.05)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(run())
+
+    assert list(output_dir.iterdir()) == []
+
+
+@requires_exiftool
+def test_process_files_with_exiftool(tmp_path, composer_lookup):
+    """Test the async exiftool path end to end."""
+    paths = _write_inputs(tmp_path / "in", ["Beethoven_Symphony05_Op67_Violin1.pdf"])
+
+    (result,) = asyncio.run(
+        _collect(process_files(paths, composer_lookup, tmp_path / "out"))
+    )
+
+    assert result.ok, result.error
+    assert read_info(result.output)["Title"] == "Symphony 05 - Violin 1 Part"
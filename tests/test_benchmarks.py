@@ -0,0 +1,59 @@
+"""Tests for the benchmark corpus generator and harness."""
+
+from pathlib import Path
+
+import pytest
+
+from benchmarks.corpus import generate_corpus
+from benchmarks.harness import STAGES, compare_results, run_benchmarks
+from sheetmusic_metadata.parsing import parse_filename
+from sheetmusic_metadata.pdf_native import read_info
+
+COMPOSERS_CSV = Path(__file__).parent.parent / "composers.csv"
+
+
+def test_generate_corpus(tmp_path):
+    """Test that generated PDFs follow the schema and have the requested shape."""
+    corpus = generate_corpus(tmp_path, 20, COMPOSERS_CSV, pages=3, size=8192, seed=1)
+
+    assert len({path.name for path in corpus}) == 20
+    for path in corpus:
+        parse_filename(path.name)
+        assert abs(path.stat().st_size - 8192) < 512
+        assert path.read_bytes().count(b"/Type/Page/") == 3
+        assert read_info(path)["Producer"] == "benchmarks.corpus"
+    # Same seed, same filenames
+    again = generate_corpus(tmp_path / "again", 20, COMPOSERS_CSV, seed=1)
+    assert [p.name for p in again] == [p.name for p in corpus]
+
+
+def test_run_benchmarks_native(tmp_path):
+    """Test a quick run of every stage with the native writer."""
+    corpus = generate_corpus(tmp_path / "corpus", 5, COMPOSERS_CSV)
+
+    results = run_benchmarks(corpus, COMPOSERS_CSV, backend="native", repeat=1)
+
+    assert set(results["stages"]) == set(STAGES)
+    assert all(stage["files"] == 5 for stage in results["stages"].values())
+    assert results["environment"]["backend"] == "native"
+
+
+def test_compare_results():
+    """Test that only throughput drops beyond the tolerance are reported."""
+
+    def results(**files_per_second):
+        return {
+            "version": 1,
+            "stages": {
+                stage: {"seconds": 1.0, "files": 1, "files_per_second": value}
+                for stage, value in files_per_second.items()
+            },
+        }
+
+    baseline = results(parse=100.0, write=100.0)
+    current = results(parse=95.0, write=50.0, lookup=10.0)
+
+    [message] = compare_results(current, baseline, tolerance=0.10)
+    assert message.startswith("write:")
+    with pytest.raises(ValueError, match="version"):
+        compare_results(current, {"version": 0, "stages": {}})
@@ -0,0 +1,156 @@
+"""Tests for the SQLite catalog and the query command."""
+
+import json
+import os
+
+import pytest
+from click.testing import CliRunner
+
+from sheetmusic_metadata.catalog import Catalog
+from sheetmusic_metadata.cli import main
+from sheetmusic_metadata.parsing import parse_filename
+from tests.pdf_builders import build_pdf
+
+METADATA = {
+    "Title": "Symphony 04 - Horn 1 Part",
+    "Author": "Johannes Brahms",
+    "Subject": "Orchestral",
+    "Keywords": "Orchestral,Horn 1,Op. 98,Brass",
+}
+
+
+@pytest.fixture
+def input_pdf(tmp_path):
+    """An input PDF named after a Brahms horn part."""
+    path = tmp_path / "Brahms_Symphony04_Op98_Horn1.pdf"
+    path.write_bytes(build_pdf())
+    return path
+
+
+def _record(catalog, input_pdf, output_path, name=None, metadata=METADATA):
+    catalog.record(
+        input_pdf,
+        output_path,
+        parse_filename(name or input_pdf.name),
+        metadata,
+        "0" * 64,
+        input_pdf.stat(),
+    )
+
+
+def test_record_and_query(tmp_path, input_pdf):
+    """Test that recorded parts can be found by any indexed column."""
+    with Catalog(tmp_path / "catalog.db") as catalog:
+        _record(catalog, input_pdf, tmp_path / "out" / "horn.pdf")
+        _record(
+            catalog,
+            input_pdf,
+            tmp_path / "out" / "clarinet.pdf",
+            "Brahms_Symphony04_Op98_BassClarinet.pdf",
+        )
+
+    with Catalog(tmp_path / "catalog.db") as catalog:
+        assert len(catalog) == 2
+        [horn] = catalog.query(composer="brahms", instrument="horn")
+        [clarinet] = catalog.query(family="Woodwind")
+        assert list(catalog.query(work="Symphony03")) == []
+        assert len(list(catalog.query(limit=1))) == 1
+
+    assert horn.part == "Horn 1"
+    assert horn.family == "Brass"
+    assert horn.opus == "Op98"
+    assert clarinet.instrument == "Bass Clarinet"
+
+
+def test_query_rejects_unknown_field(tmp_path):
+    """Test that only indexed columns can be queried."""
+    with (
+        Catalog(tmp_path / "catalog.db") as catalog,
+        pytest.raises(ValueError, match="title"),
+    ):
+        list(catalog.query(title="x"))
+
+
+def test_lookup_unchanged(tmp_path, input_pdf):
+    """Test that only an unchanged input with the same metadata is found."""
+    output_path = tmp_path / "horn.pdf"
+    output_path.write_bytes(b"")
+    catalog = Catalog(tmp_path / "catalog.db")
+    _record(catalog, input_pdf, output_path)
+    catalog.commit()
+
+    def lookup(metadata=METADATA, output_dir=tmp_path):
+        return catalog.lookup_unchanged(
+            input_pdf, input_pdf.stat(), metadata, output_dir
+        )
+
+    assert lookup() == output_path
+    assert lookup({**METADATA, "Title": "Other"}) is None
+    # Another library has not got the file
+    assert lookup(output_dir=tmp_path / "other") is None
+
+    stat = input_pdf.stat()
+    os.utime(input_pdf, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    assert lookup() is None
+    catalog.close()
+
+    with Catalog(tmp_path / "catalog.db", ignore_existing=True) as catalog:
+        assert catalog.lookup_unchanged(input_pdf, stat, METADATA, tmp_path) is None
+
+
+@pytest.mark.parametrize("jobs", ["1", "2"])
+def test_run_with_catalog_then_query(tmp_path, input_pdf, jobs):
+    """Test that a run records its parts and a rerun skips them unread."""
+    (input_pdf.parent / "Brahms_Symphony04_Op98_Violin1.pdf").write_bytes(build_pdf())
+    output_dir = tmp_path / "out"
+    catalog_path = tmp_path / "library.db"
+    args = [
+        "-i",
+        str(tmp_path),
+        "-o",
+        str(output_dir),
+        "--backend",
+        "native",
+        "--catalog",
+        str(catalog_path),
+        "--jobs",
+        jobs,
+    ]
+
+    result = CliRunner().invoke(main, args)
+    assert result.exit_code == 0, result.output
+
+    result = CliRunner().invoke(
+        main,
+        ["query", "--catalog", str(catalog_path), "--composer", "Brahms", "--json"],
+    )
+    assert result.exit_code == 0, result.output
+    entries = [json.loads(line) for line in result.stdout.splitlines()]
+    assert [e["part"] for e in entries] == ["Horn 1", "Violin 1"]
+    assert entries[0]["output"] == str(output_dir / input_pdf.name)
+    assert "2 part(s)." in result.stderr
+
+    result = CliRunner().invoke(main, args)
+    assert result.exit_code == 0, result.output
+    assert result.output.count("Skipping: unchanged") == 2
+
+
+def test_catalog_shared_by_two_libraries(tmp_path):
+    """Test that a file in one library is still written to another."""
+    input_dir = tmp_path / "in"
+    input_dir.mkdir()
+    (input_dir / "Brahms_Symphony04_Op98_Horn1.pdf").write_bytes(build_pdf())
+    catalog_path = tmp_path / "library.db"
+
+    for library in ["lib1", "lib2"]:
+        result = CliRunner().invoke(
+            main,
+            ["-i", str(input_dir), "-o", str(tmp_path / library)]
+            + ["--backend", "native", "--catalog", str(catalog_path)],
+        )
+        assert result.exit_code == 0, result.output
+        assert "Skipping" not in result.output
+
+    assert (tmp_path / "lib2" / "Brahms_Symphony04_Op98_Horn1.pdf").is_file()
+    with Catalog(catalog_path) as catalog:
+        assert len(catalog) == 2
@@ -0,0 +1,122 @@
+"""Tests for the command-line interface."""
+
+import shutil
+from pathlib import Path
+
+import pytest
+from click.testing import CliRunner
+
+from sheetmusic_metadata.cli import main
+from tests.pdf_builders import build_pdf
+
+
+@pytest.fixture
+def minimal_pdf():
+    """Get path to minimal test PDF."""
+    simple_pdf = Path(__file__).parent / "support" / "simple.pdf"
+    if not simple_pdf.exists():
+        pytest.skip("No test PDF found in tests/support/")
+    return simple_pdf
+
+
+@pytest.mark.skipif(
+    not shutil.which("exiftool"),
+    reason="exiftool is not installed",
+)
+def test_parallel_jobs_keep_log_blocks_in_sorted_order(minimal_pdf, tmp_path):
+    """Test that --jobs output matches the sequential order, block by block."""
+    input_dir = tmp_path / "input"
+    input_dir.mkdir()
+    parts = ["Violin1", "Violin2", "Viola", "Cello", "Flute1", "Oboe2"]
+    for part in parts:
+        shutil.copy2(minimal_pdf, input_dir / f"Brahms_Symphony04_Op98_{part}.pdf")
+
+    result = CliRunner().invoke(
+        main,
+        ["-i", str(input_dir), "-o", str(tmp_path / "output"), "--jobs", "3"],
+    )
+
+    assert result.exit_code == 0
+    processed = [
+        line.removeprefix("Processing file: ")
+        for line in result.stdout.splitlines()
+        if line.startswith("Processing file: ")
+    ]
+    assert processed == sorted(f"Brahms_Symphony04_Op98_{p}.pdf" for p in parts)
+    # Each block is whole: its header is followed by its own result line
+    blocks = result.stdout.split("---\n")
+    for block in blocks[:-1]:
+        assert block.count("Processing file:") == 1
+        assert "Successfully applied metadata." in block
+    assert len(list((tmp_path / "output").glob("*.pdf"))) == len(parts)
+
+
+def test_jobs_must_be_positive(tmp_path):
+    """Test that --jobs rejects values below one."""
+    result = CliRunner().invoke(
+        main, ["-i", str(tmp_path), "-o", str(tmp_path / "out"), "--jobs", "0"]
+    )
+    assert result.exit_code == 2
+
+
+@pytest.mark.parametrize("jobs", ["1", "2"])
+def test_recursive_mirrors_subdirectories(tmp_path, jobs):
+    """Test that --recursive writes files under their relative directories."""
+    input_dir = tmp_path / "input"
+    inputs = [
+        "Brahms_Symphony04_Op98_Viola.pdf",
+        "Orchestra/2024/Brahms_Symphony04_Op98_Cello.pdf",
+        "Orchestra/Brahms_Symphony04_Op98_Flute1.pdf",
+    ]
+    for relative in inputs:
+        path = input_dir / relative
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(build_pdf())
+    # An output directory inside the input tree is not scanned
+    output_dir = input_dir / "tagged"
+
+    result = CliRunner().invoke(
+        main,
+        ["-i", str(input_dir), "-o", str(output_dir), "--recursive"]
+        + ["--backend", "native", "--jobs", jobs],
+    )
+
+    assert result.exit_code == 0, result.output
+    outputs = sorted(
+        p.relative_to(output_dir).as_posix() for p in output_dir.rglob("*.pdf")
+    )
+    assert outputs == sorted(inputs)
+
+
+@pytest.mark.parametrize("jobs", ["1", "3"])
+def test_duplicate_composer_warned_once_per_run(tmp_path, jobs):
+    """Test that workers' duplicate surnames are warned about once, by the parent."""
+    composers_csv = tmp_path / "composers.csv"
+    composers_csv.write_text(
+        'simple_surname,full_name\nBach,"Bach, J.S."\nBach,"Bach, Johann Sebastian"\n',
+        encoding="utf-8",
+    )
+    input_dir = tmp_path / "input"
+    input_dir.mkdir()
+    for part in ["Violin1", "Violin2", "Viola", "Cello", "Bass", "Flute1"]:
+        (input_dir / f"Bach_Suite01_BWV1066_{part}.pdf").write_bytes(build_pdf())
+
+    result = CliRunner().invoke(
+        main,
+        ["-i", str(input_dir), "-o", str(tmp_path / "output")]
+        + ["--composers-csv", str(composers_csv), "--backend", "native"]
+        + ["--jobs", jobs],
+    )
+
+    assert result.exit_code == 0, result.output
+    assert result.stderr.count("Multiple entries for 'Bach'") == 1
+    assert result.stdout.count("Composer: Johann Sebastian Bach") == 6
+
+
+def test_no_pdf_files_found(tmp_path):
+    """Test the message for an input directory without PDFs."""
+    result = CliRunner().invoke(
+        main, ["-i", str(tmp_path), "-o", str(tmp_path / "out"), "--recursive"]
+    )
+    assert result.exit_code == 0
+    assert "No PDF files found" in result.stdout
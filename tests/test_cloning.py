@@ -0,0 +1,83 @@
+"""Tests for cheap file copies."""
+
+import errno
+import os
+
+import pytest
+
+from sheetmusic_metadata import cloning, profiling
+from sheetmusic_metadata.cloning import clone_file
+
+
+@pytest.fixture
+def source(tmp_path):
+    """A file a few chunks long with varied content."""
+    path = tmp_path / "source.pdf"
+    path.write_bytes(bytes(range(256)) * 40)
+    return path
+
+
+def _unsupported(*args):
+    raise OSError(errno.EXDEV, "Invalid cross-device link")
+
+
+def test_clone_file_copies_content(tmp_path, source):
+    """Test that the copy matches the source with the best available method."""
+    destination = tmp_path / "copy.pdf"
+
+    method = clone_file(source, destination)
+
+    assert method in ("reflink", "copy_file_range", "sendfile", "copy")
+    assert destination.read_bytes() == source.read_bytes()
+
+
+def test_clone_file_truncates_existing_destination(tmp_path, source):
+    """Test that a longer existing destination is replaced entirely."""
+    destination = tmp_path / "copy.pdf"
+    destination.write_bytes(b"x" * 100_000)
+
+    clone_file(source, destination)
+
+    assert destination.read_bytes() == source.read_bytes()
+
+
+@pytest.mark.parametrize(
+    ("disabled", "expected"),
+    [
+        (("_reflink_linux",), "copy_file_range"),
+        (("_reflink_linux", "_copy_file_range"), "sendfile"),
+        (("_reflink_linux", "_copy_file_range", "_sendfile"), "copy"),
+    ],
+)
+def test_clone_file_falls_back(tmp_path, source, monkeypatch, disabled, expected):
+    """Test each fallback when the faster methods are unsupported."""
+    if not hasattr(os, "copy_file_range") or not hasattr(os, "sendfile"):
+        pytest.skip("copy_file_range and sendfile are Linux-only")
+    monkeypatch.setattr(cloning, "_CHUNK_SIZE", 1000)
+    for name in disabled:
+        if name == "_reflink_linux":
+            monkeypatch.setattr(cloning, name, lambda *args: False)
+        else:
+            monkeypatch.setattr(cloning, name, _unsupported)
+    destination = tmp_path / "copy.pdf"
+
+    method = clone_file(source, destination)
+
+    assert method == expected
+    assert destination.read_bytes() == source.read_bytes()
+
+
+def test_clone_file_counts_method_for_profile(tmp_path, source):
+    """Test that the method used is reported in --profile counters."""
+    profiler = profiling.enable()
+    try:
+        method = clone_file(source, tmp_path / "copy.pdf")
+        assert profiler.counters == {f"copy_{method}": 1}
+    finally:
+        profiling.disable()
+
+
+def test_clone_file_reports_real_errors(tmp_path, source):
+    """Test that errors other than "unsupported" are raised."""
+    with pytest.raises(OSError):
+        clone_file(source, tmp_path / "missing-dir" / "copy.pdf")
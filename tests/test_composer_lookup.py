@@ -1,11 +1,15 @@
 """Tests for composer lookup."""
 
+import os
+import pickle
 import tempfile
 from pathlib import Path
 
 import pytest
 
+from sheetmusic_metadata import composer_index
 from sheetmusic_metadata.composer_lookup import ComposerLookup
+from sheetmusic_metadata.composer_table import ComposerTable
 
 
 @pytest.fixture
@@ -118,3 +122,280 @@ def test_composer_lookup_duplicate_surnames_prefers_specific(
         assert "more specific" in captured.err
     finally:
         csv_path.unlink()
+
+
+@pytest.fixture
+def count_builds(monkeypatch):
+    """Count how often the CSV is parsed into a new index."""
+    builds = []
+    original = composer_index.build_index
+
+    def build_index(csv_path):
+        builds.append(csv_path)
+        return original(csv_path)
+
+    monkeypatch.setattr(composer_index, "build_index", build_index)
+    return builds
+
+
+def test_composer_index_cache_reused(sample_composers_csv, count_builds, tmp_path):
+    """Test that an unchanged CSV is only parsed once."""
+    cache_dir = tmp_path / "index-cache"
+
+    ComposerLookup(sample_composers_csv, cache_dir=cache_dir).get_full_name("Bach")
+    lookup = ComposerLookup(sample_composers_csv, cache_dir=cache_dir)
+
+    assert lookup.get_full_name("Brahms") == "Brahms, Johannes"
+    assert len(count_builds) == 1
+
+
+def test_composer_index_rebuilt_when_csv_changes(
+    sample_composers_csv, count_builds, tmp_path
+):
+    """Test that edits to the CSV invalidate the cached index."""
+    cache_dir = tmp_path / "index-cache"
+    ComposerLookup(sample_composers_csv, cache_dir=cache_dir).get_full_name("Bach")
+
+    with open(sample_composers_csv, "a", encoding="utf-8") as f:
+        f.write('Elgar,"Elgar, Edward"\n')
+    lookup = ComposerLookup(sample_composers_csv, cache_dir=cache_dir)
+
+    assert lookup.get_full_name("Elgar") == "Elgar, Edward"
+    assert len(count_builds) == 2
+
+
+def test_composer_index_touched_csv_not_rebuilt(
+    sample_composers_csv, count_builds, tmp_path
+):
+    """Test that a new mtime with identical content reuses the index."""
+    cache_dir = tmp_path / "index-cache"
+    ComposerLookup(sample_composers_csv, cache_dir=cache_dir).get_full_name("Bach")
+
+    stat = sample_composers_csv.stat()
+    os.utime(sample_composers_csv, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    ComposerLookup(sample_composers_csv, cache_dir=cache_dir).get_full_name("Bach")
+
+    assert len(count_builds) == 1
+
+
+def test_composer_index_loaded_on_first_lookup(
+    sample_composers_csv, count_builds, tmp_path
+):
+    """Test that creating a lookup does not load the index."""
+    lookup = ComposerLookup(sample_composers_csv, cache_dir=tmp_path / "cache")
+    assert count_builds == []
+
+    assert lookup.get_full_name("Bach") == "Bach, Johann Sebastian"
+    assert len(count_builds) == 1
+
+
+def test_exact_lookups_do_not_load_fuzzy_tables(
+    sample_composers_csv, tmp_path, monkeypatch
+):
+    """Test that a cached CSV answers exact surnames from the mapped table."""
+    cache_dir = tmp_path / "index-cache"
+    ComposerLookup(sample_composers_csv, cache_dir=cache_dir).get_full_name("Bach")
+    loads = []
+    read_cache = composer_index._read_cache
+
+    def counting_read_cache(index_path):
+        loads.append(index_path)
+        return read_cache(index_path)
+
+    monkeypatch.setattr(composer_index, "_read_cache", counting_read_cache)
+    lookup = ComposerLookup(sample_composers_csv, cache_dir=cache_dir)
+
+    assert lookup.get_full_name("Brahms") == "Brahms, Johannes"
+    assert loads == []
+
+    assert lookup.get_full_name("Brams") == "Brahms, Johannes"
+    assert len(loads) == 1
+
+
+@pytest.mark.parametrize(
+    "contents",
+    [b"", b"not a pickle", pickle.dumps((2, ("path", 0, 0, ""), {}, {}, [], {}, {}))],
+)
+def test_composer_index_rebuilt_from_bad_cache(
+    sample_composers_csv, count_builds, tmp_path, contents
+):
+    """Test that empty, corrupt or old-format cache files are rebuilt."""
+    cache_dir = tmp_path / "index-cache"
+    ComposerLookup(sample_composers_csv, cache_dir=cache_dir).get_full_name("Bach")
+    [index_path] = cache_dir.glob("*.pickle")
+    index_path.write_bytes(contents)
+
+    lookup = ComposerLookup(sample_composers_csv, cache_dir=cache_dir)
+
+    assert lookup.get_full_name("Brahms") == "Brahms, Johannes"
+    assert len(count_builds) == 2
+
+
+def test_composer_index_unwritable_cache_dir(sample_composers_csv, tmp_path):
+    """Test that lookups still work when the cache cannot be written."""
+    not_a_dir = tmp_path / "file"
+    not_a_dir.write_text("")
+
+    lookup = ComposerLookup(sample_composers_csv, cache_dir=not_a_dir / "cache")
+
+    assert lookup.get_full_name("Bach") == "Bach, Johann Sebastian"
+
+
+def test_composer_index_cached_duplicates_warn_once(tmp_path, capsys):
+    """Test that duplicate warnings survive the cache and are shown once."""
+    csv_path = tmp_path / "composers.csv"
+    csv_path.write_text(
+        'simple_surname,full_name\nBach,"Bach, J.S."\nBach,"Bach, Johann Sebastian"\n',
+        encoding="utf-8",
+    )
+    ComposerLookup(csv_path).match("Bach")
+    lookup = ComposerLookup(csv_path)
+
+    lookup.get_full_name("Bach")
+    lookup.get_full_name("Bach")
+
+    assert capsys.readouterr().err.count("more specific") == 1
+
+
+@pytest.fixture
+def accented_composers_csv(tmp_path):
+    """Create a composers.csv with accented surnames."""
+    csv_file = tmp_path / "composers.csv"
+    csv_file.write_text(
+        "simple_surname,full_name\n"
+        'Dvořák,"Dvořák, Antonín"\n'
+        'Beethoven,"Beethoven, Ludwig van"\n'
+        'Rimsky-Korsakov,"Rimsky-Korsakov, Nikolai"\n'
+        'Schoenberg,"Schoenberg, Arnold"\n',
+        encoding="utf-8",
+    )
+    return csv_file
+
+
+@pytest.mark.parametrize(
+    "surname,expected_full_name",
+    [
+        ("Dvorak", "Dvořák, Antonín"),
+        ("DVORAK", "Dvořák, Antonín"),
+        ("RimskyKorsakov", "Rimsky-Korsakov, Nikolai"),
+    ],
+)
+def test_get_full_name_accent_insensitive(
+    accented_composers_csv, capsys, surname, expected_full_name
+):
+    """Test that accent, case and punctuation differences match silently."""
+    lookup = ComposerLookup(accented_composers_csv)
+    assert lookup.get_full_name(surname) == expected_full_name
+    assert capsys.readouterr().err == ""
+
+
+def test_get_full_name_fuzzy_accepts_close_misspelling(accented_composers_csv, capsys):
+    """Test that a misspelling above the threshold is matched with a note."""
+    lookup = ComposerLookup(accented_composers_csv)
+    assert lookup.get_full_name("Beethovan") == "Beethoven, Ludwig van"
+    captured = capsys.readouterr()
+    assert "Note" in captured.err
+    assert "Warning" not in captured.err
+
+
+def test_get_full_name_fuzzy_below_threshold_warns(accented_composers_csv, capsys):
+    """Test that matches below the threshold fall back and suggest the match."""
+    lookup = ComposerLookup(accented_composers_csv, fuzzy_threshold=1.0)
+    assert lookup.get_full_name("Beethovan") == "Beethovan"
+    captured = capsys.readouterr()
+    assert "Warning" in captured.err
+    assert "Closest match: 'Beethoven, Ludwig van'" in captured.err
+
+
+def test_match_returns_confidence(accented_composers_csv):
+    """Test that match reports the similarity of the best candidate."""
+    lookup = ComposerLookup(accented_composers_csv)
+
+    assert lookup.match("Dvořák") == ("Dvořák, Antonín", 1.0)
+    assert lookup.match("Dvorak") == ("Dvořák, Antonín", 1.0)
+    name, score = lookup.match("Schonberg")
+    assert name == "Schoenberg, Arnold"
+    assert 0.9 < score < 1.0
+    assert lookup.match("Xyzzy") is None
+
+
+@pytest.fixture
+def duplicate_composers_csv(tmp_path):
+    """Create a composers.csv listing Bach twice."""
+    csv_file = tmp_path / "composers.csv"
+    csv_file.write_text(
+        "simple_surname,full_name\n"
+        'Bach,"Bach, J.S."\n'
+        'Bach,"Bach, Johann Sebastian"\n'
+        'Dvořák,"Dvořák, Antonín"\n'
+        'Brahms,"Brahms, Johannes"\n',
+        encoding="utf-8",
+    )
+    return csv_file
+
+
+def test_shared_table_matches_index(duplicate_composers_csv):
+    """Test that a lookup attached to the shared table answers like the index."""
+    parent = ComposerLookup(duplicate_composers_csv)
+    table_path = parent.share_table()
+    worker = ComposerLookup(duplicate_composers_csv, table=table_path)
+
+    table = ComposerTable(table_path)
+    assert dict(table) == {
+        "bach": "Bach, Johann Sebastian",
+        "brahms": "Brahms, Johannes",
+        "dvořák": "Dvořák, Antonín",
+    }
+    assert table.ignored("bach") == "Bach, J.S."
+    assert table.ignored("brahms") is None
+    assert "mozart" not in table
+    table.close()
+
+    for surname in ["Bach", "BRAHMS", "Dvořák", "Dvorak", "Brams", "Mozart"]:
+        assert worker.get_full_name(surname) == parent.get_full_name(surname)
+
+
+def test_shared_table_rewritten_only_when_map_changes(duplicate_composers_csv):
+    """Test that sharing an unchanged map leaves the table file alone."""
+    table_path = ComposerLookup(duplicate_composers_csv).share_table()
+    mtime = table_path.stat().st_mtime_ns
+    os.utime(table_path, ns=(mtime - 10**9, mtime - 10**9))
+
+    assert ComposerLookup(duplicate_composers_csv).share_table() == table_path
+    assert table_path.stat().st_mtime_ns == mtime - 10**9
+
+    with open(duplicate_composers_csv, "a", encoding="utf-8") as f:
+        f.write('Mozart,"Mozart, Wolfgang Amadeus"\n')
+    ComposerLookup(duplicate_composers_csv).share_table()
+    assert "mozart" in ComposerTable(table_path)
+
+
+def test_invalid_table_rejected(tmp_path, duplicate_composers_csv):
+    """Test that a file that is not a table is not attached to."""
+    bad = tmp_path / "bad.table"
+    bad.write_bytes(b"SMCT" + b"\xff" * 12)
+    with pytest.raises(ValueError, match="not a composer table"):
+        ComposerLookup(duplicate_composers_csv, table=bad)
+
+
+def test_attached_lookup_defers_duplicate_warnings(duplicate_composers_csv, capsys):
+    """Test that workers report duplicates for the parent to warn about once."""
+    parent = ComposerLookup(duplicate_composers_csv)
+    workers = [
+        ComposerLookup(duplicate_composers_csv, table=parent.share_table())
+        for _ in range(2)
+    ]
+
+    for worker in workers:
+        worker.get_full_name("Bach")
+        worker.get_full_name("Brahms")
+    assert "Multiple entries" not in capsys.readouterr().err
+
+    for worker in workers:
+        used = worker.drain_duplicates()
+        assert used == [("bach", "Bach")]
+        for key, surname in used:
+            parent.warn_duplicate(key, surname)
+        assert worker.drain_duplicates() == []
+
+    assert capsys.readouterr().err.count("Multiple entries for 'Bach'") == 1
@@ -2,12 +2,15 @@
 
 import shutil
 import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 import pytest
 
+from sheetmusic_metadata import output_index
 from sheetmusic_metadata.cli import process_file
 from sheetmusic_metadata.composer_lookup import ComposerLookup
+from sheetmusic_metadata.output_index import OutputIndex
 from sheetmusic_metadata.pdf_metadata import _get_unique_output_path
 
 
@@ -147,3 +150,83 @@ def test_output_directory_created_if_not_exists(minimal_pdf, composer_lookup):
         assert output_dir.is_dir()
         # Verify file was written
         assert output_path.exists()
+
+
+def test_get_unique_output_path_reserves_atomically():
+    """Test that concurrent callers never receive the same output path."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        output_dir = Path(tmpdir)
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            results = list(
+                pool.map(
+                    lambda _: _get_unique_output_path(output_dir, "test.pdf"),
+                    range(20),
+                )
+            )
+
+        paths = [path for path, _ in results]
+        assert len(set(paths)) == 20
+        assert all(path.exists() for path in paths)
+        assert sum(1 for _, was_conflict in results if not was_conflict) == 1
+
+
+def test_output_index_starts_after_highest_suffix(tmp_path, monkeypatch):
+    """Test that the next suffix is found without probing each taken name."""
+    for name in ["test.pdf", "test (1).pdf", "test (7).pdf", "other (9).pdf"]:
+        (tmp_path / name).write_text("existing")
+    attempts = []
+    original = output_index.reserve_path
+    monkeypatch.setattr(
+        output_index,
+        "reserve_path",
+        lambda path: attempts.append(path.name) or original(path),
+    )
+    index = OutputIndex()
+
+    first, _ = index.reserve(tmp_path, "test.pdf")
+    second, _ = index.reserve(tmp_path, "test.pdf")
+
+    assert (first.name, second.name) == ("test (8).pdf", "test (9).pdf")
+    assert attempts == ["test.pdf", "test (8).pdf", "test.pdf", "test (9).pdf"]
+
+
+def test_output_index_skips_names_taken_after_listing(tmp_path):
+    """Test that names created by another process are never reused."""
+    (tmp_path / "test.pdf").write_text("existing")
+    index = OutputIndex()
+    assert index.reserve(tmp_path, "test.pdf")[0].name == "test (1).pdf"
+
+    # Another worker claims the next names behind this index's back
+    (tmp_path / "test (2).pdf").write_text("other process")
+    (tmp_path / "test (3).pdf").write_text("other process")
+
+    path, was_conflict = index.reserve(tmp_path, "test.pdf")
+    assert path.name == "test (4).pdf"
+    assert was_conflict is True
+    assert (tmp_path / "test (2).pdf").read_text() == "other process"
+
+
+def test_output_index_counter_like_filenames(tmp_path):
+    """Test inputs whose own names end in a counter."""
+    index = OutputIndex()
+
+    assert index.reserve(tmp_path, "test (1).pdf") == (tmp_path / "test (1).pdf", False)
+    assert index.reserve(tmp_path, "test (1).pdf")[0].name == "test (1) (1).pdf"
+    assert index.reserve(tmp_path, "test.pdf")[0].name == "test.pdf"
+    assert index.reserve(tmp_path, "test.pdf")[0].name == "test (2).pdf"
+
+
+def test_output_index_shared_across_threads(tmp_path):
+    """Test that one index hands out distinct, contiguous names to threads."""
+    (tmp_path / "test.pdf").write_text("existing")
+    index = OutputIndex()
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        paths = list(
+            pool.map(lambda _: index.reserve(tmp_path, "test.pdf")[0], range(20))
+        )
+
+    assert sorted(p.name for p in paths) == sorted(
+        f"test ({n}).pdf" for n in range(1, 21)
+    )
@@ -0,0 +1,161 @@
+"""Tests for --dedupe."""
+
+import errno
+
+import pytest
+from click.testing import CliRunner
+
+from sheetmusic_metadata import cli
+from sheetmusic_metadata.cli import main
+from sheetmusic_metadata.dedupe import find_duplicates
+from sheetmusic_metadata.manifest import hash_file
+from sheetmusic_metadata.pdf_metadata import reuse_tagged_pdf
+from sheetmusic_metadata.pdf_native import read_info
+from tests.pdf_builders import build_pdf
+
+VIOLIN = "Brahms_Symphony04_Op98_Violin1.pdf"
+
+
+def test_find_duplicates(tmp_path):
+    """Test that only inputs repeating earlier content are reported."""
+    paths = {}
+    for name, content in [
+        ("a", b"same"),
+        ("b", b"diff"),
+        ("c", b"same"),
+        ("d", b"unique content"),
+        ("e", b"same"),
+    ]:
+        paths[name] = tmp_path / name
+        paths[name].write_bytes(content)
+
+    duplicates = find_duplicates([*paths.values(), tmp_path / "missing"])
+
+    content_hash = hash_file(paths["a"])
+    assert duplicates == {
+        paths["c"]: (paths["a"], content_hash),
+        paths["e"]: (paths["a"], content_hash),
+    }
+
+
+@pytest.fixture
+def input_dir(tmp_path):
+    """Three copies of one PDF, two of them with the same name."""
+    input_dir = tmp_path / "input"
+    for directory in ["first", "second"]:
+        (input_dir / directory).mkdir(parents=True)
+        (input_dir / directory / VIOLIN).write_bytes(build_pdf())
+    (input_dir / "first" / "Brahms_Symphony04_Op98_Viola.pdf").write_bytes(build_pdf())
+    return input_dir
+
+
+@pytest.mark.parametrize("jobs", ["1", "2"])
+def test_dedupe_links_and_updates_copies(input_dir, tmp_path, jobs):
+    """Test that copies are hardlinked or updated from the first output."""
+    output_dir = tmp_path / "output"
+    args = ["-i", str(input_dir), "-o", str(output_dir), "-r", "--dedupe"]
+    args += ["--backend", "native", "--jobs", jobs]
+
+    result = CliRunner().invoke(main, args)
+    assert result.exit_code == 0, result.output
+    assert "Found 2 file(s) with the same content" in result.output
+    assert "output written by hardlink" in result.output
+    assert "output written by incremental update" in result.output
+
+    # The Viola part is listed first, so the others are written from it
+    viola = output_dir / "first" / "Brahms_Symphony04_Op98_Viola.pdf"
+    first = output_dir / "first" / VIOLIN
+    second = output_dir / "second" / VIOLIN
+    assert read_info(viola)["Title"] == "Symphony 04 - Viola Part"
+    assert read_info(first)["Title"] == "Symphony 04 - Violin 1 Part"
+    assert first.read_bytes().startswith(viola.read_bytes())
+    assert second.stat().st_ino == first.stat().st_ino
+
+    # Everything is recorded, so a rerun writes nothing new
+    result = CliRunner().invoke(main, args)
+    assert result.exit_code == 0, result.output
+    assert result.output.count("Skipping: unchanged") == 3
+    assert sorted(p.name for p in output_dir.rglob("*.pdf")) == sorted(
+        [viola.name, VIOLIN, VIOLIN]
+    )
+
+
+def test_dedupe_retries_copies_from_the_first_output(input_dir, tmp_path, monkeypatch):
+    """Test that a copy that failed is retried as a copy, not tagged again."""
+    reuse = cli.reuse_tagged_pdf
+    calls = []
+
+    def flaky_reuse(*args, **kwargs):
+        calls.append(args)
+        if len(calls) == 1:
+            raise OSError(errno.EIO, "I/O error")
+        return reuse(*args, **kwargs)
+
+    monkeypatch.setattr(cli, "reuse_tagged_pdf", flaky_reuse)
+    monkeypatch.setattr(cli, "RETRY_BACKOFF", 0)
+    output_dir = tmp_path / "output"
+
+    result = CliRunner().invoke(
+        main,
+        ["-i", str(input_dir), "-o", str(output_dir), "-r", "--dedupe"]
+        + ["--backend", "native", "--keep-going"],
+    )
+
+    assert result.exit_code == 0, result.output
+    assert "1 file(s) recovered by retrying" in result.output
+    assert len(calls) == 3
+    first = output_dir / "first" / VIOLIN
+    second = output_dir / "second" / VIOLIN
+    assert second.stat().st_ino == first.stat().st_ino
+
+
+def test_reuse_clones_without_hardlinks(tmp_path, monkeypatch, capsys):
+    """Test that a copy is cloned where hardlinks cannot be made."""
+    tagged = tmp_path / "tagged.pdf"
+    tagged.write_bytes(build_pdf())
+    info = read_info(tagged)
+
+    def no_link(*args):
+        raise OSError(18, "Invalid cross-device link")
+
+    monkeypatch.setattr("os.link", no_link)
+    output_path = reuse_tagged_pdf(
+        tmp_path / VIOLIN,
+        [tagged],
+        info["Title"],
+        "Johannes Brahms",
+        "Orchestral",
+        "Orchestral,Violin 1",
+        tmp_path / "out",
+        backend="native",
+    )
+
+    assert output_path == tmp_path / "out" / VIOLIN
+    assert read_info(output_path)["Author"] == "Johannes Brahms"
+    assert "by incremental update" in capsys.readouterr().out
+
+    output_path = reuse_tagged_pdf(
+        tmp_path / VIOLIN,
+        [tagged, output_path],
+        info["Title"],
+        "Johannes Brahms",
+        "Orchestral",
+        "Orchestral,Violin 1",
+        tmp_path / "out",
+        backend="native",
+    )
+
+    assert output_path.name == "Brahms_Symphony04_Op98_Violin1 (1).pdf"
+    assert output_path.read_bytes() == (tmp_path / "out" / VIOLIN).read_bytes()
+    assert capsys.readouterr().out.endswith(("by reflink.\n", "by copy.\n"))
+
+
+def test_dedupe_rejected_with_plan(input_dir, tmp_path):
+    """Test that --dedupe is refused with --plan."""
+    result = CliRunner().invoke(
+        main,
+        ["-i", str(input_dir), "-o", str(tmp_path / "out"), "--dedupe"]
+        + ["--plan", str(tmp_path / "plan.jsonl")],
+    )
+    assert result.exit_code == 1
+    assert "--dedupe cannot be used with --plan" in result.output
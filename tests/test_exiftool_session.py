@@ -0,0 +1,106 @@
+"""Tests for the persistent exiftool session."""
+
+import shutil
+import sys
+
+import pytest
+
+from sheetmusic_metadata.exiftool_session import ExifToolSession
+
+requires_exiftool = pytest.mark.skipif(
+    not shutil.which("exiftool"),
+    reason="exiftool is not installed",
+)
+
+
+def test_session_missing_executable_raises_file_not_found():
+    """Test that a missing exiftool executable is reported clearly."""
+    session = ExifToolSession(executable="exiftool-does-not-exist")
+    with pytest.raises(FileNotFoundError, match="exiftool is not installed"):
+        session.execute("-ver")
+
+
+def test_session_rejects_newlines_in_arguments():
+    """Test that arguments that would break the argfile framing are rejected."""
+    session = ExifToolSession()
+    with pytest.raises(ValueError, match="newlines"):
+        session.execute("-Title=Line 1\nLine 2")
+    assert not session.running
+
+
+# Speaks the -stay_open protocol, writing far more than a pipe buffer to
+# stderr before the stdout sentinel, as exiftool does for large batches
+FAKE_EXIFTOOL = """\
+import sys
+
+args = []
+for line in sys.stdin:
+    line = line.rstrip("\\n")
+    if line.startswith("-execute"):
+        echo = args[args.index("-echo4") + 1]
+        sys.stderr.write("Warning: not a valid PDF\\n" * 20000)
+        sys.stderr.flush()
+        print("{ready%s}" % line[len("-execute"):], flush=True)
+        sys.stderr.write(echo + "\\n")
+        sys.stderr.flush()
+        args = []
+    elif line == "False" and args[-1:] == ["-stay_open"]:
+        break
+    else:
+        args.append(line)
+"""
+
+
+def test_session_drains_stderr_while_reading_stdout(tmp_path):
+    """Test that a command filling the stderr pipe does not deadlock."""
+    script = tmp_path / "exiftool"
+    script.write_text(f"#!{sys.executable}\n{FAKE_EXIFTOOL}")
+    script.chmod(0o755)
+
+    with ExifToolSession(executable=str(script)) as session:
+        for _ in range(2):
+            result = session.execute("-json", "a.pdf")
+            assert result.stderr.count("Warning") == 20000
+            assert result.stdout == ""
+
+
+def test_session_close_without_start_is_noop():
+    """Test that closing an unused session does nothing."""
+    session = ExifToolSession()
+    session.close()
+    session.close()
+    assert not session.running
+
+
+@requires_exiftool
+def test_session_reuses_one_process():
+    """Test that consecutive commands run in the same exiftool process."""
+    with ExifToolSession() as session:
+        first = session.execute("-ver")
+        pid = session._process.pid
+        second = session.execute("-ver")
+        assert session._process.pid == pid
+        assert first.returncode == 0
+        assert first.stdout.strip() == second.stdout.strip()
+    assert not session.running
+
+
+@requires_exiftool
+def test_session_restarts_after_crash():
+    """Test that the session starts a new process if exiftool dies."""
+    with ExifToolSession() as session:
+        session.execute("-ver")
+        session._process.kill()
+        session._process.wait()
+        result = session.execute("-ver")
+        assert result.returncode == 0
+        assert result.stdout.strip()
+
+
+@requires_exiftool
+def test_session_reports_errors(tmp_path):
+    """Test that errors for a missing file give a non-zero returncode."""
+    with ExifToolSession() as session:
+        result = session.execute("-Title", str(tmp_path / "missing.pdf"))
+        assert result.returncode == 1
+        assert "Error" in result.stderr
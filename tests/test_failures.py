@@ -0,0 +1,168 @@
+"""Tests for --keep-going failure collection, retries and exit codes."""
+
+import errno
+import json
+import subprocess
+from pathlib import Path
+
+import pytest
+from click.testing import CliRunner
+
+from sheetmusic_metadata import cli, pdf_metadata
+from sheetmusic_metadata.failures import (
+    EXIT_PARSE_ERRORS,
+    EXIT_WRITE_ERRORS,
+    Failure,
+    FailureReport,
+    describe_error,
+)
+from sheetmusic_metadata.parsing import FilenameError
+from tests.pdf_builders import build_pdf
+
+GOOD = "Beethoven_Symphony05_Op67_Violin1.pdf"
+BAD = "Abandoned.pdf"  # Sorts before GOOD
+
+
+def test_describe_error_classifies_errors():
+    """Test that parse errors and permanent write errors are not retried."""
+    assert describe_error(FilenameError("bad name")) == ("parse", "bad name", False)
+    assert describe_error(FileNotFoundError("gone"))[::2] == ("write", False)
+    assert describe_error(OSError(errno.EIO, "I/O error"))[::2] == ("write", True)
+
+
+def test_describe_error_uses_exiftool_error_line():
+    """Test that exiftool's error message is reported, not its command line."""
+    error = subprocess.CalledProcessError(
+        1, ["exiftool", "-Title=x"], "Warning: minor\nError: Not a valid PDF\n"
+    )
+
+    assert describe_error(error) == ("write", "Error: Not a valid PDF", True)
+
+
+def test_failure_report_exit_code_and_json():
+    """Test that the exit code adds up one bit per kind of failure."""
+    report = FailureReport()
+    assert report.exit_code() == 0
+
+    report.add(Failure(Path("a.pdf"), "parse", "bad name", False))
+    assert report.exit_code() == EXIT_PARSE_ERRORS
+    report.add(Failure(Path("b.pdf"), "write", "I/O error", True, attempts=3))
+    report.add(Failure(Path("c.pdf"), "write", "busy", True))
+    report.resolve(Path("c.pdf"))
+
+    assert report.exit_code() == EXIT_PARSE_ERRORS | EXIT_WRITE_ERRORS
+    data = json.loads(report.to_json())
+    assert data["exit_code"] == 12
+    assert [e["input"] for e in data["parse_errors"]] == ["a.pdf"]
+    assert data["write_errors"][0]["attempts"] == 3
+    assert data["recovered"] == ["c.pdf"]
+    assert "b.pdf: I/O error (after 3 attempts)" in report.summary()
+
+
+@pytest.fixture
+def input_dir(tmp_path):
+    """An input directory with one valid and one unparseable PDF."""
+    input_dir = tmp_path / "input"
+    input_dir.mkdir()
+    for name in (BAD, GOOD):
+        (input_dir / name).write_bytes(build_pdf())
+    return input_dir
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    """Retry without waiting."""
+    monkeypatch.setattr(cli, "RETRY_BACKOFF", 0)
+
+
+def _run(input_dir, output_dir, *extra):
+    return CliRunner().invoke(
+        cli.main,
+        ["-i", str(input_dir), "-o", str(output_dir), "--backend", "native", *extra],
+    )
+
+
+@pytest.mark.parametrize("jobs", ["1", "2"])
+def test_keep_going_continues_past_parse_errors(input_dir, tmp_path, jobs):
+    """Test that good files are still written and the exit code is 4."""
+    output_dir = tmp_path / "output"
+    report_path = tmp_path / "failures.json"
+
+    result = _run(
+        input_dir,
+        output_dir,
+        "--keep-going",
+        "--jobs",
+        jobs,
+        "--failure-report",
+        str(report_path),
+    )
+
+    assert result.exit_code == EXIT_PARSE_ERRORS, result.output
+    assert (output_dir / GOOD).exists()
+    assert "1 parse error(s), 0 write error(s)" in result.output
+    report = json.loads(report_path.read_text())
+    assert [Path(e["input"]).name for e in report["parse_errors"]] == [BAD]
+    assert report["write_errors"] == []
+
+
+def test_without_keep_going_first_error_ends_run(input_dir, tmp_path):
+    """Test that the default behavior still stops at the first failure."""
+    output_dir = tmp_path / "output"
+
+    result = _run(input_dir, output_dir)
+
+    assert result.exit_code == 1
+    assert not (output_dir / GOOD).exists()
+
+
+def test_keep_going_retries_transient_write_errors(tmp_path, monkeypatch):
+    """Test that a write error that clears up is recovered by a retry."""
+    input_dir = tmp_path / "input"
+    input_dir.mkdir()
+    (input_dir / GOOD).write_bytes(build_pdf())
+    write = pdf_metadata.write_info_incremental
+    calls = []
+
+    def flaky_write(*args):
+        calls.append(args)
+        if len(calls) == 1:
+            raise OSError(errno.EIO, "I/O error")
+        return write(*args)
+
+    monkeypatch.setattr(pdf_metadata, "write_info_incremental", flaky_write)
+
+    result = _run(input_dir, tmp_path / "output", "--keep-going")
+
+    assert result.exit_code == 0, result.output
+    assert len(calls) == 2
+    assert "1 file(s) recovered by retrying" in result.output
+    assert (tmp_path / "output" / GOOD).exists()
+
+
+def test_keep_going_gives_up_after_retries(tmp_path, monkeypatch):
+    """Test that a persistent write error exits with 8 after every retry."""
+    input_dir = tmp_path / "input"
+    input_dir.mkdir()
+    (input_dir / GOOD).write_bytes(build_pdf())
+    calls = []
+
+    def failing_write(*args):
+        calls.append(args)
+        raise OSError(errno.EIO, "I/O error")
+
+    monkeypatch.setattr(pdf_metadata, "write_info_incremental", failing_write)
+
+    result = _run(input_dir, tmp_path / "output", "--keep-going", "--retries", "3")
+
+    assert result.exit_code == EXIT_WRITE_ERRORS
+    assert len(calls) == 4
+    assert "(after 4 attempts)" in result.output
+
+
+def test_failure_report_requires_keep_going(input_dir, tmp_path):
+    """Test that --failure-report is rejected without --keep-going."""
+    result = _run(input_dir, tmp_path, "--failure-report", str(tmp_path / "r.json"))
+
+    assert result.exit_code == 1
+    assert "requires --keep-going" in result.output
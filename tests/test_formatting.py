@@ -46,6 +46,14 @@ def test_format_opus_string(input_opus, expected_output):
         ("EnglishHorn", "English Horn"),  # Special case: EnglishHorn
         ("Piccolo", " Piccolo"),  # Special case: Piccolo (leading space)
         ("Violin1Part2", "Violin 1Part 2"),  # Multiple numbers
+        ("BassClarinet1", "Bass Clarinet 1"),  # Multi-word instrument
+        ("CorAnglais", "Cor Anglais"),  # Multi-word instrument
+        ("Bassoon2", "Bassoon 2"),  # Not "Bass" followed by "oon"
+        ("violin1", "violin 1"),  # Casing is kept
+        ("VIOLIN1", "VIOLIN 1"),
+        ("doublebass", "double bass"),
+        ("piccolo", "piccolo"),  # Leading space only for "Piccolo"
+        ("Bass_Clarinet", "Bass_Clarinet"),  # Separators are kept
     ],
 )
 def test_format_part_string(input_part, expected_output):
@@ -0,0 +1,125 @@
+"""Tests for the checkpoint journal and --resume."""
+
+import json
+import os
+
+import pytest
+from click.testing import CliRunner
+
+from sheetmusic_metadata import journal as journal_module
+from sheetmusic_metadata.cli import main
+from sheetmusic_metadata.journal import JOURNAL_FILENAME, Journal
+from tests.pdf_builders import build_pdf
+
+NAMES = [
+    "Beethoven_Symphony05_Op67_Violin1.pdf",
+    "Brahms_Symphony01_Op68_Viola.pdf",
+    "Mozart_Symphony40_Op550_Cello.pdf",
+]
+
+
+def test_journal_resume_loads_entries(tmp_path):
+    """Test that a resumed journal knows the inputs completed earlier."""
+    with Journal(tmp_path) as journal:
+        journal.record(tmp_path / "in" / "a.pdf", tmp_path / "a.pdf")
+
+    with Journal(tmp_path, resume=True) as journal:
+        assert tmp_path / "in" / "a.pdf" in journal
+        assert tmp_path / "in" / "b.pdf" not in journal
+        journal.record(tmp_path / "in" / "b.pdf", tmp_path / "b.pdf")
+
+    assert len(Journal(tmp_path, resume=True)) == 2
+
+
+def test_journal_without_resume_starts_over(tmp_path):
+    """Test that a new run does not inherit an old run's entries."""
+    with Journal(tmp_path) as journal:
+        journal.record(tmp_path / "a.pdf", tmp_path / "out.pdf")
+
+    with Journal(tmp_path) as journal:
+        assert len(journal) == 0
+
+    assert (tmp_path / JOURNAL_FILENAME).read_text() == ""
+
+
+def test_journal_ignores_partial_last_line(tmp_path):
+    """Test that a line cut short by a crash is skipped."""
+    entry = json.dumps({"input": str(tmp_path / "a.pdf"), "output": "x"})
+    (tmp_path / JOURNAL_FILENAME).write_text(entry + '\n{"input": "/tr')
+
+    assert len(Journal(tmp_path, resume=True)) == 1
+
+
+def test_journal_fsyncs_in_batches(tmp_path, monkeypatch):
+    """Test that entries are fsynced per batch and on close, not per entry."""
+    syncs = []
+    monkeypatch.setattr(journal_module, "FSYNC_BATCH", 3)
+    monkeypatch.setattr(journal_module, "FSYNC_INTERVAL", 3600)
+    monkeypatch.setattr(os, "fsync", syncs.append)
+
+    with Journal(tmp_path) as journal:
+        for n in range(7):
+            journal.record(tmp_path / f"{n}.pdf", tmp_path / f"{n}.pdf")
+        assert len(syncs) == 2
+
+    assert len(syncs) == 3
+
+
+@pytest.fixture
+def input_dir(tmp_path):
+    """An input directory with three valid PDFs."""
+    input_dir = tmp_path / "input"
+    input_dir.mkdir()
+    for name in NAMES:
+        (input_dir / name).write_bytes(build_pdf())
+    return input_dir
+
+
+@pytest.mark.parametrize("jobs", ["1", "2"])
+def test_run_journals_completed_files(input_dir, tmp_path, jobs):
+    """Test that every completed input is journaled with its output."""
+    output_dir = tmp_path / "output"
+
+    result = CliRunner().invoke(
+        main,
+        ["-i", str(input_dir), "-o", str(output_dir), "--backend", "native"]
+        + ["--jobs", jobs],
+    )
+
+    assert result.exit_code == 0, result.output
+    lines = (output_dir / JOURNAL_FILENAME).read_text().splitlines()
+    entries = [json.loads(line) for line in lines]
+    assert [os.path.basename(e["input"]) for e in entries] == NAMES
+    assert entries[0]["output"] == str(output_dir / NAMES[0])
+
+
+def test_resume_skips_journaled_files(input_dir, tmp_path):
+    """Test that --resume skips files the interrupted run completed."""
+    output_dir = tmp_path / "output"
+    output_dir.mkdir()
+    with Journal(output_dir) as journal:
+        journal.record(input_dir / NAMES[0], output_dir / NAMES[0])
+
+    result = CliRunner().invoke(
+        main,
+        ["-i", str(input_dir), "-o", str(output_dir), "--backend", "native"]
+        + ["--resume"],
+    )
+
+    assert result.exit_code == 0, result.output
+    assert NAMES[0] not in result.output
+    assert "skipped 1 file(s)" in result.output
+    assert sorted(p.name for p in output_dir.glob("*.pdf")) == NAMES[1:]
+    assert len(Journal(output_dir, resume=True)) == 3
+
+
+def test_resume_cannot_be_used_with_plan(input_dir, tmp_path):
+    """Test that --resume is rejected for plans."""
+    result = CliRunner().invoke(
+        main,
+        ["-i", str(input_dir), "-o", str(tmp_path), "--resume"]
+        + ["--plan", str(tmp_path / "plan.jsonl")],
+    )
+
+    assert result.exit_code == 1
+    assert "--resume cannot be used" in result.output
@@ -0,0 +1,263 @@
+"""Tests for the processed-files manifest."""
+
+import shutil
+from pathlib import Path
+
+import pytest
+from click.testing import CliRunner
+
+from sheetmusic_metadata.cli import main, process_file
+from sheetmusic_metadata.composer_lookup import ComposerLookup
+from sheetmusic_metadata.manifest import MANIFEST_FILENAME, Manifest, hash_file
+from tests.pdf_builders import build_pdf
+
+METADATA = {
+    "Title": "Symphony 05 - Violin 1 Part",
+    "Author": "Ludwig van Beethoven",
+    "Subject": "Orchestral",
+    "Keywords": "Orchestral,Violin 1,Op. 67,Strings",
+}
+
+
+@pytest.fixture
+def composer_lookup():
+    """Create a composer lookup with test data."""
+    csv_path = Path(__file__).parent.parent / "composers.csv"
+    if csv_path.exists():
+        return ComposerLookup(csv_path)
+    else:
+        pytest.skip("composers.csv not found")
+
+
+def test_manifest_record_and_lookup(tmp_path):
+    """Test that recorded entries are found again after reloading."""
+    output_path = tmp_path / "Beethoven_Symphony05_Op67_Violin1.pdf"
+    output_path.write_bytes(b"tagged")
+
+    Manifest(tmp_path).record("abc123", METADATA, output_path)
+
+    manifest = Manifest(tmp_path)
+    assert len(manifest) == 1
+    assert manifest.lookup("abc123", METADATA, tmp_path) == output_path
+    assert manifest.lookup("def456", METADATA, tmp_path) is None
+    assert (
+        manifest.lookup("abc123", {**METADATA, "Keywords": "Other"}, tmp_path) is None
+    )
+
+
+def test_manifest_lookup_in_other_directory(tmp_path):
+    """Test that an output elsewhere is only used if its input was moved."""
+    input_path = tmp_path / "input.pdf"
+    input_path.write_bytes(b"original")
+    output_path = tmp_path / "first" / "out.pdf"
+    output_path.parent.mkdir()
+    output_path.write_bytes(b"tagged")
+    Manifest(tmp_path).record("abc123", METADATA, output_path, input_path)
+
+    manifest = Manifest(tmp_path)
+    assert manifest.lookup("abc123", METADATA, output_path.parent) == output_path
+    # A copy of an input that is still there
+    assert manifest.lookup("abc123", METADATA, tmp_path / "second") is None
+
+    input_path.unlink()
+
+    assert manifest.lookup("abc123", METADATA, tmp_path / "second") == output_path
+
+
+def test_manifest_lookup_ignores_missing_output(tmp_path):
+    """Test that entries whose output was deleted are not reused."""
+    output_path = tmp_path / "deleted.pdf"
+    output_path.write_bytes(b"tagged")
+    manifest = Manifest(tmp_path)
+    manifest.record("abc123", METADATA, output_path)
+
+    output_path.unlink()
+
+    assert manifest.lookup("abc123", METADATA, tmp_path) is None
+
+
+def test_manifest_skips_partial_lines(tmp_path):
+    """Test that a truncated last line from an interrupted run is ignored."""
+    output_path = tmp_path / "out.pdf"
+    output_path.write_bytes(b"tagged")
+    Manifest(tmp_path).record("abc123", METADATA, output_path)
+    with open(tmp_path / MANIFEST_FILENAME, "a", encoding="utf-8") as f:
+        f.write('{"hash": "def4')
+
+    manifest = Manifest(tmp_path)
+
+    assert len(manifest) == 1
+    assert manifest.lookup("abc123", METADATA, tmp_path) == output_path
+
+
+def test_manifest_ignore_existing(tmp_path):
+    """Test that ignore_existing starts from an empty manifest."""
+    output_path = tmp_path / "out.pdf"
+    output_path.write_bytes(b"tagged")
+    Manifest(tmp_path).record("abc123", METADATA, output_path)
+
+    assert (
+        Manifest(tmp_path, ignore_existing=True).lookup("abc123", METADATA, tmp_path)
+        is None
+    )
+
+
+def test_hash_file(tmp_path):
+    """Test that the hash depends only on content."""
+    first = tmp_path / "a.pdf"
+    second = tmp_path / "b.pdf"
+    first.write_bytes(b"same")
+    second.write_bytes(b"same")
+
+    assert hash_file(first) == hash_file(second)
+    assert len(hash_file(first)) == 64
+
+
+def test_process_file_skips_unchanged_renamed_input(tmp_path, composer_lookup, capsys):
+    """Test that re-running over the same content writes no duplicates."""
+    input_dir = tmp_path / "input"
+    output_dir = tmp_path / "output"
+    input_dir.mkdir()
+    test_pdf = input_dir / "Beethoven_Symphony05_Op67_Violin1.pdf"
+    test_pdf.write_bytes(build_pdf())
+
+    first = process_file(
+        test_pdf,
+        composer_lookup,
+        output_dir,
+        backend="native",
+        manifest=Manifest(output_dir),
+    )
+
+    # Move the input: same content and metadata, different location
+    moved_dir = tmp_path / "inbox"
+    moved_dir.mkdir()
+    moved = shutil.move(test_pdf, moved_dir / test_pdf.name)
+    second = process_file(
+        Path(moved),
+        composer_lookup,
+        output_dir,
+        backend="native",
+        manifest=Manifest(output_dir),
+    )
+
+    assert second == first
+    assert sorted(p.name for p in output_dir.glob("*.pdf")) == [first.name]
+    assert "Skipping: unchanged" in capsys.readouterr().out
+
+
+def test_process_file_reprocesses_changed_content(tmp_path, composer_lookup):
+    """Test that changed content is tagged again."""
+    output_dir = tmp_path / "output"
+    test_pdf = tmp_path / "Beethoven_Symphony05_Op67_Violin1.pdf"
+    test_pdf.write_bytes(build_pdf())
+    process_file(
+        test_pdf,
+        composer_lookup,
+        output_dir,
+        backend="native",
+        manifest=Manifest(output_dir),
+    )
+
+    test_pdf.write_bytes(build_pdf(xref_stream=True))
+    second = process_file(
+        test_pdf,
+        composer_lookup,
+        output_dir,
+        backend="native",
+        manifest=Manifest(output_dir),
+    )
+
+    assert second.name == "Beethoven_Symphony05_Op67_Violin1 (1).pdf"
+
+
+def test_manifest_recorded_entries_found_per_directory(tmp_path):
+    """Test that entries recorded in this run only match their directory."""
+    output_path = tmp_path / "first" / "out.pdf"
+    output_path.parent.mkdir()
+    output_path.write_bytes(b"tagged")
+    manifest = Manifest(tmp_path)
+
+    manifest.record("abc123", METADATA, output_path)
+
+    assert manifest.lookup("abc123", METADATA, output_path.parent) is None
+    assert manifest.lookup_recorded("abc123", METADATA, output_path.parent) == (
+        output_path
+    )
+    assert manifest.lookup_recorded("abc123", METADATA, tmp_path / "second") is None
+    assert len(manifest) == 1
+
+
+def test_recursive_run_writes_identical_inputs_per_subdirectory(tmp_path):
+    """Test that a copy in another subdirectory is written, not skipped."""
+    input_dir = tmp_path / "input"
+    name = "Beethoven_Symphony05_Op67_Violin1.pdf"
+    for directory in ["first", "second"]:
+        (input_dir / directory).mkdir(parents=True)
+        (input_dir / directory / name).write_bytes(build_pdf())
+    output_dir = tmp_path / "output"
+
+    result = CliRunner().invoke(
+        main,
+        ["-i", str(input_dir), "-o", str(output_dir), "-r", "--backend", "native"],
+    )
+
+    assert result.exit_code == 0, result.output
+    assert "Skipping" not in result.output
+    assert (output_dir / "first" / name).exists()
+    assert (output_dir / "second" / name).exists()
+
+
+def test_process_file_skips_copy_written_by_this_run(tmp_path, composer_lookup, capsys):
+    """Test that a copy for the same directory says it was written this run."""
+    output_dir = tmp_path / "output"
+    manifest = Manifest(output_dir)
+    outputs = []
+    for directory in ["first", "second"]:
+        test_pdf = tmp_path / directory / "Beethoven_Symphony05_Op67_Violin1.pdf"
+        test_pdf.parent.mkdir()
+        test_pdf.write_bytes(build_pdf())
+        outputs.append(
+            process_file(
+                test_pdf,
+                composer_lookup,
+                output_dir,
+                backend="native",
+                manifest=manifest,
+            )
+        )
+
+    assert outputs[0] == outputs[1]
+    out = capsys.readouterr().out
+    assert "Skipping: same content and metadata as a file written by this run" in out
+    assert "earlier run" not in out
+
+
+def test_rerun_writes_copy_added_to_another_subdirectory(tmp_path):
+    """Test that a copy added after a run gets its own output in a rerun."""
+    input_dir = tmp_path / "input"
+    name = "Beethoven_Symphony05_Op67_Violin1.pdf"
+    (input_dir / "first").mkdir(parents=True)
+    (input_dir / "first" / name).write_bytes(build_pdf())
+    output_dir = tmp_path / "output"
+    args = ["-i", str(input_dir), "-o", str(output_dir), "-r", "--backend", "native"]
+
+    result = CliRunner().invoke(main, args)
+    assert result.exit_code == 0, result.output
+
+    (input_dir / "second").mkdir()
+    shutil.copy(input_dir / "first" / name, input_dir / "second" / name)
+    result = CliRunner().invoke(main, args)
+
+    assert result.exit_code == 0, result.output
+    assert result.output.count("Skipping: unchanged") == 1
+    assert (output_dir / "second" / name).exists()
+
+    # A moved input is still recognised
+    (input_dir / "third").mkdir()
+    (input_dir / "second" / name).rename(input_dir / "third" / name)
+    result = CliRunner().invoke(main, args)
+
+    assert result.exit_code == 0, result.output
+    assert result.output.count("Skipping: unchanged") == 2
+    assert not (output_dir / "third").exists()
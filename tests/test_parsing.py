@@ -1,8 +1,16 @@
 """Tests for filename parsing."""
 
+import dataclasses
+import sys
+
 import pytest
 
-from sheetmusic_metadata.parsing import parse_filename
+from sheetmusic_metadata.parsing import (
+    FilenameComponents,
+    FilenameSchema,
+    compile_schema,
+    parse_filename,
+)
 
 
 @pytest.mark.parametrize(
@@ -88,3 +96,49 @@ def test_filename_parsing_invalid(filename, expected_match):
     """Test parsing fails with invalid filenames."""
     with pytest.raises(ValueError, match=expected_match):
         parse_filename(filename)
+
+
+def test_custom_schema_with_movement():
+    """Test a schema with fields in another order and a movement field."""
+    schema = compile_schema("{work}_{composer}_{movement}_{part}")
+
+    components = schema.parse("Planets_Holst_Mars_Horn1.pdf")
+
+    assert components == FilenameComponents("Holst", "Planets", "NoOp", "Horn1", "Mars")
+    with pytest.raises(ValueError, match="does not match the expected schema"):
+        schema.parse("Holst_Planets_Horn1.pdf")
+
+
+def test_schema_with_other_separators():
+    """Test that field values may contain characters the schema does not use."""
+    schema = FilenameSchema("{composer} - {work}[ ({opus})] - {part}")
+
+    assert schema.parse("Dvorak - Symphony_09 (Op95) - Cello.pdf").opus == "Op95"
+    assert schema.parse("Holst - Planets - Horn1.pdf").work_identifier == "Planets"
+
+
+@pytest.mark.parametrize(
+    "pattern,expected_match",
+    [
+        ("{composer}_{work}", "lacks the required field"),
+        ("{composer}_{work}_{part}_{key}", "Unknown field"),
+        ("{composer}_{work}_{part}_{part}", "repeated"),
+        ("{composer}{work}_{part}", "separated by literal text"),
+        ("{composer}_{work}[_{opus}_{part}", "Unbalanced"),
+    ],
+)
+def test_invalid_schema(pattern, expected_match):
+    """Test that malformed schemas are rejected when compiled."""
+    with pytest.raises(ValueError, match=expected_match):
+        FilenameSchema(pattern)
+
+
+def test_components_are_frozen_slotted_and_interned():
+    """Test that parsed records are immutable, compact and share strings."""
+    first = parse_filename("Beethoven_Symphony05_Op67_Violin1.pdf")
+    second = parse_filename("Beethoven_Symphony06_Op68_Violin1.pdf")
+
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        first.part = "Viola"
+    assert not hasattr(first, "__dict__")
+    assert first.part is second.part is sys.intern("Violin1")
@@ -0,0 +1,232 @@
+"""Tests for the native incremental-update PDF writer."""
+
+import shutil
+from pathlib import Path
+
+import pytest
+
+from sheetmusic_metadata.pdf_metadata import apply_pdf_metadata, read_pdf_metadata
+from sheetmusic_metadata.pdf_native import (
+    UnsupportedPDFError,
+    _PDFDocument,
+    decode_text_string,
+    read_info,
+    write_info_incremental,
+)
+from tests.pdf_builders import build_object_stream_pdf, build_pdf
+
+METADATA = {
+    "Title": "Symphony 09 - Cello Part",
+    "Author": "Antonín Dvořák",
+    "Subject": "Orchestral",
+    "Keywords": "Orchestral,Cello,Op. 95,Strings",
+}
+
+
+def raw_info(path: Path) -> dict:
+    """Read the current raw Info dictionary with the native parser."""
+    document = _PDFDocument(path.read_bytes())
+    return document.resolve(document.trailer["Info"])
+
+
+@pytest.mark.parametrize("xref_stream", [False, True])
+def test_write_info_incremental_appends_update(tmp_path, xref_stream):
+    """Test that the original bytes are kept and a new section is appended."""
+    original = build_pdf(xref_stream=xref_stream)
+    pdf = tmp_path / "score.pdf"
+    pdf.write_bytes(original)
+
+    appended = write_info_incremental(pdf, METADATA)
+
+    updated = pdf.read_bytes()
+    assert updated.startswith(original)
+    assert len(updated) == len(original) + appended
+    document = _PDFDocument(updated)
+    assert document.trailer["Prev"] == _PDFDocument(original).startxref
+    assert document.is_xref_stream == xref_stream
+
+    info = raw_info(pdf)
+    assert info["Title"] == b"Symphony 09 - Cello Part"
+    assert info["Author"] == b"\xfe\xff" + "Antonín Dvořák".encode("utf-16-be")
+    assert info["Keywords"] == b"Orchestral,Cello,Op. 95,Strings"
+    # Entries that were not replaced are carried over
+    assert info["Producer"] == b"Test Suite"
+
+
+def test_write_info_incremental_repeated_updates_chain(tmp_path):
+    """Test that a second update links back to the first one."""
+    pdf = tmp_path / "score.pdf"
+    pdf.write_bytes(build_pdf())
+
+    write_info_incremental(pdf, {"Title": "First"})
+    first_startxref = _PDFDocument(pdf.read_bytes()).startxref
+    write_info_incremental(pdf, {"Title": "Second (2)"})
+
+    document = _PDFDocument(pdf.read_bytes())
+    assert document.trailer["Prev"] == first_startxref
+    assert raw_info(pdf)["Title"] == b"Second (2)"
+
+
+def test_write_info_incremental_to_destination(tmp_path):
+    """Test that writing to a destination leaves the source untouched."""
+    original = build_pdf()
+    source = tmp_path / "source.pdf"
+    source.write_bytes(original)
+    destination = tmp_path / "destination.pdf"
+
+    write_info_incremental(source, METADATA, destination)
+
+    assert source.read_bytes() == original
+    assert raw_info(destination)["Subject"] == b"Orchestral"
+
+
+@pytest.mark.parametrize(
+    "content,match",
+    [
+        (build_pdf(trailer_extra=b"/Encrypt 9 0 R"), "encrypted"),
+        (build_pdf(catalog_extra=b"/Metadata 9 0 R"), "XMP"),
+        (b"%PDF-1.4\nnot really a pdf\n", "startxref"),
+        (b"", "Cannot map"),
+    ],
+)
+def test_write_info_incremental_rejects_unsupported(tmp_path, content, match):
+    """Test that unsupported files raise and are left unchanged."""
+    pdf = tmp_path / "score.pdf"
+    pdf.write_bytes(content)
+
+    with pytest.raises(UnsupportedPDFError, match=match):
+        write_info_incremental(pdf, METADATA)
+
+    assert pdf.read_bytes() == content
+
+
+# startxref points at an object that is not an xref stream
+NOT_AN_XREF = b"%PDF-1.4\n1 0 obj 42 endobj\nstartxref\n9\n%%EOF\n"
+
+
+@pytest.mark.parametrize(
+    "content,write",
+    [
+        (NOT_AN_XREF, False),
+        (NOT_AN_XREF, True),
+        # The trailer's /Size, needed for the update, is not a number
+        (build_pdf(trailer_extra=b"/Size(five)"), True),
+    ],
+)
+def test_malformed_pdf_is_unsupported(tmp_path, content, write):
+    """Test that malformed files raise UnsupportedPDFError, not a crash."""
+    pdf = tmp_path / "score.pdf"
+    pdf.write_bytes(content)
+
+    with pytest.raises(UnsupportedPDFError):
+        if write:
+            write_info_incremental(pdf, METADATA)
+        else:
+            read_info(pdf)
+
+    assert pdf.read_bytes() == content
+
+
+def test_apply_pdf_metadata_native_backend(tmp_path):
+    """Test the native backend end to end without exiftool."""
+    input_pdf = tmp_path / "Dvorak_Symphony09_Op95_Cello.pdf"
+    input_pdf.write_bytes(build_pdf())
+    output_dir = tmp_path / "output"
+
+    output_path = apply_pdf_metadata(
+        input_pdf, *METADATA.values(), output_dir=output_dir, backend="native"
+    )
+
+    assert output_path == output_dir / input_pdf.name
+    assert raw_info(output_path)["Title"] == b"Symphony 09 - Cello Part"
+    # Only the finished file is left in the output directory
+    assert [p.name for p in output_dir.iterdir()] == [input_pdf.name]
+
+
+@pytest.mark.skipif(
+    not shutil.which("exiftool"),
+    reason="exiftool is not installed",
+)
+def test_apply_pdf_metadata_native_falls_back_to_exiftool(tmp_path, capsys):
+    """Test that PDFs with XMP metadata are written by exiftool instead."""
+    simple_pdf = Path(__file__).parent / "support" / "simple.pdf"
+    input_pdf = tmp_path / "Dvorak_Symphony09_Op95_Cello.pdf"
+    shutil.copy2(simple_pdf, input_pdf)
+
+    apply_pdf_metadata(input_pdf, *METADATA.values(), backend="native")
+
+    captured = capsys.readouterr()
+    assert "Falling back to exiftool" in captured.err
+
+
+@pytest.mark.parametrize(
+    "raw,expected",
+    [
+        (b"Symphony 09", "Symphony 09"),
+        (b"\xfe\xff" + "Antonín Dvořák".encode("utf-16-be"), "Antonín Dvořák"),
+        (b"\xef\xbb\xbfDvo\xc5\x99\xc3\xa1k", "Dvořák"),
+        (b"Dvor\xe1k \x84 Op. 95", "Dvorák — Op. 95"),  # PDFDocEncoding
+        (b"\x95\xf3d\xbc", "Łód¼"),
+        (b"\xa0 5", "€ 5"),
+    ],
+)
+def test_decode_text_string(raw, expected):
+    """Test decoding of UTF-16BE, UTF-8 and PDFDocEncoding text strings."""
+    assert decode_text_string(raw) == expected
+
+
+@pytest.mark.parametrize("xref_stream", [False, True])
+def test_read_info(tmp_path, xref_stream):
+    """Test native reading of classic and xref-stream PDFs."""
+    pdf = tmp_path / "score.pdf"
+    pdf.write_bytes(build_pdf(xref_stream=xref_stream))
+
+    assert read_info(pdf) == {"Producer": "Test Suite", "Title": "Old Title"}
+
+
+def test_read_info_from_object_stream(tmp_path):
+    """Test that an Info dictionary inside a compressed object stream is read."""
+    pdf = tmp_path / "score.pdf"
+    author = "<FEFF" + "Antonín Dvořák".encode("utf-16-be").hex().upper() + ">"
+    pdf.write_bytes(
+        build_object_stream_pdf(
+            b"<</Title(Cello \\(solo\\))/Author%s>>" % author.encode()
+        )
+    )
+
+    assert read_info(pdf) == {"Title": "Cello (solo)", "Author": "Antonín Dvořák"}
+
+
+def test_read_after_incremental_update_of_object_stream_pdf(tmp_path):
+    """Test that updates to compressed-Info PDFs keep the old entries."""
+    pdf = tmp_path / "score.pdf"
+    pdf.write_bytes(build_object_stream_pdf(b"<</Producer(Scanner)/Title(Old)>>"))
+
+    write_info_incremental(pdf, METADATA)
+
+    assert read_info(pdf) == {"Producer": "Scanner", **METADATA}
+
+
+def test_read_info_rejects_encrypted(tmp_path):
+    """Test that encrypted PDFs are left to exiftool."""
+    pdf = tmp_path / "score.pdf"
+    pdf.write_bytes(build_pdf(trailer_extra=b"/Encrypt 9 0 R"))
+
+    with pytest.raises(UnsupportedPDFError, match="encrypted"):
+        read_info(pdf)
+
+
+def test_read_pdf_metadata_native_without_exiftool(tmp_path):
+    """Test that read_pdf_metadata reads supported PDFs without exiftool."""
+    pdf = tmp_path / "score.pdf"
+    pdf.write_bytes(build_pdf())
+    write_info_incremental(pdf, {"Title": "Symphony 09 - Cello Part"})
+
+    metadata = read_pdf_metadata(pdf)
+
+    assert metadata == {
+        "Title": "Symphony 09 - Cello Part",
+        "Author": "",
+        "Subject": "",
+        "Keywords": "",
+    }
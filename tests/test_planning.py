@@ -0,0 +1,270 @@
+"""Tests for metadata plans (--plan / --apply-plan)."""
+
+import json
+from pathlib import Path
+
+import pytest
+from click.testing import CliRunner
+
+from sheetmusic_metadata.cli import main
+from sheetmusic_metadata.composer_lookup import ComposerLookup
+from sheetmusic_metadata.instrument_family import set_instrument_map
+from sheetmusic_metadata.journal import Journal
+from sheetmusic_metadata.parsing import compile_schema
+from sheetmusic_metadata.pdf_native import read_info
+from sheetmusic_metadata.planning import (
+    OutputPlanner,
+    PlanEntry,
+    build_metadata,
+    read_plan,
+)
+from tests.pdf_builders import build_pdf
+
+
+@pytest.fixture
+def composer_lookup():
+    """Create a composer lookup with test data."""
+    csv_path = Path(__file__).parent.parent / "composers.csv"
+    if csv_path.exists():
+        return ComposerLookup(csv_path)
+    else:
+        pytest.skip("composers.csv not found")
+
+
+def test_build_metadata(composer_lookup):
+    """Test metadata computed from a filename alone."""
+    metadata = build_metadata(
+        "Beethoven_Symphony05_Op67_Violin1.pdf", composer_lookup, ["Season"]
+    )
+
+    assert metadata == {
+        "Title": "Symphony 05 - Violin 1 Part",
+        "Author": "Ludwig van Beethoven",
+        "Subject": "Orchestral",
+        "Keywords": "Orchestral,Violin 1,Op. 67,Strings,Season",
+    }
+
+
+def test_build_metadata_with_movement(composer_lookup):
+    """Test that a schema's movement field is added to the title."""
+    metadata = build_metadata(
+        "Holst_Planets_Mars_Horn1.pdf",
+        composer_lookup,
+        schema=compile_schema("{composer}_{work}_{movement}_{part}"),
+    )
+
+    assert metadata["Title"] == "Planets: Mars - Horn 1 Part"
+
+
+def test_plan_entry_round_trip():
+    """Test that entries survive serialization, including non-ASCII text."""
+    entry = PlanEntry(
+        Path("in/Dvorak_Symphony09_Op95_Cello.pdf"),
+        Path("out/Dvorak_Symphony09_Op95_Cello.pdf"),
+        {"Title": "T", "Author": "Antonín Dvořák", "Subject": "S", "Keywords": "K"},
+        Path("out"),
+    )
+
+    line = entry.to_json()
+
+    assert "\n" not in line
+    assert PlanEntry.from_json(line) == entry
+
+
+def test_read_plan_reports_line_number():
+    """Test that invalid plan lines are reported with their line number."""
+    valid = PlanEntry(
+        Path("a.pdf"),
+        Path("b.pdf"),
+        dict.fromkeys(("Title", "Author", "Subject", "Keywords"), "x"),
+    ).to_json()
+    lines = [valid + "\n", "\n", json.dumps({"input": "a.pdf"}) + "\n"]
+
+    entries = read_plan(lines)
+
+    assert next(entries).input == Path("a.pdf")
+    with pytest.raises(ValueError, match="line 3: missing output"):
+        next(entries)
+
+
+def test_output_planner_predicts_suffixes(tmp_path):
+    """Test that planned names account for existing and earlier planned files."""
+    (tmp_path / "test.pdf").write_text("existing")
+    (tmp_path / "test (1).pdf").write_text("existing")
+    planner = OutputPlanner()
+
+    assert planner.plan(tmp_path, "test.pdf").name == "test (2).pdf"
+    assert planner.plan(tmp_path, "test.pdf").name == "test (3).pdf"
+    assert planner.plan(tmp_path, "other.pdf").name == "other.pdf"
+    assert planner.plan(tmp_path / "missing", "test.pdf").name == "test.pdf"
+    # Planning writes nothing
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["test (1).pdf", "test.pdf"]
+
+
+@pytest.mark.parametrize("jobs", ["1", "2"])
+def test_plan_then_apply(tmp_path, jobs):
+    """Test that --plan writes no PDFs and --apply-plan writes the planned ones."""
+    input_dir = tmp_path / "input"
+    (input_dir / "Winds").mkdir(parents=True)
+    (input_dir / "Beethoven_Symphony05_Op67_Violin1.pdf").write_bytes(build_pdf())
+    (input_dir / "Winds" / "Brahms_Symphony04_Op98_Flute1.pdf").write_bytes(build_pdf())
+    output_dir = tmp_path / "output"
+    plan_path = tmp_path / "plan.jsonl"
+
+    result = CliRunner().invoke(
+        main,
+        ["-i", str(input_dir), "-o", str(output_dir), "-r", "--plan", str(plan_path)],
+    )
+
+    assert result.exit_code == 0, result.output
+    assert not output_dir.exists()
+    entries = list(read_plan(plan_path.read_text(encoding="utf-8").splitlines()))
+    assert [e.output for e in entries] == [
+        output_dir / "Beethoven_Symphony05_Op67_Violin1.pdf",
+        output_dir / "Winds" / "Brahms_Symphony04_Op98_Flute1.pdf",
+    ]
+
+    result = CliRunner().invoke(
+        main,
+        ["--apply-plan", str(plan_path), "--backend", "native", "--jobs", jobs],
+    )
+
+    assert result.exit_code == 0, result.output
+    for entry in entries:
+        assert read_info(entry.output)["Title"] == entry.metadata["Title"]
+
+    # The applied files are recorded, so a normal run writes nothing new
+    result = CliRunner().invoke(
+        main,
+        ["-i", str(input_dir), "-o", str(output_dir), "-r", "--backend", "native"],
+    )
+
+    assert result.exit_code == 0, result.output
+    assert result.output.count("Skipping: unchanged") == 2
+    assert sorted(p.name for p in output_dir.rglob("*.pdf")) == [
+        "Beethoven_Symphony05_Op67_Violin1.pdf",
+        "Brahms_Symphony04_Op98_Flute1.pdf",
+    ]
+
+
+def test_apply_plan_journals_applied_files(tmp_path):
+    """Test that --apply-plan adds the files it writes to the journal."""
+    input_path = tmp_path / "Beethoven_Symphony05_Op67_Violin1.pdf"
+    input_path.write_bytes(build_pdf())
+    output_dir = tmp_path / "output"
+    plan_path = tmp_path / "plan.jsonl"
+    entry = PlanEntry(
+        input_path,
+        output_dir / input_path.name,
+        {"Title": "T", "Author": "A", "Subject": "S", "Keywords": "K"},
+        output_dir,
+    )
+    plan_path.write_text(entry.to_json() + "\n", encoding="utf-8")
+
+    result = CliRunner().invoke(
+        main, ["--apply-plan", str(plan_path), "--backend", "native"]
+    )
+
+    assert result.exit_code == 0, result.output
+    assert input_path in Journal(output_dir, resume=True)
+
+
+def test_apply_plan_fails_on_taken_name(tmp_path):
+    """Test that a planned name taken since planning is not written elsewhere."""
+    input_path = tmp_path / "Beethoven_Symphony05_Op67_Violin1.pdf"
+    input_path.write_bytes(build_pdf())
+    output_dir = tmp_path / "output"
+    output_dir.mkdir()
+    (output_dir / input_path.name).write_bytes(b"written since")
+    plan_path = tmp_path / "plan.jsonl"
+    entry = PlanEntry(
+        input_path,
+        output_dir / input_path.name,
+        {"Title": "T", "Author": "A", "Subject": "S", "Keywords": "K"},
+        output_dir,
+    )
+    plan_path.write_text(entry.to_json() + "\n", encoding="utf-8")
+
+    result = CliRunner().invoke(
+        main, ["--apply-plan", str(plan_path), "--backend", "native"]
+    )
+
+    assert result.exit_code == 1
+    assert "already exists; plan again" in result.output
+    assert [p.name for p in output_dir.glob("*.pdf")] == [input_path.name]
+    assert (output_dir / input_path.name).read_bytes() == b"written since"
+
+
+def test_plan_to_stdout_reports_unparseable_files(tmp_path):
+    """Test that planning continues past bad filenames and exits non-zero."""
+    (tmp_path / "Beethoven_Symphony05_Op67_Violin1.pdf").write_bytes(b"")
+    (tmp_path / "not-a-schema.pdf").write_bytes(b"")
+
+    result = CliRunner().invoke(
+        main, ["-i", str(tmp_path), "-o", str(tmp_path / "out"), "--plan", "-"]
+    )
+
+    assert result.exit_code == 1
+    [line] = result.stdout.splitlines()
+    assert json.loads(line)["Title"] == "Symphony 05 - Violin 1 Part"
+    assert "not-a-schema.pdf" in result.stderr
+    assert "Planned 1 file(s), 1 failed." in result.stderr
+
+
+def test_plan_with_instrument_map(tmp_path):
+    """Test that --instrument-map families are used in the keywords."""
+    (tmp_path / "Mahler_Symphony03_NoOp_Flugelhorn.pdf").write_bytes(b"")
+    csv_path = tmp_path / "instruments.csv"
+    csv_path.write_text("instrument,family\nFlugelhorn,Brass\n", encoding="utf-8")
+
+    try:
+        result = CliRunner().invoke(
+            main,
+            [
+                "-i",
+                str(tmp_path),
+                "-o",
+                str(tmp_path / "out"),
+                "--instrument-map",
+                str(csv_path),
+                "--plan",
+                "-",
+            ],
+        )
+    finally:
+        set_instrument_map(None)
+
+    assert result.exit_code == 0, result.output
+    assert json.loads(result.stdout)["Keywords"] == "Orchestral,Flugelhorn,Brass"
+
+
+def test_plan_with_custom_schema(tmp_path):
+    """Test that --schema parses names in another order."""
+    (tmp_path / "Symphony05_Beethoven_Violin1.pdf").write_bytes(b"")
+
+    result = CliRunner().invoke(
+        main,
+        [
+            "-i",
+            str(tmp_path),
+            "-o",
+            str(tmp_path / "out"),
+            "--schema",
+            "{work}_{composer}_{part}",
+            "--plan",
+            "-",
+        ],
+    )
+
+    assert result.exit_code == 0, result.output
+    assert json.loads(result.stdout)["Author"] == "Ludwig van Beethoven"
+
+
+def test_invalid_schema_is_rejected(tmp_path):
+    """Test that an invalid --schema is reported before any file is read."""
+    result = CliRunner().invoke(
+        main, ["-i", str(tmp_path), "-o", str(tmp_path), "--schema", "{composer}"]
+    )
+
+    assert result.exit_code == 1
+    assert "Invalid --schema" in result.output
@@ -0,0 +1,85 @@
+"""Tests for --profile stage timing."""
+
+import json
+from array import array
+
+import pytest
+from click.testing import CliRunner
+
+from sheetmusic_metadata import profiling
+from sheetmusic_metadata.cli import main
+from tests.pdf_builders import build_pdf
+
+
+@pytest.fixture(autouse=True)
+def reset_profiling():
+    """Leave profiling disabled after each test."""
+    yield
+    profiling.disable()
+
+
+def test_stage_is_noop_when_disabled():
+    """Test that instrumented code records nothing while disabled."""
+    assert profiling.stage("parse") is profiling.stage("write")
+    with profiling.stage("parse"):
+        pass
+    profiling.add_bytes(read=10)
+    profiling.count("exiftool_commands")
+    assert profiling.get_profiler() is None
+
+
+def test_report_percentiles_and_counters():
+    """Test the summary of collected samples."""
+    profiler = profiling.enable()
+    profiler.samples["write"] = array("q", range(1_000_000, 101_000_000, 1_000_000))
+    profiling.add_bytes(read=100, written=40)
+    profiling.count("exiftool_commands", 3)
+
+    report = profiler.report()
+
+    write = report["stages"]["write"]
+    assert write["count"] == 100
+    assert (write["p50_ms"], write["p95_ms"], write["p99_ms"]) == (50.0, 95.0, 99.0)
+    assert write["total_s"] == pytest.approx(5.05)
+    assert (report["bytes_read"], report["bytes_written"]) == (100, 40)
+    assert report["counters"] == {"exiftool_commands": 3}
+
+
+def test_drain_and_merge():
+    """Test that worker measurements can be moved into the parent's profiler."""
+    worker = profiling.Profiler()
+    with worker.stage("parse"):
+        pass
+    worker.bytes_written = 5
+    state = worker.drain()
+
+    parent = profiling.Profiler()
+    parent.merge(state)
+    parent.merge(state)
+
+    assert len(parent.samples["parse"]) == 2
+    assert parent.bytes_written == 10
+    assert worker.samples == {}
+
+
+@pytest.mark.parametrize("jobs", ["1", "2"])
+def test_cli_profile_report(tmp_path, jobs):
+    """Test that --profile writes stage timings for every file."""
+    input_dir = tmp_path / "input"
+    input_dir.mkdir()
+    for part in ["Violin1", "Viola", "Cello"]:
+        (input_dir / f"Brahms_Symphony04_Op98_{part}.pdf").write_bytes(build_pdf())
+    profile_path = tmp_path / "profile.json"
+
+    result = CliRunner().invoke(
+        main,
+        ["-i", str(input_dir), "-o", str(tmp_path / "output"), "--backend", "native"]
+        + ["--jobs", jobs, "--profile", str(profile_path)],
+    )
+
+    assert result.exit_code == 0, result.output
+    report = json.loads(profile_path.read_text())
+    for stage in ["file", "parse", "lookup", "format", "hash", "native_write"]:
+        assert report["stages"][stage]["count"] == 3
+    assert report["bytes_written"] > 0
+    assert report["wall_s"] > 0
@@ -0,0 +1,78 @@
+"""Tests for input directory scanning."""
+
+import shutil
+
+from sheetmusic_metadata.scanning import iter_pdf_files
+
+
+def make_tree(root, paths):
+    """Create empty files at the given relative paths."""
+    for relative in paths:
+        path = root / relative
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(b"")
+
+
+def test_iter_pdf_files_top_level_only(tmp_path):
+    """Test that only top-level PDFs are found without recursion."""
+    make_tree(tmp_path, ["b.pdf", "a.pdf", "notes.txt", "Season/c.pdf"])
+
+    assert [p.name for p in iter_pdf_files(tmp_path)] == ["a.pdf", "b.pdf"]
+
+
+def test_iter_pdf_files_recursive_order(tmp_path):
+    """Test that each directory's files come before its sorted subdirectories."""
+    make_tree(
+        tmp_path,
+        [
+            "z.pdf",
+            "Strings/2024/b.pdf",
+            "Strings/a.pdf",
+            "Brass/c.pdf",
+            "Brass/Extra/d.pdf",
+        ],
+    )
+
+    found = [p.relative_to(tmp_path).as_posix() for p in iter_pdf_files(tmp_path, True)]
+
+    assert found == [
+        "z.pdf",
+        "Brass/c.pdf",
+        "Brass/Extra/d.pdf",
+        "Strings/a.pdf",
+        "Strings/2024/b.pdf",
+    ]
+
+
+def test_iter_pdf_files_skips_hidden_and_excluded(tmp_path):
+    """Test that hidden entries and the excluded directory are not scanned."""
+    make_tree(
+        tmp_path,
+        [".hidden.pdf", ".trash/a.pdf", "output/b.pdf", "scores/c.pdf"],
+    )
+
+    found = list(iter_pdf_files(tmp_path, True, exclude=tmp_path / "output"))
+
+    assert found == [tmp_path / "scores" / "c.pdf"]
+
+
+def test_iter_pdf_files_is_lazy(tmp_path):
+    """Test that subdirectories are only read when the walk reaches them."""
+    make_tree(tmp_path, ["a/1.pdf", "b/2.pdf"])
+    files = iter_pdf_files(tmp_path, True)
+
+    assert next(files) == tmp_path / "a" / "1.pdf"
+    make_tree(tmp_path, ["b/3.pdf"])
+    assert list(files) == [tmp_path / "b" / "2.pdf", tmp_path / "b" / "3.pdf"]
+
+
+def test_iter_pdf_files_skips_vanished_subdirectory(tmp_path, capsys):
+    """Test that a subdirectory removed mid-scan is skipped with a warning."""
+    make_tree(tmp_path, ["a/1.pdf", "b/2.pdf", "c/3.pdf"])
+    files = iter_pdf_files(tmp_path, True)
+
+    assert next(files) == tmp_path / "a" / "1.pdf"
+    shutil.rmtree(tmp_path / "b")
+
+    assert list(files) == [tmp_path / "c" / "3.pdf"]
+    assert "Skipping directory" in capsys.readouterr().err
@@ -0,0 +1,159 @@
+"""Tests for --shard and merge-shards."""
+
+import json
+import re
+from pathlib import PurePath
+
+import pytest
+from click.testing import CliRunner
+
+from sheetmusic_metadata.cli import main
+from sheetmusic_metadata.journal import JOURNAL_FILENAME, Journal
+from sheetmusic_metadata.manifest import MANIFEST_FILENAME, Manifest
+from sheetmusic_metadata.output_index import OutputIndex
+from sheetmusic_metadata.planning import OutputPlanner
+from sheetmusic_metadata.sharding import (
+    parse_shard,
+    shard_counter,
+    shard_filename,
+    shard_of,
+)
+from tests.pdf_builders import build_pdf
+
+NAMES = [f"Brahms_Symphony0{n}_Op98_Horn{n}.pdf" for n in range(1, 9)]
+
+
+def test_parse_shard():
+    """Test that K/N is parsed and validated."""
+    assert parse_shard("2/4") == (2, 4)
+    assert parse_shard(" 1 / 1 ") == (1, 1)
+    for spec in ["0/4", "5/4", "2", "a/b", "2/4/8"]:
+        with pytest.raises(ValueError):
+            parse_shard(spec)
+
+
+def test_shards_partition_inputs():
+    """Test that every input falls in exactly one shard, the same each time."""
+    paths = [PurePath("sub") / name for name in NAMES * 4]
+    shards = [shard_of(path, 3) for path in paths]
+
+    assert shards == [shard_of(path, 3) for path in paths]
+    assert set(shards) == {1, 2, 3}
+    assert shard_of(PurePath("a/b.pdf"), 1) == 1
+
+
+def test_shard_counter():
+    """Test that each shard only uses its own conflict suffixes."""
+    assert shard_counter(1, None) == 1
+    assert [shard_counter(n, (2, 3)) for n in range(1, 7)] == [2, 2, 5, 5, 5, 8]
+    assert shard_filename(MANIFEST_FILENAME, (2, 3)) == (
+        ".sheetmusic-manifest.shard-2-of-3.jsonl"
+    )
+
+
+def test_sharded_output_index_and_planner(tmp_path):
+    """Test that shards writing one directory never pick the same suffix."""
+    (tmp_path / "test.pdf").write_text("existing")
+    (tmp_path / "test (3).pdf").write_text("existing")
+
+    first = OutputIndex((1, 2))
+    second = OutputIndex((2, 2))
+    names = [
+        index.reserve(tmp_path, "test.pdf")[0].name
+        for index in [first, second, first, second]
+    ]
+
+    assert names == ["test (5).pdf", "test (6).pdf", "test (7).pdf", "test (8).pdf"]
+
+    planner = OutputPlanner((2, 2))
+    planned = [planner.plan(tmp_path, "test.pdf").name for _ in range(2)]
+    assert planned == ["test (2).pdf", "test (4).pdf"]
+
+
+@pytest.fixture
+def input_dir(tmp_path):
+    """An input directory with eight valid PDFs."""
+    input_dir = tmp_path / "input"
+    input_dir.mkdir()
+    for name in NAMES:
+        (input_dir / name).write_bytes(build_pdf())
+    return input_dir
+
+
+@pytest.mark.parametrize("jobs", ["1", "2"])
+def test_shards_share_output_dir_then_merge(input_dir, tmp_path, jobs):
+    """Test two shards tagging into one directory, then merge-shards."""
+    output_dir = tmp_path / "output"
+    output_dir.mkdir()
+    # Every output name is taken, so both shards must add suffixes
+    for name in NAMES:
+        (output_dir / name).write_text("existing")
+    expected = {
+        k: sorted(n for n in NAMES if shard_of(PurePath(n), 2) == k) for k in (1, 2)
+    }
+    assert expected[1] and expected[2]
+
+    for k in (1, 2):
+        result = CliRunner().invoke(
+            main,
+            ["-i", str(input_dir), "-o", str(output_dir), "--backend", "native"]
+            + ["--jobs", jobs, "--shard", f"{k}/2"],
+        )
+        assert result.exit_code == 0, result.output
+        assert f"shard {k} of 2" in result.output
+        journal = output_dir / shard_filename(JOURNAL_FILENAME, (k, 2))
+        entries = [json.loads(line) for line in journal.read_text().splitlines()]
+        assert sorted(PurePath(e["input"]).name for e in entries) == expected[k]
+        # Shard 1 takes the odd suffixes and shard 2 the even ones
+        for entry in entries:
+            suffix = re.search(r" \((\d+)\)\.pdf$", entry["output"])
+            assert int(suffix.group(1)) % 2 == k % 2
+
+    result = CliRunner().invoke(main, ["merge-shards", str(output_dir)])
+    assert result.exit_code == 0, result.output
+    assert "Merged 2 shard(s): 8 journal and 8 manifest entries added." in (
+        result.output
+    )
+    assert sorted(p.name for p in output_dir.iterdir() if ".shard-" in p.name) == []
+    assert len(Manifest(output_dir)) == len(NAMES)
+    assert len(Journal(output_dir, resume=True)) == len(NAMES)
+
+    # The merged manifest lets an unsharded run skip everything
+    result = CliRunner().invoke(
+        main, ["-i", str(input_dir), "-o", str(output_dir), "--backend", "native"]
+    )
+    assert result.exit_code == 0, result.output
+    assert result.output.count("Skipping") == len(NAMES)
+
+
+def test_merge_shards_reports_missing_shard(input_dir, tmp_path):
+    """Test that a shard without a journal is reported, and merging repeats."""
+    output_dir = tmp_path / "output"
+    result = CliRunner().invoke(
+        main,
+        ["-i", str(input_dir), "-o", str(output_dir), "--backend", "native"]
+        + ["--shard", "2/3"],
+    )
+    assert result.exit_code == 0, result.output
+
+    result = CliRunner().invoke(main, ["merge-shards", str(output_dir)])
+    assert result.exit_code == 0, result.output
+    assert "no journal found for shard(s) 1, 3 of 3" in result.stderr
+
+    result = CliRunner().invoke(main, ["merge-shards", str(output_dir)])
+    assert "No shard files found" in result.output
+
+
+def test_shard_rejects_bad_spec_and_apply_plan(input_dir, tmp_path):
+    """Test that --shard is validated and refused with --apply-plan."""
+    result = CliRunner().invoke(
+        main, ["-i", str(input_dir), "-o", str(tmp_path), "--shard", "3/2"]
+    )
+    assert result.exit_code == 2
+    assert "K must be between 1 and N" in result.output
+
+    plan = tmp_path / "plan.jsonl"
+    plan.write_text("")
+    result = CliRunner().invoke(main, ["--apply-plan", str(plan), "--shard", "1/2"])
+    assert result.exit_code == 1
+    assert "--shard cannot be used with --apply-plan" in result.output
@@ -0,0 +1,62 @@
+"""Tests for the import time of the command-line interface."""
+
+import subprocess
+import sys
+
+# Modules only some runs need, which importing the CLI must not load
+LAZY_MODULES = (
+    "asyncio",
+    "concurrent.futures",
+    "multiprocessing",
+    "sqlite3",
+    "difflib",
+    "sheetmusic_metadata.catalog",
+    "sheetmusic_metadata.composer_index",
+    "sheetmusic_metadata.composer_table",
+)
+
+# The CLI's own imports (everything beyond click) may take at most this
+# fraction of the time importing click takes. A ratio keeps the budget
+# meaningful on slow and fast machines alike.
+IMPORT_BUDGET_RATIO = 1.0
+
+
+def _import_times(statement: str) -> dict[str, int]:
+    """Self import time in microseconds of every module a statement imports."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        fields = line.removeprefix("import time:").split("|")
+        if len(fields) == 3 and fields[0].strip().isdigit():
+            times[fields[2].strip()] = int(fields[0])
+    return times
+
+
+def test_cli_import_skips_optional_subsystems():
+    """Test that importing the CLI leaves optional subsystems unloaded."""
+    imported = _import_times("import sheetmusic_metadata.cli")
+
+    assert "sheetmusic_metadata.cli" in imported
+    assert [module for module in LAZY_MODULES if module in imported] == []
+
+
+def test_cli_import_time_within_budget():
+    """Test that the CLI's own imports stay within the startup budget."""
+    # Compile any stale bytecode first, so it is not counted
+    _import_times("import sheetmusic_metadata.cli")
+
+    ratios = []
+    for _ in range(3):
+        cli = _import_times("import sheetmusic_metadata.cli")
+        click = _import_times("import click")
+        own = sum(time for module, time in cli.items() if module not in click)
+        ratios.append(own / sum(click.values()))
+
+    assert min(ratios) <= IMPORT_BUDGET_RATIO, (
+        f"CLI imports take {min(ratios):.2f}x the time of importing click"
+    )
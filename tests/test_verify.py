@@ -0,0 +1,177 @@
+"""Tests for batched metadata reads and the verify command."""
+
+import json
+import subprocess
+from pathlib import Path
+
+import pytest
+from click.testing import CliRunner
+
+from sheetmusic_metadata import pdf_metadata
+from sheetmusic_metadata.cli import main
+from sheetmusic_metadata.pdf_metadata import (
+    read_pdf_metadata,
+    read_pdf_metadata_many,
+)
+from sheetmusic_metadata.pdf_native import write_info_incremental
+from sheetmusic_metadata.planning import PlanEntry, metadata_differences
+from tests.pdf_builders import build_pdf
+
+METADATA = {
+    "Title": "Symphony 09 - Cello Part",
+    "Author": "Antonín Dvořák",
+    "Subject": "Orchestral",
+    "Keywords": "Orchestral,Cello,Op. 95,Strings",
+}
+
+
+class _FakeSession:
+    """Stands in for ExifToolSession, answering -json reads from a table."""
+
+    def __init__(self, records, stderr=""):
+        self.records = records
+        self.stderr = stderr
+        self.commands = []
+
+    def execute(self, *args):
+        self.commands.append(args)
+        files = [arg for arg in args if arg.endswith(".pdf")]
+        stdout = json.dumps([self.records[f] for f in files if f in self.records])
+        return subprocess.CompletedProcess(["exiftool", *args], 1, stdout, self.stderr)
+
+
+def _tagged_pdf(path: Path, metadata: dict[str, str]) -> Path:
+    path.write_bytes(build_pdf())
+    write_info_incremental(path, metadata)
+    return path
+
+
+def test_read_many_native_in_order_with_errors(tmp_path):
+    """Test that results keep input order and a missing file does not stop the rest."""
+    first = _tagged_pdf(tmp_path / "a.pdf", METADATA)
+    missing = tmp_path / "missing.pdf"
+    last = _tagged_pdf(tmp_path / "b.pdf", {"Title": "Ünïcödé ♫"})
+
+    results = list(read_pdf_metadata_many([first, missing, last], chunk_size=2))
+
+    assert [r.path for r in results] == [first, missing, last]
+    assert results[0].metadata == METADATA
+    assert results[1].metadata is None
+    assert "No such file" in results[1].error
+    assert results[2].metadata["Title"] == "Ünïcödé ♫"
+
+
+def test_read_many_batches_unsupported_files_per_chunk(tmp_path):
+    """Test that files the native reader rejects share one exiftool command."""
+    paths = []
+    for name in ("ok.pdf", "broken.pdf", "gone.pdf"):
+        path = tmp_path / name
+        path.write_bytes(build_pdf(trailer_extra=b"/Encrypt 9 0 R"))
+        paths.append(path)
+    session = _FakeSession(
+        {
+            str(paths[0]): {
+                "SourceFile": str(paths[0]),
+                "Title": "Requiem",
+                "Keywords": ["Orchestral", "Op. 626"],
+            },
+            str(paths[1]): {"SourceFile": str(paths[1]), "Error": "Corrupted PDF"},
+        },
+        stderr=f"Error: File not found - {paths[2]}\n",
+    )
+
+    results = list(read_pdf_metadata_many(paths, session))
+
+    assert len(session.commands) == 1
+    assert results[0].metadata == {
+        "Title": "Requiem",
+        "Author": "",
+        "Subject": "",
+        "Keywords": "Orchestral, Op. 626",
+    }
+    assert results[1].error == "Corrupted PDF"
+    assert results[2].error == "File not found"
+
+
+def test_read_many_passes_malformed_files_to_exiftool(tmp_path):
+    """Test that a file the native parser chokes on is read by exiftool."""
+    good = _tagged_pdf(tmp_path / "good.pdf", METADATA)
+    malformed = tmp_path / "malformed.pdf"
+    malformed.write_bytes(b"%PDF-1.4\n1 0 obj 42 endobj\nstartxref\n9\n%%EOF\n")
+    session = _FakeSession(
+        {str(malformed): {"SourceFile": str(malformed), "Error": "Corrupted PDF"}}
+    )
+
+    results = list(read_pdf_metadata_many([good, malformed], session))
+
+    assert results[0].metadata == METADATA
+    assert results[1].error == "Corrupted PDF"
+    assert session.commands[0][-1] == str(malformed)
+    assert read_pdf_metadata(good) == METADATA
+    # The single-file reader hands it to exiftool too (which fails here)
+    with pytest.raises(subprocess.CalledProcessError):
+        read_pdf_metadata(malformed, session)
+
+
+def test_native_reader_bugs_are_not_hidden(tmp_path, monkeypatch):
+    """Test that only unsupported files fall back to exiftool."""
+    good = _tagged_pdf(tmp_path / "good.pdf", METADATA)
+
+    def broken_read_info(path):
+        raise TypeError("bug in the native reader")
+
+    monkeypatch.setattr(pdf_metadata, "read_info", broken_read_info)
+    session = _FakeSession({})
+
+    with pytest.raises(TypeError):
+        read_pdf_metadata(good, session)
+    with pytest.raises(TypeError):
+        list(read_pdf_metadata_many([good], session))
+    assert session.commands == []
+
+
+def test_metadata_differences_ignores_keyword_spacing():
+    """Test that keywords rejoined with ", " still match the plan."""
+    actual = {**METADATA, "Keywords": "Orchestral, Cello, Op. 95, Strings"}
+
+    assert metadata_differences(METADATA, actual) == []
+    assert metadata_differences(METADATA, {**actual, "Author": "Dvorak"}) == ["Author"]
+
+
+def test_verify_reports_mismatches(tmp_path):
+    """Test that verify lists differing and unreadable files and exits 1."""
+    good = _tagged_pdf(tmp_path / "good.pdf", METADATA)
+    stale = _tagged_pdf(tmp_path / "stale.pdf", {**METADATA, "Title": "Old"})
+    plan_path = tmp_path / "plan.jsonl"
+    plan_path.write_text(
+        "".join(
+            PlanEntry(tmp_path / "in.pdf", output, METADATA).to_json() + "\n"
+            for output in (good, stale, tmp_path / "missing.pdf")
+        ),
+        encoding="utf-8",
+    )
+
+    result = CliRunner().invoke(main, ["verify", str(plan_path)])
+
+    assert result.exit_code == 1
+    assert f"Differs: {stale}" in result.stdout
+    assert "Title: expected 'Symphony 09 - Cello Part', found 'Old'" in result.stdout
+    assert "Unreadable:" in result.stderr
+    assert "Verified 3 file(s): 1 match, 1 differ, 1 unreadable." in result.stdout
+
+
+def test_verify_passes_when_all_match(tmp_path):
+    """Test that verify exits 0 when every file carries its planned metadata."""
+    plan_path = tmp_path / "plan.jsonl"
+    plan_path.write_text(
+        PlanEntry(
+            tmp_path / "in.pdf", _tagged_pdf(tmp_path / "out.pdf", METADATA), METADATA
+        ).to_json()
+        + "\n",
+        encoding="utf-8",
+    )
+
+    result = CliRunner().invoke(main, ["verify", str(plan_path)])
+
+    assert result.exit_code == 0, result.output
+    assert "1 match, 0 differ, 0 unreadable" in result.stdout
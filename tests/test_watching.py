@@ -0,0 +1,138 @@
+"""Tests for the directory watcher and the watch command."""
+
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+from click.testing import CliRunner
+
+from sheetmusic_metadata import cli
+from sheetmusic_metadata.pdf_native import read_info
+from sheetmusic_metadata.watching import DirectoryWatcher
+from tests.pdf_builders import build_pdf
+
+
+def _next_batch(batches, timeout=5.0):
+    """Get the next batch, failing instead of hanging if none comes."""
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        return pool.submit(next, batches).result(timeout=timeout)
+
+
+def _write_later(path: Path, data: bytes = b"%PDF-1.4\n", delay: float = 0.05):
+    """Write a file from another thread after a short delay."""
+
+    def write():
+        time.sleep(delay)
+        path.write_bytes(data)
+
+    thread = threading.Thread(target=write)
+    thread.start()
+    return thread
+
+
+@pytest.fixture(params=["inotify", "polling"])
+def watcher(request, tmp_path):
+    """A watcher on a directory holding one PDF, in each detection mode."""
+    (tmp_path / "existing.pdf").write_bytes(b"%PDF-1.4\n")
+    watcher = DirectoryWatcher(
+        tmp_path, poll_interval=0.05, force_polling=request.param == "polling"
+    )
+    if watcher.mode != request.param:
+        watcher.close()
+        pytest.skip("inotify is not available")
+    with watcher:
+        yield watcher
+
+
+def test_watcher_reports_new_pdf(watcher, tmp_path):
+    """Test that only PDFs written after the watcher starts are reported."""
+    thread = _write_later(tmp_path / "new.pdf")
+
+    batch = _next_batch(watcher.batches())
+    thread.join()
+
+    assert batch == [tmp_path / "new.pdf"]
+
+
+def test_watcher_ignores_other_files(watcher, tmp_path):
+    """Test that hidden and non-PDF files are not reported."""
+    (tmp_path / "notes.txt").write_bytes(b"x")
+    (tmp_path / ".partial.pdf").write_bytes(b"x")
+    thread = _write_later(tmp_path / "a.pdf")
+
+    batch = _next_batch(watcher.batches())
+    thread.join()
+
+    assert batch == [tmp_path / "a.pdf"]
+
+
+def test_watcher_batches_bursts(watcher, tmp_path):
+    """Test that files arriving together are handed out as one batch."""
+    names = [f"part{n}.pdf" for n in range(5)]
+
+    def write_all():
+        time.sleep(0.05)
+        for name in names:
+            (tmp_path / name).write_bytes(b"%PDF-1.4\n")
+
+    thread = threading.Thread(target=write_all)
+    thread.start()
+    batch = _next_batch(watcher.batches())
+    thread.join()
+
+    assert batch == [tmp_path / name for name in names]
+
+
+def test_watcher_reports_moved_in_files(watcher, tmp_path):
+    """Test that a PDF renamed into place from a temporary name is reported."""
+    temporary = tmp_path / "scan.tmp"
+    temporary.write_bytes(b"%PDF-1.4\n")
+
+    def rename():
+        time.sleep(0.05)
+        os.replace(temporary, tmp_path / "scan.pdf")
+
+    thread = threading.Thread(target=rename)
+    thread.start()
+    batch = _next_batch(watcher.batches())
+    thread.join()
+
+    assert batch == [tmp_path / "scan.pdf"]
+
+
+def test_watch_command_tags_existing_and_new_files(tmp_path, monkeypatch):
+    """Test that the watch command tags files present at start and arrivals."""
+    inbox = tmp_path / "inbox"
+    inbox.mkdir()
+    output_dir = tmp_path / "out"
+    (inbox / "Beethoven_Symphony05_Op67_Violin1.pdf").write_bytes(build_pdf())
+    arrival = inbox / "Mozart_Symphony40_Op550_Cello.pdf"
+
+    def one_batch(self):
+        arrival.write_bytes(build_pdf())
+        yield [arrival]
+
+    monkeypatch.setattr(DirectoryWatcher, "batches", one_batch)
+
+    result = CliRunner().invoke(
+        cli.main,
+        ["watch", "-i", str(inbox), "-o", str(output_dir), "--backend", "native"],
+    )
+
+    assert result.exit_code == 0, result.output
+    assert "Watching" in result.output
+    assert read_info(output_dir / arrival.name)["Author"] == "Wolfgang Amadeus Mozart"
+    assert read_info(output_dir / "Beethoven_Symphony05_Op67_Violin1.pdf")["Title"]
+
+
+def test_watch_command_rejects_output_in_place(tmp_path):
+    """Test that the watched directory cannot also be the output directory."""
+    result = CliRunner().invoke(
+        cli.main, ["watch", "-i", str(tmp_path), "-o", str(tmp_path)]
+    )
+
+    assert result.exit_code == 1
+    assert "must differ" in result.output